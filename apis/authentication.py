@@ -0,0 +1,171 @@
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from .cache import LOCAL_CACHE_ALIAS
+
+
+USER_CACHE_TIMEOUT = getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60)
+REVOCATION_LOCAL_TIMEOUT = getattr(settings, 'JWT_REVOCATION_LOCAL_TIMEOUT', 5)
+
+# Columns kept in the user cache; never the password hash.
+CACHED_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'user_type', 'company_id',
+    'is_active', 'is_staff', 'is_superuser', 'profile_picture', 'isInitialPassword',
+)
+
+
+def _user_cache_key(user_id):
+    return f'jwt_user_{user_id}'
+
+
+# Short lived cache of user rows for code that needs the model instance.
+# Entries are dropped when the user or company changes; other columns load
+# on access.
+def get_cached_user(user_id):
+    key = _user_cache_key(user_id)
+    User = get_user_model()
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values(*CACHED_USER_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, timeout=USER_CACHE_TIMEOUT)
+    # from_db expects the loaded columns in model order.
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(None, fields, [values[name] for name in fields])
+
+
+def invalidate_cached_users(*user_ids):
+    cache.delete_many([_user_cache_key(user_id) for user_id in user_ids])
+
+
+# Stateless tokens carry role and tenant until they expire, so deleting,
+# deactivating, demoting or moving a user records the time in the shared
+# cache and tokens issued up to then stop authenticating. The marker only has
+# to outlive the access tokens it revokes. Lookups, including misses (stored
+# as 0), are kept in the worker's local cache for REVOCATION_LOCAL_TIMEOUT
+# seconds, so most requests make no shared cache round trip.
+def _revocation_key(user_id):
+    return f'jwt_revoked_{user_id}'
+
+
+def _local_cache():
+    if not REVOCATION_LOCAL_TIMEOUT or LOCAL_CACHE_ALIAS not in settings.CACHES:
+        return None
+    return caches[LOCAL_CACHE_ALIAS]
+
+
+def revoke_user_tokens(*user_ids):
+    revoked_at = int(time.time())
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    markers = {_revocation_key(user_id): revoked_at for user_id in user_ids}
+    cache.set_many(markers, timeout=timeout)
+    local = _local_cache()
+    if local is not None:
+        local.set_many(markers, timeout=REVOCATION_LOCAL_TIMEOUT)
+
+
+def _revoked(validated_token, revoked_at):
+    # Whole seconds: a token issued in the second of the revocation stays
+    # valid, so logging in again right after a change works.
+    return bool(revoked_at) and validated_token.get('iat', 0) < revoked_at
+
+
+def is_token_revoked(validated_token):
+    key = _revocation_key(validated_token[api_settings.USER_ID_CLAIM])
+    local = _local_cache()
+    revoked_at = local.get(key) if local is not None else None
+    if revoked_at is None:
+        revoked_at = cache.get(key, 0)
+        if local is not None:
+            local.set(key, revoked_at, timeout=REVOCATION_LOCAL_TIMEOUT)
+    return _revoked(validated_token, revoked_at)
+
+
+async def ais_token_revoked(validated_token):
+    key = _revocation_key(validated_token[api_settings.USER_ID_CLAIM])
+    local = _local_cache()
+    revoked_at = local.get(key) if local is not None else None
+    if revoked_at is None:
+        revoked_at = await cache.aget(key, 0)
+        if local is not None:
+            local.set(key, revoked_at, timeout=REVOCATION_LOCAL_TIMEOUT)
+    return _revoked(validated_token, revoked_at)
+
+
+# Principal built only from the signed token claims. `role`, `company_id` and
+# `employee_id` are added by MyTokenObtainPairSerializer.get_token.
+class TokenPrincipal(TokenUser):
+    @property
+    def user_type(self):
+        return self.token.get('role')
+
+    @property
+    def company_id(self):
+        return self.token.get('company_id')
+
+    @property
+    def employee_id(self):
+        return self.token.get('employee_id')
+
+    @property
+    def department_id(self):
+        return self.token.get('department_id')
+
+    def get_user(self):
+        return get_cached_user(self.id)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed('Token contained no recognizable user identification')
+
+        # Tokens issued before the tenant claims were added carry only `role`.
+        if 'company_id' not in validated_token:
+            user = get_cached_user(user_id)
+            if user is None or not user.is_active:
+                raise AuthenticationFailed('User not found')
+            return user
+        if is_token_revoked(validated_token):
+            raise AuthenticationFailed('Token has been revoked')
+        return TokenPrincipal(validated_token)
+
+
+def resolve_employee_id(user):
+    # Token principals carry the claim; full users (legacy tokens) need a lookup.
+    if isinstance(user, TokenPrincipal):
+        return user.employee_id
+    from .models import Employee
+    return Employee.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+
+
+def _employee_scope(user):
+    # Tokens issued before the department claim was added still need a lookup.
+    if isinstance(user, TokenPrincipal) and 'department_id' in user.token:
+        return user.employee_id, user.department_id
+    return None
+
+
+def resolve_employee_scope(user):
+    # (employee_id, department_id) of the caller, for policy resolution.
+    scope = _employee_scope(user)
+    if scope is not None:
+        return scope
+    from .models import Employee
+    return Employee.objects.filter(user_id=user.pk).values_list('id', 'department_id').first() or (None, None)
+
+
+async def aresolve_employee_scope(user):
+    scope = _employee_scope(user)
+    if scope is not None:
+        return scope
+    from .models import Employee
+    return await Employee.objects.filter(user_id=user.pk).values_list('id', 'department_id').afirst() or (None, None)
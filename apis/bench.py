@@ -0,0 +1,56 @@
+import statistics
+import time
+from contextlib import contextmanager
+from django.db import connection
+
+
+# Shared helpers for the benchmark management commands.
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms):
+    return {
+        'count': len(samples_ms),
+        'mean_ms': round(statistics.fmean(samples_ms), 3) if samples_ms else 0.0,
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'max_ms': round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+@contextmanager
+def timed(samples_ms):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples_ms.append((time.perf_counter() - start) * 1000)
+
+
+def format_row(label, summary):
+    return (
+        f"{label:<32} n={summary['count']:<6} mean={summary['mean_ms']:>9.3f}ms "
+        f"p50={summary['p50_ms']:>9.3f}ms p95={summary['p95_ms']:>9.3f}ms p99={summary['p99_ms']:>9.3f}ms"
+    )
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries(using=connection):
+    counter = QueryCounter()
+    with using.execute_wrapper(counter):
+        yield counter
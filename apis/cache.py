@@ -0,0 +1,157 @@
+import time
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+
+LOCAL_CACHE_ALIAS = 'local'
+
+_MISSING = object()
+
+
+def shared_cache():
+    # The `default` alias: a database table, files or Redis depending on
+    # CACHE_BACKEND, so every worker sees the same entries.
+    return caches[DEFAULT_CACHE_ALIAS]
+
+
+def tenant_key(company_id, *parts):
+    # Every company scoped key lives under its own prefix, so entries of two
+    # tenants can never collide.
+    return ':'.join(['tenant', str(company_id), *(str(part) for part in parts)])
+
+
+# Per-company version counters. Cached entries embed the current version in
+# their key, so bumping the counter invalidates every entry of that company at
+# once without having to know which keys exist. Counters always live in the
+# shared cache so a bump is seen by every worker immediately. They start from
+# the clock rather than 1, so a flushed shared cache never hands out a version
+# whose entries may still sit in a worker's local tier. Bumps rely on an
+# atomic incr, see CACHE_BACKENDS in settings.
+def _version_key(name, company_id):
+    return tenant_key(company_id, name, 'version')
+
+
+def get_cache_version(name, company_id):
+    cache = shared_cache()
+    key = _version_key(name, company_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_cache_version(name, company_id):
+    cache = shared_cache()
+    key = _version_key(name, company_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def versioned_key(name, company_id, *parts):
+    return tenant_key(company_id, name, f'v{get_cache_version(name, company_id)}', *parts)
+
+
+async def aget_cache_version(name, company_id):
+    cache = shared_cache()
+    key = _version_key(name, company_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = time.time_ns()
+        await cache.aadd(key, version, timeout=None)
+        version = await cache.aget(key, version)
+    return version
+
+
+async def aversioned_key(name, company_id, *parts):
+    return tenant_key(company_id, name, f'v{await aget_cache_version(name, company_id)}', *parts)
+
+
+# Process-local cache in front of the shared one. Only meant for entries that
+# never change under the same key (versioned keys): the local copy can outlive
+# a delete made by another worker by up to CACHE_LOCAL_TIMEOUT seconds.
+class TwoTierCache:
+    def __init__(self, local_alias=LOCAL_CACHE_ALIAS, shared_alias=DEFAULT_CACHE_ALIAS, local_timeout=None):
+        self.local_alias = local_alias
+        self.shared_alias = shared_alias
+        self._local_timeout = local_timeout
+
+    @property
+    def local_timeout(self):
+        if self._local_timeout is not None:
+            return self._local_timeout
+        return getattr(settings, 'CACHE_LOCAL_TIMEOUT', 30)
+
+    def _local(self):
+        # Disabled when the timeout is 0 or there is no separate local alias.
+        if not self.local_timeout or self.local_alias not in settings.CACHES:
+            return None
+        return caches[self.local_alias]
+
+    def _local_timeout_for(self, timeout):
+        return self.local_timeout if timeout in (DEFAULT_TIMEOUT, None) else min(timeout, self.local_timeout)
+
+    def get(self, key, default=None):
+        local = self._local()
+        if local is not None:
+            value = local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = caches[self.shared_alias].get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if local is not None:
+            local.set(key, value, timeout=self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        caches[self.shared_alias].set(key, value, timeout=timeout)
+        local = self._local()
+        if local is not None:
+            local.set(key, value, timeout=self._local_timeout_for(timeout))
+
+    # Async variants for async views: the local tier is in-process memory and
+    # is read inline, only the shared tier is awaited.
+    async def aget(self, key, default=None):
+        local = self._local()
+        if local is not None:
+            value = local.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = await caches[self.shared_alias].aget(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if local is not None:
+            local.set(key, value, timeout=self.local_timeout)
+        return value
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT):
+        await caches[self.shared_alias].aset(key, value, timeout=timeout)
+        local = self._local()
+        if local is not None:
+            local.set(key, value, timeout=self._local_timeout_for(timeout))
+
+    def delete(self, key):
+        local = self._local()
+        if local is not None:
+            local.delete(key)
+        return caches[self.shared_alias].delete(key)
+
+    def get_or_set(self, key, compute, timeout=DEFAULT_TIMEOUT):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, timeout=timeout)
+        return value
+
+    def clear_local(self):
+        local = self._local()
+        if local is not None:
+            local.clear()
+
+
+hot_cache = TwoTierCache()
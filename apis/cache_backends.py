@@ -0,0 +1,47 @@
+import base64
+import pickle
+from asgiref.sync import sync_to_async
+from django.core.cache.backends.db import DatabaseCache as BaseDatabaseCache
+from django.db import connections, models, router, transaction
+from django.utils.timezone import now as tz_now
+
+
+# Django's DatabaseCache inherits incr() from BaseCache: a get followed by a
+# set, so concurrent increments from two workers lose updates (and the set
+# resets the entry's expiry to the default timeout). Here the row is locked
+# for the read-modify-write and only its value is rewritten, keeping the
+# expiry the entry was added with. Values are pickled in the table, so the
+# arithmetic cannot happen in SQL itself.
+class DatabaseCache(BaseDatabaseCache):
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(self._table)
+        lock = ' FOR UPDATE' if connection.features.has_select_for_update else ''
+
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT %s, %s FROM %s WHERE %s = %%s%s'
+                % (quote_name('value'), quote_name('expires'), table, quote_name('cache_key'), lock),
+                [key],
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                value, expires = row
+                expression = models.Expression(output_field=models.DateTimeField())
+                for converter in connection.ops.get_db_converters(expression) + expression.get_db_converters(connection):
+                    expires = converter(expires, expression, connection)
+            if row is None or expires < tz_now():
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(base64.b64decode(connection.ops.process_clob(value).encode())) + delta
+            cursor.execute(
+                'UPDATE %s SET %s = %%s WHERE %s = %%s' % (table, quote_name('value'), quote_name('cache_key')),
+                [base64.b64encode(pickle.dumps(value, self.pickle_protocol)).decode('latin1'), key],
+            )
+        return value
+
+    async def aincr(self, key, delta=1, version=None):
+        return await sync_to_async(self.incr)(key, delta, version)
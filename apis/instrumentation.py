@@ -0,0 +1,266 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('apis.requests')
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+
+
+def sql_fingerprint(sql):
+    # Queries that only differ in parameters (or IN list length) share a
+    # fingerprint, which is what repeats in an N+1 loop.
+    return _NUMBER.sub('N', _IN_LIST.sub('(%s...)', sql))
+
+
+# Per-request measurements. Also the execute_wrapper, so every query of the
+# request is counted and timed.
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.company_id = None
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.query_count += 1
+            self.fingerprints[sql_fingerprint(sql)] += 1
+
+    def repeated_queries(self, threshold):
+        if not threshold:
+            return []
+        return [(fingerprint, count) for fingerprint, count in self.fingerprints.most_common() if count >= threshold]
+
+
+def get_request_metrics(request):
+    # Works for both Django's HttpRequest and DRF's Request wrapper.
+    return getattr(getattr(request, '_request', request), '_metrics', None)
+
+
+def tag_request(request, company_id=None):
+    metrics = get_request_metrics(request)
+    if metrics is not None and company_id:
+        metrics.company_id = company_id
+
+
+@contextmanager
+def measure(request, field):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = get_request_metrics(request)
+        if metrics is not None:
+            setattr(metrics, field, getattr(metrics, field) + (time.perf_counter() - start) * 1000)
+
+
+# Process-local aggregates exposed in Prometheus text format. Every gunicorn
+# worker keeps its own registry, so scrape each worker or sum per instance.
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+        self.latency_ms = Counter()
+        self.db_ms = Counter()
+        self.queries = Counter()
+        self.serialize_ms = Counter()
+        self.render_ms = Counter()
+        self.n_plus_one = Counter()
+        self.tenant_requests = Counter()
+        self.tenant_queries = Counter()
+
+    def observe(self, view, method, status, metrics, repeated):
+        with self._lock:
+            self.requests[(view, method, str(status))] += 1
+            buckets = self.latency_buckets[view]
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                if metrics.total_ms <= bound:
+                    buckets[index] += 1
+            buckets[-1] += 1
+            self.latency_ms[view] += metrics.total_ms
+            self.db_ms[view] += metrics.db_ms
+            self.queries[view] += metrics.query_count
+            self.serialize_ms[view] += metrics.serialize_ms
+            self.render_ms[view] += metrics.render_ms
+            if repeated:
+                self.n_plus_one[view] += 1
+            if metrics.company_id:
+                self.tenant_requests[str(metrics.company_id)] += 1
+                self.tenant_queries[str(metrics.company_id)] += metrics.query_count
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+        with self._lock:
+            family('hrms_requests_total', 'counter', 'Requests by view, method and status.', [
+                ((('view', view), ('method', method), ('status', status)), count)
+                for (view, method, status), count in sorted(self.requests.items())
+            ])
+            lines.append('# HELP hrms_request_duration_ms Request latency in milliseconds.')
+            lines.append('# TYPE hrms_request_duration_ms histogram')
+            for view, buckets in sorted(self.latency_buckets.items()):
+                for bound, count in zip(LATENCY_BUCKETS_MS, buckets):
+                    lines.append(f'hrms_request_duration_ms_bucket{{view="{_escape(view)}",le="{bound}"}} {count}')
+                lines.append(f'hrms_request_duration_ms_bucket{{view="{_escape(view)}",le="+Inf"}} {buckets[-1]}')
+                lines.append(f'hrms_request_duration_ms_sum{{view="{_escape(view)}"}} {round(self.latency_ms[view], 3)}')
+                lines.append(f'hrms_request_duration_ms_count{{view="{_escape(view)}"}} {buckets[-1]}')
+            for name, counter, help_text in (
+                ('hrms_db_duration_ms_total', self.db_ms, 'Total time spent in database queries in milliseconds.'),
+                ('hrms_db_queries_total', self.queries, 'Database queries issued.'),
+                ('hrms_serialize_duration_ms_total', self.serialize_ms, 'Total serializer time in milliseconds.'),
+                ('hrms_render_duration_ms_total', self.render_ms, 'Total response rendering time in milliseconds.'),
+                ('hrms_n_plus_one_total', self.n_plus_one, 'Requests that repeated a similar query past the threshold.'),
+            ):
+                family(name, 'counter', help_text, [((('view', view),), round(value, 3)) for view, value in sorted(counter.items())])
+            family('hrms_tenant_requests_total', 'counter', 'Requests by company.', [
+                ((('company', company),), count) for company, count in sorted(self.tenant_requests.items())
+            ])
+            family('hrms_tenant_db_queries_total', 'counter', 'Database queries by company.', [
+                ((('company', company),), count) for company, count in sorted(self.tenant_queries.items())
+            ])
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+_current_metrics = ContextVar('request_metrics', default=None)
+
+
+# execute_wrapper of an async request. Concurrent requests can share one sync
+# thread (and its connections) when the server does not give each request its
+# own, so only queries issued from this request's context are counted.
+class ContextMetricsWrapper:
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        if _current_metrics.get() is not self.metrics:
+            return execute(sql, params, many, context)
+        return self.metrics(execute, sql, params, many, context)
+
+
+def _add_execute_wrapper(wrapper):
+    for connection in connections.all():
+        connection.execute_wrappers.append(wrapper)
+
+
+def _remove_execute_wrapper(wrapper):
+    for connection in connections.all():
+        if wrapper in connection.execute_wrappers:
+            connection.execute_wrappers.remove(wrapper)
+
+
+class RequestInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = request._metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.total_ms = (time.perf_counter() - metrics.started) * 1000
+        self.record(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        # Under ASGI the ORM (async or not) runs on the request's
+        # thread-sensitive executor thread, whose connections are the ones
+        # to wrap; connections are per thread.
+        metrics = request._metrics = RequestMetrics()
+        wrapper = ContextMetricsWrapper(metrics)
+        token = _current_metrics.set(metrics)
+        await sync_to_async(_add_execute_wrapper)(wrapper)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_execute_wrapper)(wrapper)
+            _current_metrics.reset(token)
+        metrics.total_ms = (time.perf_counter() - metrics.started) * 1000
+        self.record(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook; time the render itself.
+        metrics = request._metrics
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            metrics.render_ms += (time.perf_counter() - render_started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def record(self, request, response, metrics):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        repeated = metrics.repeated_queries(getattr(settings, 'N_PLUS_ONE_THRESHOLD', 0))
+        registry.observe(view, request.method, response.status_code, metrics, repeated)
+
+        fields = {
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'company_id': metrics.company_id,
+            'queries': metrics.query_count,
+            'db_ms': round(metrics.db_ms, 3),
+            'serialize_ms': round(metrics.serialize_ms, 3),
+            'render_ms': round(metrics.render_ms, 3),
+            'total_ms': round(metrics.total_ms, 3),
+        }
+        logger.info(
+            "request view=%s method=%s status=%s company=%s queries=%d db_ms=%.1f serialize_ms=%.1f render_ms=%.1f total_ms=%.1f",
+            view, request.method, response.status_code, metrics.company_id, metrics.query_count,
+            metrics.db_ms, metrics.serialize_ms, metrics.render_ms, metrics.total_ms,
+            extra={'metrics': fields},
+        )
+        for fingerprint, count in repeated:
+            logger.warning(
+                "n+1 suspected view=%s count=%d sql=%s", view, count, fingerprint,
+                extra={'metrics': {'view': view, 'company_id': metrics.company_id, 'count': count, 'sql': fingerprint}},
+            )
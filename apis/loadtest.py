@@ -0,0 +1,570 @@
+import asyncio
+import http.client
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from apis import urls as api_urls
+from apis.bench import summarize, timed, count_queries
+from apis.instrumentation import registry
+from apis.models import Company, Employee
+from apis.serializers import MyTokenObtainPairSerializer
+from attendance.models import DailyAttendance
+from company.models import Department, Policy
+from leave.models import LeaveBalance, LeaveRequest
+from payroll.models import Compensation, PayrollRun
+
+
+# Synthetic tenants and request scenarios for `manage.py bench_api`. Every
+# scenario builds its request from the seeded ids and a per-scenario sequence
+# number, so writes never collide (new names, dates and client ids) and pools
+# of pending leave requests or disposable employees are consumed in order.
+User = get_user_model()
+
+BENCH_PASSWORD = 'bench-Password-1'
+BENCH_OTP = '424242'
+BENCH_HOST = 'testserver'
+SEED_BATCH_SIZE = 5000
+TOKEN_SAMPLE_SIZE = 20
+ATTENDANCE_DAYS = 5
+LEAVE_TYPES = {'casual': 12, 'sick': 8}
+
+
+class Tenant:
+    __slots__ = (
+        'company_id', 'company_email', 'admin_token', 'department_ids', 'employee_ids',
+        'employee_users', 'employee_tokens', 'review_pool', 'disposable_pool', 'run_id',
+    )
+
+    def __init__(self, company):
+        self.company_id = company.id
+        self.company_email = company.email
+        self.admin_token = None
+        self.department_ids = []
+        self.employee_ids = []
+        # (user id, email) of every seeded employee, aligned with employee_ids.
+        self.employee_users = []
+        self.employee_tokens = []
+        self.review_pool = []
+        self.disposable_pool = []
+        self.run_id = None
+
+
+@contextmanager
+def bench_database(keepdb=False):
+    # Throwaway test database (test_<NAME>) for the benchmark commands.
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict['NAME']
+    if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+        # A file, not the shared in-memory database, so every server thread
+        # gets its own connection.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'hrms_bench.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def access_token(user):
+    return str(MyTokenObtainPairSerializer.get_token(user).access_token)
+
+
+def seed_tenant(index, departments, employees, pool_size, password_hash):
+    # One company with a department tree, employees, policies at company,
+    # department and employee scope, balances, compensation, attendance and
+    # pools for the scenarios that consume rows.
+    company = Company.objects.create(
+        name=f'Bench {index}', ownerName='Bench', email=f'company{index}@bench.invalid',
+        industry='IT', size='1000', countryCode='+91', phone='9000000000',
+    )
+    tenant = Tenant(company)
+    admin = User.objects.create(
+        username=f'bench.admin.{index}', email=f'admin{index}@bench.invalid', password=password_hash,
+        user_type='admin', company=company,
+    )
+    tenant.admin_token = access_token(admin)
+
+    # Saved one by one so the hierarchy paths are computed; three children each.
+    department_rows = []
+    for position in range(max(departments, 1)):
+        department = Department(
+            company=company, name=f'Dept {position}', leave_allotments=LEAVE_TYPES,
+            parent=department_rows[(position - 1) // 3] if position else None,
+        )
+        department.save()
+        department_rows.append(department)
+    tenant.department_ids = [department.id for department in department_rows]
+
+    total = employees + pool_size
+    users = User.objects.bulk_create([
+        User(username=f'bench.{index}.{position}', email=f'e{index}.{position}@bench.invalid', password=password_hash, company=company)
+        for position in range(total)
+    ], batch_size=SEED_BATCH_SIZE)
+    staff = Employee.objects.bulk_create([
+        Employee(
+            employee_id=f'B{index}-{position}', user=user, company=company,
+            department=department_rows[position % len(department_rows)], first_name='Bench', last_name=str(position),
+            employee_type='office', joining_date=date(2024, 1, 1), overtime_eligible=position % 4 != 0,
+        )
+        for position, user in enumerate(users)
+    ], batch_size=SEED_BATCH_SIZE)
+    staff, disposable = staff[:employees], staff[employees:]
+    tenant.employee_ids = [employee.id for employee in staff]
+    tenant.employee_users = [(user.id, user.email) for user in users[:employees]]
+    tenant.disposable_pool = [employee.employee_id for employee in disposable]
+    tenant.employee_tokens = [
+        (employee.id, access_token(employee.user)) for employee in staff[:TOKEN_SAMPLE_SIZE]
+    ]
+
+    policies = [
+        Policy(company=company, type=policy_type, title=f'{policy_type} policy', details=details)
+        for policy_type, details in (
+            ('working_hours', {'start': '09:00', 'end': '18:00', 'days_per_month': 26}),
+            ('late', {'grace_minutes': 10}),
+            ('overtime', {'after_minutes': 540, 'rate_multiplier': 1.5}),
+            ('attendance', {}),
+            ('leave', {'unpaid_types': ['unpaid']}),
+        )
+    ]
+    policies += [
+        Policy(company=company, department=department, type='late', title='Department late policy', details={'grace_minutes': 5})
+        for department in department_rows[::2]
+    ]
+    policies += [
+        Policy(company=company, employee=employee, department=employee.department, type='overtime', title='Employee overtime policy', details={'min_minutes': 30})
+        for employee in staff[::10]
+    ]
+    Policy.objects.bulk_create(policies, batch_size=SEED_BATCH_SIZE)
+
+    LeaveBalance.objects.bulk_create([
+        LeaveBalance(company=company, employee=employee, leave_type=leave_type, balance=Decimal(1000))
+        for employee in staff for leave_type in LEAVE_TYPES
+    ], batch_size=SEED_BATCH_SIZE)
+    Compensation.objects.bulk_create([
+        Compensation(company=company, employee=employee, base_salary=Decimal(30000 + position % 50 * 1000))
+        for position, employee in enumerate(staff)
+    ], batch_size=SEED_BATCH_SIZE)
+    today = timezone.localdate()
+    DailyAttendance.objects.bulk_create([
+        DailyAttendance(company=company, employee=employee, date=today - timedelta(days=day), worked_minutes=540)
+        for employee in staff for day in range(ATTENDANCE_DAYS)
+    ], batch_size=SEED_BATCH_SIZE)
+    pending = LeaveRequest.objects.bulk_create([
+        LeaveRequest(
+            company=company, employee=staff[position % len(staff)], leave_type='casual',
+            start_date=date(2024, 1, 1) + timedelta(days=position), end_date=date(2024, 1, 1) + timedelta(days=position), days=1,
+        )
+        for position in range(pool_size if staff else 0)
+    ], batch_size=SEED_BATCH_SIZE)
+    tenant.review_pool = [leave_request.id for leave_request in pending]
+    tenant.run_id = PayrollRun.objects.create(company=company, period_start=date(2024, 1, 1), period_end=date(2024, 1, 31)).id
+    return tenant
+
+
+def seed_tenants(companies, departments, employees, pool_size):
+    password_hash = make_password(BENCH_PASSWORD)
+    return [seed_tenant(index, departments, employees, pool_size, password_hash) for index in range(companies)]
+
+
+# A request ready to be sent by either runner.
+class BenchRequest:
+    __slots__ = ('method', 'path', 'body', 'content_type', 'token')
+
+    def __init__(self, method, path, body=b'', content_type='application/json', token=None):
+        self.method = method
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+        self.token = token
+
+
+class Scenario:
+    __slots__ = ('name', 'method', 'url_name', 'build', 'sequence')
+
+    # `build(tenant, turn)` returns a dict with any of: token, kwargs (URL
+    # kwargs), query, json, multipart. `turn` counts this scenario's requests
+    # for the tenant, across both runners.
+    def __init__(self, name, method, url_name, build):
+        self.name = name
+        self.method = method
+        self.url_name = url_name
+        self.build = build
+        self.sequence = itertools.count()
+
+    def next_request(self, tenants):
+        number = next(self.sequence)
+        tenant = tenants[number % len(tenants)]
+        spec = self.build(tenant, number // len(tenants))
+        path = reverse(self.url_name, kwargs=spec.get('kwargs'))
+        if spec.get('query'):
+            path = f"{path}?{urlencode(spec['query'])}"
+        if 'multipart' in spec:
+            body, content_type = encode_multipart(BOUNDARY, spec['multipart']), MULTIPART_CONTENT
+        elif 'json' in spec:
+            body, content_type = json.dumps(spec['json']).encode(), 'application/json'
+        else:
+            body, content_type = b'', 'application/json'
+        return BenchRequest(self.method, path, body, content_type, spec.get('token'))
+
+
+def _pick(items, turn):
+    return items[turn % len(items)]
+
+
+def _employee_user(tenant, turn):
+    return _pick(tenant.employee_users, turn)
+
+
+def _employee_token(tenant, turn):
+    return _pick(tenant.employee_tokens, turn)[1]
+
+
+def _pool(items, turn):
+    # Exhausted pools keep replaying the last row; those requests show up as
+    # errors in the status breakdown.
+    return items[min(turn, len(items) - 1)]
+
+
+def _reset_otp(tenant, turn):
+    user_id, email = _employee_user(tenant, turn)
+    cache.set(f'otp_{user_id}', BENCH_OTP, timeout=600)
+    return {'json': {'email': email, 'otp': BENCH_OTP, 'new_password': BENCH_PASSWORD}}
+
+
+def _import_file(tenant, turn):
+    rows = ['employee_id,email,first_name,department,employee_type,joining_date']
+    rows += [
+        f'I{tenant.company_id}-{turn}-{row},import.{tenant.company_id}.{turn}.{row}@bench.invalid,Imported,Dept 0,office,2024-01-01'
+        for row in range(5)
+    ]
+    return SimpleUploadedFile('employees.csv', '\n'.join(rows).encode(), content_type='text/csv')
+
+
+def _punches():
+    now = timezone.now()
+    return [
+        {'punched_at': (now - timedelta(hours=8)).isoformat(), 'kind': 'in', 'client_id': uuid.uuid4().hex},
+        {'punched_at': now.isoformat(), 'kind': 'out', 'client_id': uuid.uuid4().hex},
+    ]
+
+
+def _metrics_token(tenant, turn):
+    return {'token': settings.METRICS_TOKEN} if getattr(settings, 'METRICS_TOKEN', '') else {}
+
+
+SCENARIOS = [
+    Scenario('auth-login', 'POST', 'auth', lambda tenant, turn: {
+        'json': {'email': _employee_user(tenant, turn)[1], 'password': BENCH_PASSWORD},
+    }),
+    Scenario('auth-delete-user', 'DELETE', 'auth', lambda tenant, turn: {
+        'token': tenant.admin_token, 'json': {'emp_id': _pool(tenant.disposable_pool, turn)},
+    }),
+    # Rejected before any network call: measures the token parsing path only.
+    Scenario('auth-google', 'POST', 'google_oauth', lambda tenant, turn: {
+        'json': {'id_token': 'bench.invalid.token'},
+    }),
+    Scenario('auth-update-password', 'POST', 'update-password', lambda tenant, turn: {
+        'json': {'email': _employee_user(tenant, turn)[1], 'oldPassword': BENCH_PASSWORD, 'newPassword': BENCH_PASSWORD},
+    }),
+    Scenario('auth-reset-password', 'POST', 'reset-password', lambda tenant, turn: {
+        'json': {'email': _employee_user(tenant, turn)[1]},
+    }),
+    Scenario('auth-reset-otp', 'POST', 'reset-otp', _reset_otp),
+    Scenario('company-details-get', 'GET', 'company-details', lambda tenant, turn: {
+        'token': _employee_token(tenant, turn),
+    }),
+    Scenario('company-details-post', 'POST', 'company-details', lambda tenant, turn: {
+        'token': tenant.admin_token,
+        'json': {'ownerName': 'Bench', 'email': tenant.company_email, 'industry': 'IT', 'countryCode': '+91', 'size': '1000', 'phone': '9000000000'},
+    }),
+    Scenario('company-details-patch', 'PATCH', 'company-details', lambda tenant, turn: {
+        'token': tenant.admin_token, 'json': {'address': f'Bench street {turn}'},
+    }),
+    Scenario('policy-get', 'GET', 'company-policy', lambda tenant, turn: {
+        'token': _employee_token(tenant, turn),
+    }),
+    Scenario('policy-get-department', 'GET', 'company-policy', lambda tenant, turn: {
+        'token': tenant.admin_token, 'query': {'scope': 'department', 'scope_id': _pick(tenant.department_ids, turn)},
+    }),
+    Scenario('policy-post', 'POST', 'company-policy', lambda tenant, turn: {
+        'token': tenant.admin_token,
+        'json': {'upsert': True, 'policies': [
+            {'type': 'late', 'title': f'Late {turn}', 'details': {'grace_minutes': turn % 15}, 'department': _pick(tenant.department_ids, turn)},
+            {'type': 'overtime', 'title': f'Overtime {turn}', 'details': {'min_minutes': 30}, 'department': _pick(tenant.department_ids, turn)},
+        ]},
+    }),
+    Scenario('policy-patch', 'PATCH', 'company-policy', lambda tenant, turn: {
+        'token': tenant.admin_token, 'json': {'company': tenant.company_id, 'type': 'late', 'title': f'Late {turn}', 'details': {'grace_minutes': turn % 15}},
+    }),
+    Scenario('company-bootstrap', 'GET', 'company-bootstrap', lambda tenant, turn: {
+        'token': tenant.admin_token,
+    }),
+    Scenario('department-post', 'POST', 'department', lambda tenant, turn: {
+        'token': tenant.admin_token,
+        'json': {'company': tenant.company_id, 'name': f'Bench dept {turn}', 'parent': _pick(tenant.department_ids, turn), 'leave_allotments': LEAVE_TYPES},
+    }),
+    Scenario('department-patch', 'PATCH', 'department', lambda tenant, turn: {
+        'token': tenant.admin_token, 'json': {'id': tenant.department_ids[-1], 'head': _pick(tenant.employee_ids, turn)},
+    }),
+    Scenario('company-org-chart', 'GET', 'company-org-chart', lambda tenant, turn: {
+        'token': tenant.admin_token,
+    }),
+    Scenario('company-export', 'GET', 'company-export', lambda tenant, turn: {
+        'token': tenant.admin_token, 'kwargs': {'resource': 'employees'},
+    }),
+    Scenario('employee-directory', 'GET', 'employee-directory', lambda tenant, turn: {
+        'token': tenant.admin_token,
+    }),
+    Scenario('employee-import', 'POST', 'employee-import', lambda tenant, turn: {
+        'token': tenant.admin_token, 'multipart': {'file': _import_file(tenant, turn)},
+    }),
+    Scenario('attendance-punches', 'POST', 'attendance-punches', lambda tenant, turn: {
+        'token': _employee_token(tenant, turn), 'json': {'punches': _punches()},
+    }),
+    Scenario('attendance-daily', 'GET', 'attendance-daily', lambda tenant, turn: {
+        'token': tenant.admin_token,
+        'query': {'date_from': (timezone.localdate() - timedelta(days=ATTENDANCE_DAYS)).isoformat(), 'date_to': timezone.localdate().isoformat()},
+    }),
+    Scenario('leave-requests-get', 'GET', 'leave-requests', lambda tenant, turn: {
+        'token': tenant.admin_token,
+    }),
+    Scenario('leave-requests-post', 'POST', 'leave-requests', lambda tenant, turn: {
+        'token': _employee_token(tenant, turn),
+        'json': {'leave_type': 'casual', 'start_date': (date(2030, 1, 1) + timedelta(days=turn)).isoformat(), 'end_date': (date(2030, 1, 1) + timedelta(days=turn)).isoformat()},
+    }),
+    Scenario('leave-review', 'POST', 'leave-review', lambda tenant, turn: {
+        'token': tenant.admin_token, 'kwargs': {'request_id': _pool(tenant.review_pool, turn)}, 'json': {'action': 'approve'},
+    }),
+    Scenario('leave-balances', 'GET', 'leave-balances', lambda tenant, turn: {
+        'token': tenant.admin_token, 'query': {'employee': _pick(tenant.employee_ids, turn)},
+    }),
+    Scenario('payroll-runs-get', 'GET', 'payroll-runs', lambda tenant, turn: {
+        'token': tenant.admin_token,
+    }),
+    Scenario('payroll-runs-post', 'POST', 'payroll-runs', lambda tenant, turn: {
+        'token': tenant.admin_token, 'json': {'year': 2000 + turn // 12, 'month': turn % 12 + 1},
+    }),
+    Scenario('payroll-run-status', 'GET', 'payroll-run-status', lambda tenant, turn: {
+        'token': tenant.admin_token, 'kwargs': {'run_id': tenant.run_id},
+    }),
+    Scenario('payroll-compensation', 'PUT', 'payroll-compensation', lambda tenant, turn: {
+        'token': tenant.admin_token,
+        'json': [{'employee': employee_id, 'base_salary': str(30000 + turn)} for employee_id in tenant.employee_ids[:20]],
+    }),
+    Scenario('metrics', 'GET', 'metrics', _metrics_token),
+]
+
+
+def uncovered_routes(scenarios=SCENARIOS):
+    covered = {scenario.url_name for scenario in scenarios}
+    return sorted(pattern.name for pattern in api_urls.urlpatterns if pattern.name not in covered)
+
+
+def report(samples, statuses, queries, elapsed):
+    return {
+        **summarize(samples),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'queries_per_request': round(queries / len(samples), 2) if samples else 0.0,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def run_client(scenario, tenants, requests):
+    # Sequential requests through the Django test client, in this thread, so
+    # queries are counted exactly per request.
+    client = Client()
+    samples, statuses, queries = [], Counter(), 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        request = scenario.next_request(tenants)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {request.token}'} if request.token else {}
+        with count_queries() as counter:
+            with timed(samples):
+                response = client.generic(request.method, request.path, request.body, request.content_type, **headers)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+        queries += counter.count
+        statuses[response.status_code] += 1
+    return report(samples, statuses, queries, time.perf_counter() - started)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# In-process threaded WSGI server over the benchmark database.
+class BenchServer:
+    def __init__(self):
+        self.httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        self.httpd.set_app(WSGIHandler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def send_http(port, request):
+    # One connection per request; the development server closes most of them anyway.
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        headers = {'Host': BENCH_HOST, 'Content-Type': request.content_type}
+        if request.token:
+            headers['Authorization'] = f'Bearer {request.token}'
+        connection.request(request.method, request.path, body=request.body or None, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def run_http(port, scenario, tenants, requests, concurrency):
+    # Concurrent requests over real sockets. Queries come from the request
+    # instrumentation registry of the server, which runs in this process;
+    # queries of streamed bodies (exports) run after it records and are missed.
+    samples, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def worker():
+        request = scenario.next_request(tenants)
+        elapsed = []
+        try:
+            with timed(elapsed):
+                code = send_http(port, request)
+        except (OSError, http.client.HTTPException):
+            code = 'error'
+        with lock:
+            samples.extend(elapsed)
+            statuses[code] += 1
+
+    registry.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(requests)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    handled = sum(registry.requests.values())
+    queries = sum(registry.queries.values()) / handled * len(samples) if handled else 0
+    return report(samples, statuses, queries, elapsed)
+
+
+def run_threaded(scenario, tenants, requests, concurrency):
+    # WSGI-style concurrency: one test client and database connection per
+    # worker thread, like the threads of a gunicorn gthread worker.
+    samples, statuses = [], Counter()
+    lock = threading.Lock()
+    requests_of = [requests // concurrency + (index < requests % concurrency) for index in range(concurrency)]
+
+    def worker(count):
+        client = Client()
+        try:
+            for _ in range(count):
+                with lock:
+                    request = scenario.next_request(tenants)
+                elapsed = []
+                headers = {'HTTP_AUTHORIZATION': f'Bearer {request.token}'} if request.token else {}
+                with timed(elapsed):
+                    response = client.generic(request.method, request.path, request.body, request.content_type, **headers)
+                with lock:
+                    samples.extend(elapsed)
+                    statuses[response.status_code] += 1
+        finally:
+            connections.close_all()
+
+    registry.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, count) for count in requests_of if count]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    return report(samples, statuses, sum(registry.queries.values()), elapsed)
+
+
+def run_asgi(scenario, tenants, requests, concurrency):
+    # ASGI concurrency: up to `concurrency` requests in flight on one event
+    # loop through Django's ASGI handler. Sync views run on a thread per
+    # request, async views on the loop itself.
+    samples, statuses = [], Counter()
+
+    async def main():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            request = scenario.next_request(tenants)
+            headers = {'Authorization': f'Bearer {request.token}'} if request.token else {}
+            async with semaphore:
+                with timed(samples):
+                    response = await client.generic(
+                        request.method, request.path, request.body, request.content_type, headers=headers,
+                    )
+            statuses[response.status_code] += 1
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+
+    registry.reset()
+    started = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    return report(samples, statuses, sum(registry.queries.values()), elapsed)
+
+
+# Relative change of the latency percentiles and throughput between two
+# result files, per runner and scenario. Positive change means slower (or,
+# for queries, more queries per request).
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request', 'throughput_rps')
+
+
+def compare_results(baseline, current, threshold):
+    rows = []
+    for mode, scenarios in current.get('results', {}).items():
+        for name, result in scenarios.items():
+            previous = baseline.get('results', {}).get(mode, {}).get(name)
+            if previous is None:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = previous.get(metric, 0), result.get(metric, 0)
+                if metric == 'throughput_rps':
+                    change = (old - new) / old * 100 if old else 0.0
+                else:
+                    change = (new - old) / old * 100 if old else (100.0 if new else 0.0)
+                regressed = change > threshold
+                rows.append({
+                    'mode': mode, 'scenario': name, 'metric': metric,
+                    'baseline': old, 'current': new, 'change_pct': round(change, 1), 'regressed': regressed,
+                })
+    return rows
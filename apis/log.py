@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from django.conf import settings
+
+
+REDACTED = '[REDACTED]'
+SENSITIVE_KEYS = {'otp', 'authorization', 'bank_account', 'id_token'}
+SENSITIVE_PARTS = ('password', 'token', 'secret')
+
+_handlers = weakref.WeakSet()
+
+
+def _is_sensitive(key):
+    key = str(key).lower()
+    return key in SENSITIVE_KEYS or any(part in key for part in SENSITIVE_PARTS)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {key: REDACTED if _is_sensitive(key) else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def format_payload(payload, max_chars=None):
+    max_chars = max_chars or getattr(settings, 'LOG_PAYLOAD_MAX_CHARS', 2048)
+    payload = redact(payload)
+    text = json.dumps(payload, default=str)
+    if len(text) <= max_chars:
+        return payload
+    return {'truncated': True, 'size': len(text), 'preview': text[:max_chars]}
+
+
+def log_payload(logger, level, message, payload, sample_rate=None, **fields):
+    # Cheap checks only; redaction and encoding happen on the listener thread.
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate is None:
+        sample_rate = getattr(settings, 'LOG_PAYLOAD_SAMPLE_RATE', 0.0)
+    if sample_rate < 1 and random.random() >= sample_rate:
+        return
+    logger.log(level, message, extra={'payload': payload, 'fields': fields})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for extra in ('metrics', 'fields'):
+            if isinstance(getattr(record, extra, None), dict):
+                entry.update(record.__dict__[extra])
+        if hasattr(record, 'payload'):
+            entry['payload'] = format_payload(record.payload)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Waits for room instead of raising when the queue is full.
+        self.queue.put(self._sentinel)
+
+
+# Hands records to a bounded in-process queue; a QueueListener thread formats
+# and writes them, so logging on the request path is a queue put. Records are
+# dropped instead of blocking when the queue is full; the count is exported
+# as hrms_log_records_dropped_total.
+class BackgroundHandler(QueueHandler):
+    def __init__(self, stream=None, maxsize=None):
+        super().__init__(queue.Queue(maxsize=maxsize or getattr(settings, 'LOG_QUEUE_SIZE', 10000)))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.dropped = 0
+        self.listener = None
+        self.start()
+        _handlers.add(self)
+        atexit.register(self.stop)
+        # Worker processes forked after startup need their own writer thread.
+        os.register_at_fork(after_in_child=self.restart_in_child)
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def start(self):
+        self.listener = _Listener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def restart_in_child(self):
+        # The parent's listener thread does not exist in a forked child, and
+        # the copied queue may hold the parent's records or a lock taken
+        # mid-put: start over with a fresh queue.
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.listener = None
+        self.dropped = 0
+        self.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def prepare(self, record):
+        # Same-process queue: no need to pre-format or strip exc_info.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def prometheus_lines():
+    dropped = sum(handler.dropped for handler in list(_handlers))
+    return [
+        '# HELP hrms_log_records_dropped_total Log records dropped because the log queue was full.',
+        '# TYPE hrms_log_records_dropped_total counter',
+        f'hrms_log_records_dropped_total {dropped}',
+    ]
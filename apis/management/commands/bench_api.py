@@ -0,0 +1,141 @@
+import json
+import logging
+import subprocess
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from apis.bench import format_row
+from apis.loadtest import SCENARIOS, BenchServer, bench_database, seed_tenants, uncovered_routes, run_client, run_http, compare_results
+
+
+MODES = ('client', 'http')
+# Per-request log lines would drown the report; errors still show up in the
+# status breakdown of every scenario.
+QUIET_LOGGERS = ('apis.requests', 'apis.responses', 'django.request', 'authentication')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic tenants into a throwaway test database and benchmark every apis/v1 route through the '
+        'Django test client and a concurrent HTTP runner. Results can be written as JSON and compared with a previous run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=2)
+        parser.add_argument('--departments', type=int, default=12, help='Departments per company.')
+        parser.add_argument('--employees', type=int, default=500, help='Employees per company.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per scenario and runner.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent connections of the HTTP runner.')
+        parser.add_argument('--modes', default=','.join(MODES))
+        parser.add_argument('--scenarios', default='', help='Comma separated scenario names; all when empty.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--compare', help='Compare against a previous JSON result file.')
+        parser.add_argument('--threshold', type=float, default=20.0, help='Percent change reported as a regression.')
+        parser.add_argument('--fail-on-regression', action='store_true')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs.')
+        parser.add_argument('--throttle', action='store_true', help='Keep login and reset throttling on (every request comes from one IP).')
+
+    def handle(self, *args, **options):
+        modes = [mode for mode in options['modes'].split(',') if mode]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}")
+        scenarios = self.select_scenarios(options['scenarios'])
+        for route in uncovered_routes():
+            self.stderr.write(f"No scenario drives the '{route}' route.")
+
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.ERROR)
+        with bench_database(options['keepdb']), override_settings(THROTTLE_ENABLED=options['throttle']):
+            results = self.run(scenarios, modes, options)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+        if options['compare']:
+            self.compare(results, options)
+
+    def select_scenarios(self, names):
+        if not names:
+            return SCENARIOS
+        by_name = {scenario.name: scenario for scenario in SCENARIOS}
+        unknown = [name for name in names.split(',') if name not in by_name]
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+        return [by_name[name] for name in names.split(',')]
+
+    def run(self, scenarios, modes, options):
+        # Pools (pending leave requests, disposable users) cover every request
+        # of both runners.
+        tenants = seed_tenants(
+            options['companies'], options['departments'], options['employees'],
+            pool_size=options['requests'] * len(modes) // max(options['companies'], 1) + 1,
+        )
+        self.stdout.write(
+            f"Seeded {options['companies']} companies x {options['employees']} employees, "
+            f"{options['departments']} departments each; database={connection.vendor}."
+        )
+        results = {}
+        if 'client' in modes:
+            self.stdout.write('Test client (sequential):')
+            results['client'] = {}
+            for scenario in scenarios:
+                results['client'][scenario.name] = self.show(scenario.name, run_client(scenario, tenants, options['requests']))
+        if 'http' in modes:
+            self.stdout.write(f"HTTP runner (concurrency={options['concurrency']}):")
+            results['http'] = {}
+            with BenchServer() as server:
+                for scenario in scenarios:
+                    results['http'][scenario.name] = self.show(
+                        scenario.name, run_http(server.port, scenario, tenants, options['requests'], options['concurrency']),
+                    )
+        return {
+            'meta': {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'revision': git_revision(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+                'options': {
+                    key: options[key] for key in ('companies', 'departments', 'employees', 'requests', 'concurrency')
+                },
+            },
+            'results': results,
+        }
+
+    def show(self, name, result):
+        statuses = ' '.join(f'{code}:{count}' for code, count in result['statuses'].items())
+        self.stdout.write(
+            f"{format_row(name, result)} q/req={result['queries_per_request']:>6.1f} "
+            f"rps={result['throughput_rps']:>8.1f} [{statuses}]"
+        )
+        return result
+
+    def compare(self, results, options):
+        with open(options['compare']) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.stdout.write(f"Compared with {options['compare']} (revision {baseline.get('meta', {}).get('revision')}):")
+        regressions = 0
+        for row in compare_results(baseline, results, options['threshold']):
+            if row['metric'] == 'throughput_rps' and not row['regressed']:
+                continue
+            flag = 'REGRESSION' if row['regressed'] else ''
+            regressions += row['regressed']
+            self.stdout.write(
+                f"{row['mode']:<7} {row['scenario']:<28} {row['metric']:<20} "
+                f"{row['baseline']:>10} -> {row['current']:>10} ({row['change_pct']:+.1f}%) {flag}"
+            )
+        self.stdout.write(f"{regressions} regressions over {options['threshold']}%.")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} metrics regressed by more than {options['threshold']}%.")
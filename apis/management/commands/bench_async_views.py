@@ -0,0 +1,113 @@
+import json
+import logging
+import types
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import include, path
+from apis import urls as api_urls
+from apis.bench import format_row
+from apis.loadtest import SCENARIOS, bench_database, seed_tenants, run_threaded, run_asgi
+from authentication.views import AuthView, AsyncAuthView
+from company.views import CompanyView, PolicyView, BootstrapView, AsyncCompanyView, AsyncPolicyView, AsyncBootstrapView
+from .bench_api import QUIET_LOGGERS, git_revision
+
+
+# Read paths and login, which have an async-native implementation, by URL name.
+SYNC_VIEWS = {
+    'auth': AuthView,
+    'company-details': CompanyView,
+    'company-policy': PolicyView,
+    'company-bootstrap': BootstrapView,
+}
+ASYNC_VIEWS = {
+    'auth': AsyncAuthView,
+    'company-details': AsyncCompanyView,
+    'company-policy': AsyncPolicyView,
+    'company-bootstrap': AsyncBootstrapView,
+}
+SCENARIO_NAMES = ('auth-login', 'company-details-get', 'policy-get', 'policy-get-department', 'company-bootstrap')
+
+# (server, views): sync views in WSGI threads, the same views under ASGI, and
+# the async views under ASGI.
+VARIANTS = {
+    'wsgi-sync': (run_threaded, SYNC_VIEWS),
+    'asgi-sync': (run_asgi, SYNC_VIEWS),
+    'asgi-async': (run_asgi, ASYNC_VIEWS),
+}
+
+
+def variant_urlconf(views):
+    # apis/v1 with the benchmarked routes served by `views`, independent of the
+    # ASYNC_VIEWS setting.
+    module = types.ModuleType('bench_async_views_urls')
+    module.urlpatterns = [path('apis/v1/', include([
+        path(str(pattern.pattern), views[pattern.name].as_view(), name=pattern.name) if pattern.name in views else pattern
+        for pattern in api_urls.urlpatterns
+    ]))]
+    return module
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the sync and async-native login, company, policy and bootstrap views under concurrency: '
+        'sync views in WSGI threads, sync views under ASGI and async views under ASGI.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=2)
+        parser.add_argument('--departments', type=int, default=12, help='Departments per company.')
+        parser.add_argument('--employees', type=int, default=500, help='Employees per company.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario and variant.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight (threads for WSGI).')
+        parser.add_argument('--variants', default=','.join(VARIANTS))
+        parser.add_argument('--scenarios', default=','.join(SCENARIO_NAMES))
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the test database between runs.')
+
+    def handle(self, *args, **options):
+        variants = [variant for variant in options['variants'].split(',') if variant]
+        unknown = set(variants) - set(VARIANTS)
+        if unknown:
+            raise CommandError(f"Unknown variants: {', '.join(sorted(unknown))}")
+        names = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(names) - set(SCENARIO_NAMES)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(logging.ERROR)
+        # Throttling off: every request comes from one IP.
+        with bench_database(options['keepdb']), override_settings(THROTTLE_ENABLED=False):
+            tenants = seed_tenants(options['companies'], options['departments'], options['employees'], pool_size=1)
+            self.stdout.write(
+                f"Seeded {options['companies']} companies x {options['employees']} employees; "
+                f"database={connection.vendor} concurrency={options['concurrency']}."
+            )
+            results = {scenario.name: {} for scenario in scenarios}
+            for variant in variants:
+                runner, views = VARIANTS[variant]
+                self.stdout.write(f'{variant}:')
+                with override_settings(ROOT_URLCONF=variant_urlconf(views)):
+                    for scenario in scenarios:
+                        result = runner(scenario, tenants, options['requests'], options['concurrency'])
+                        results[scenario.name][variant] = self.show(scenario.name, result)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    'meta': {'revision': git_revision(), 'database': connection.vendor, 'options': {
+                        key: options[key] for key in ('companies', 'departments', 'employees', 'requests', 'concurrency')
+                    }},
+                    'results': results,
+                }, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+    def show(self, name, result):
+        statuses = ' '.join(f'{code}:{count}' for code, count in result['statuses'].items())
+        self.stdout.write(
+            f"  {format_row(name, result)} q/req={result['queries_per_request']:>6.1f} "
+            f"rps={result['throughput_rps']:>8.1f} [{statuses}]"
+        )
+        return result
@@ -0,0 +1,72 @@
+import threading
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from apis.bench import summarize, timed, format_row
+from apis.models import Company
+
+
+MODES = {
+    # CONN_MAX_AGE applied for the run; None keeps the configured value.
+    'per-request': 0,
+    'persistent': 600,
+    'configured': None,
+}
+
+
+def simulated_request():
+    # Same lifecycle as a real request: Django closes or keeps the connection
+    # on request_started/request_finished according to CONN_MAX_AGE.
+    signals.request_started.send(sender=None)
+    try:
+        Company.objects.filter(pk=0).exists()
+    finally:
+        signals.request_finished.send(sender=None)
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request latency with connections opened per request, kept persistent, or as configured (e.g. pooled).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per worker thread.')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--modes', default=','.join(MODES))
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        configured = settings_dict['CONN_MAX_AGE']
+        self.stdout.write(
+            f"backend={settings_dict['ENGINE']} conn_max_age={configured} "
+            f"health_checks={settings_dict.get('CONN_HEALTH_CHECKS')} pool={'pool' in settings_dict.get('OPTIONS', {})}"
+        )
+        try:
+            for mode in options['modes'].split(','):
+                max_age = MODES[mode]
+                settings_dict['CONN_MAX_AGE'] = configured if max_age is None else max_age
+                connections.close_all()
+                self.stdout.write(format_row(mode, summarize(self.run(options['requests'], options['concurrency']))))
+        finally:
+            settings_dict['CONN_MAX_AGE'] = configured
+            connections.close_all()
+
+    def run(self, requests, concurrency):
+        timings = []
+        lock = threading.Lock()
+
+        def worker():
+            samples = []
+            try:
+                for _ in range(requests):
+                    with timed(samples):
+                        simulated_request()
+            finally:
+                connections.close_all()
+            with lock:
+                timings.extend(samples)
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from apis.bench import summarize, timed, format_row
+from apis.loadtest import BENCH_PASSWORD
+from authentication.passwords import hash_executor
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure hash and verify latency of the configured password hashers (PASSWORD_HASHER_CLASSES with the '
+        'PASSWORD_* cost settings) and verify throughput inline, in threads and from async code.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hashers', default=','.join(settings.PASSWORD_HASHER_CLASSES))
+        parser.add_argument('--requests', type=int, default=20, help='Hashes or verifies per mode.')
+        parser.add_argument('--concurrency', type=int, default=settings.PASSWORD_HASH_THREADS)
+
+    def handle(self, *args, **options):
+        names = [name for name in options['hashers'].split(',') if name]
+        unknown = set(names) - set(settings.PASSWORD_HASHER_CLASSES)
+        if unknown:
+            raise CommandError(f"Unknown hashers: {', '.join(sorted(unknown))}")
+        self.stdout.write(f"preferred={settings.PASSWORD_HASHER} concurrency={options['concurrency']} hash_threads={settings.PASSWORD_HASH_THREADS}")
+        for name in names:
+            hasher = import_string(settings.PASSWORD_HASHER_CLASSES[name])()
+            try:
+                encoded = hasher.encode(BENCH_PASSWORD, hasher.salt())
+            except ValueError as exc:
+                # The hasher's library is not installed.
+                self.stderr.write(f'{name}: skipped ({exc})')
+                continue
+            parameters = ' '.join(f'{key}={value}' for key, value in hasher.decode(encoded).items() if key not in ('salt', 'hash'))
+            self.stdout.write(f'{name} ({parameters}):')
+            self.run(hasher, encoded, options['requests'], options['concurrency'])
+
+    def run(self, hasher, encoded, requests, concurrency):
+        samples = []
+        for _ in range(requests):
+            with timed(samples):
+                hasher.encode(BENCH_PASSWORD, hasher.salt())
+        self.show('hash', samples)
+
+        def verify():
+            elapsed = []
+            with timed(elapsed):
+                assert hasher.verify(BENCH_PASSWORD, encoded)
+            return elapsed[0]
+
+        started = time.perf_counter()
+        samples = [verify() for _ in range(requests)]
+        self.show('verify inline', samples, time.perf_counter() - started)
+
+        # What a gthread worker does under a login burst.
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(lambda _: verify(), range(requests)))
+        self.show('verify threads', samples, time.perf_counter() - started)
+
+        # Async views: sync_to_async (as AbstractBaseUser.acheck_password
+        # does) queues every hash on the one thread-sensitive thread, the
+        # hashing pool runs them side by side.
+        async def gather(call):
+            return await asyncio.gather(*(call() for _ in range(requests)))
+
+        async def main(call):
+            started = time.perf_counter()
+            samples = await gather(call)
+            return samples, time.perf_counter() - started
+
+        self.show('verify async sync_to_async', *asyncio.run(main(sync_to_async(verify))))
+        loop_call = lambda: asyncio.get_running_loop().run_in_executor(hash_executor(), verify)
+        self.show('verify async hash pool', *asyncio.run(main(loop_call)))
+
+    def show(self, label, samples, elapsed=None):
+        line = f'  {format_row(label, summarize(samples))}'
+        if elapsed:
+            line += f' rps={len(samples) / elapsed:>8.1f}'
+        self.stdout.write(line)
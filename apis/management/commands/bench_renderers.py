@@ -0,0 +1,93 @@
+from datetime import date, datetime, timezone
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from apis.bench import summarize, timed, format_row
+from apis.models import Company, CustomUser, Employee
+from apis.renderers import FastJSONRenderer, orjson
+from company.models import Department, Policy
+from company.serializers import CompanyInfoSerializer, PolicySerializer
+from employee.serializers import EmployeeDirectorySerializer
+
+
+def envelope(data):
+    return {"status": 200, "success": True, "data": data}
+
+
+def sample_policies(count):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        Policy(
+            id=index, company_id=1, department_id=index % 7 or None, employee_id=None,
+            type=Policy.POLICY_TYPE_CHOICES[index % 6][0], title=f'Policy {index}',
+            details={
+                'rules': [{'day': day, 'start': '09:00', 'end': '18:00', 'grace_minutes': 10} for day in range(7)],
+                'notes': 'Applies to all permanent staff.' * 3,
+                'thresholds': {'late': 3, 'half_day': 5, 'multiplier': 1.5},
+            },
+            effective_date=date(2025, 1, 1), created_at=now, updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def sample_employees(count):
+    # Related rows are attached in memory so serializing never hits the database.
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    departments = [Department(id=index + 1, company_id=1, name=f'Department {index + 1}') for index in range(7)]
+    return [
+        Employee(
+            id=index, employee_id=f'E{index}', user=CustomUser(id=index, email=f'asha.{index}@acme.test'), company_id=1,
+            department=departments[index % 7], first_name='Asha', last_name='Verma', employee_type='office',
+            joining_date=date(2024, 4, 1), phone='9876543210', address='12 MG Road, Bengaluru', overtime_eligible=True,
+            created_at=now, updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSONRenderer with FastJSONRenderer, and ListSerializer with PlainListSerializer, on representative payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write('orjson is not installed; FastJSONRenderer falls back to the stdlib renderer.')
+        samples = options['samples']
+        company = Company(id=1, name='Acme', ownerName='Owner', email='owner@acme.test', industry='it', size='50-100', phone='9876543210')
+        policies = sample_policies(50)
+        employees = sample_employees(200)
+
+        class DefaultListPolicySerializer(PolicySerializer):
+            class Meta(PolicySerializer.Meta):
+                list_serializer_class = serializers.ListSerializer
+
+        class DefaultListEmployeeSerializer(EmployeeDirectorySerializer):
+            class Meta(EmployeeDirectorySerializer.Meta):
+                list_serializer_class = serializers.ListSerializer
+
+        for label, plain, default in (
+            ('policies x50', lambda: PolicySerializer(policies, many=True).data, lambda: DefaultListPolicySerializer(policies, many=True).data),
+            ('employees x200', lambda: EmployeeDirectorySerializer(employees, many=True).data, lambda: DefaultListEmployeeSerializer(employees, many=True).data),
+        ):
+            for name, build in (('ListSerializer', default), ('PlainListSerializer', plain)):
+                timings = []
+                for _ in range(samples):
+                    with timed(timings):
+                        build()
+                self.stdout.write(format_row(f'serialize {label} {name}', summarize(timings)))
+
+        payloads = {
+            'company': envelope({'company': CompanyInfoSerializer(company).data, 'message': 'Company details fetched successfully.'}),
+            'policies x50': envelope({'policies': PolicySerializer(policies, many=True).data, 'message': 'Policies fetched successfully.'}),
+            'employees x200': envelope({'employees': EmployeeDirectorySerializer(employees, many=True).data, 'next_cursor': None}),
+        }
+        for label, payload in payloads.items():
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                timings = []
+                for _ in range(samples):
+                    with timed(timings):
+                        body = renderer.render(payload)
+                self.stdout.write(format_row(f'render {label} {type(renderer).__name__}', summarize(timings)) + f' bytes={len(body)}')
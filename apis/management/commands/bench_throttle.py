@@ -0,0 +1,81 @@
+import logging
+import time
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from apis.bench import summarize, timed, format_row
+from apis.loadtest import BENCH_PASSWORD, bench_database, seed_tenants
+from apis.throttling import check_throttle
+from mailer.models import OutboundEmail
+from .bench_api import QUIET_LOGGERS
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate credential stuffing, password guessing and OTP floods against the throttled auth endpoints '
+        'and measure the overhead of the throttle on allowed requests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200)
+        parser.add_argument('--burst', type=int, default=200, help='Requests per simulated burst.')
+        parser.add_argument('--checks', type=int, default=2000, help='Throttle checks for the overhead measurement.')
+
+    def handle(self, *args, **options):
+        for name in QUIET_LOGGERS + ('apis.throttling',):
+            logging.getLogger(name).setLevel(logging.ERROR)
+        self.stdout.write(f"cache={settings.CACHES['default']['BACKEND']} rates={settings.THROTTLE_RATES}")
+        with bench_database(), override_settings(THROTTLE_ENABLED=True):
+            tenant = seed_tenants(1, 4, options['employees'], pool_size=1)[0]
+            self.stdout.write(f'Seeded {options["employees"]} employees; database={connection.vendor}.')
+            emails = [email for _, email in tenant.employee_users]
+            burst = options['burst']
+            login, reset = reverse('auth'), reverse('reset-password')
+
+            # One address cycling through many accounts with a wrong password.
+            self.burst('credential stuffing (1 ip, many emails)', burst, lambda turn: (
+                login, {'email': emails[turn % len(emails)], 'password': 'wrong'}, '203.0.113.1',
+            ))
+            # Many addresses guessing the password of one account.
+            self.burst('password guessing (many ips, 1 email)', burst, lambda turn: (
+                login, {'email': emails[0], 'password': f'guess-{turn}'}, f'198.51.{turn // 250}.{turn % 250}',
+            ))
+            # A real user logging in now and then from their own address.
+            self.burst('regular logins (1 ip per user)', min(burst, len(emails)), lambda turn: (
+                login, {'email': emails[turn], 'password': BENCH_PASSWORD}, f'192.0.{turn // 250}.{turn % 250}',
+            ))
+            mails = OutboundEmail.objects.count()
+            self.burst('otp flood (many ips, 1 email)', burst, lambda turn: (
+                reset, {'email': emails[1]}, f'100.64.{turn // 250}.{turn % 250}',
+            ))
+            self.stdout.write(f'  otp mails queued: {OutboundEmail.objects.count() - mails}')
+
+            self.overhead(options['checks'])
+
+    def burst(self, label, requests, build):
+        client = Client()
+        samples, statuses = [], Counter()
+        started = time.perf_counter()
+        for turn in range(requests):
+            path, body, address = build(turn)
+            with timed(samples):
+                response = client.post(path, body, content_type='application/json', REMOTE_ADDR=address)
+            statuses[response.status_code] += 1
+        elapsed = time.perf_counter() - started
+        breakdown = ' '.join(f'{code}:{count}' for code, count in sorted(statuses.items()))
+        self.stdout.write(f'{label}:')
+        self.stdout.write(f'  {format_row("requests", summarize(samples))} elapsed={elapsed:.1f}s [{breakdown}]')
+
+    def overhead(self, checks):
+        # Allowed requests only: every check uses fresh identities.
+        samples = []
+        run = uuid.uuid4().hex
+        for turn in range(checks):
+            with timed(samples):
+                check_throttle('login', ip=f'{run}-{turn}', email=f'{run}-{turn}@bench.invalid')
+        self.stdout.write(f'  {format_row("throttle check (allowed)", summarize(samples))}')
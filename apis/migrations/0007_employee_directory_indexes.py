@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0006_alter_employee_department_alter_employee_documents_and_more'),
+        ('company', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['company', 'id'], name='apis_employ_company_7f0c07_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['company', 'department', 'id'], name='apis_employ_company_f48236_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:41
+
+import apis.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0008_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='time_zone',
+            field=models.CharField(default=apis.models.default_time_zone, max_length=64),
+        ),
+    ]
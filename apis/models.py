@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 import uuid
 
+
+def default_time_zone():
+    return settings.COMPANY_DEFAULT_TIME_ZONE
+
 class CustomUser(AbstractUser):
     USER_TYPE_CHOICES = (
         ('admin', 'Company Admin'),
@@ -31,6 +36,8 @@ class Company(models.Model):
     logo = models.ImageField(upload_to='company_logos/', null=True, blank=True)
     tax_id = models.CharField(max_length=50, blank=True, null=True)
     website = models.URLField(blank=True, null=True)
+    # IANA name; shift times in policies and punch dates are read in it.
+    time_zone = models.CharField(max_length=64, default=default_time_zone)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -63,4 +70,10 @@ class Employee(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.first_name} {self.last_name} ({self.employee_id})"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name} ({self.employee_id})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'id']),
+            models.Index(fields=['company', 'department', 'id']),
+        ]
\ No newline at end of file
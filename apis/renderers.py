@@ -0,0 +1,85 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+    # orjson writes datetimes, dates and times as isoformat() does; OPT_UTC_Z
+    # gives the "Z" suffix DRF uses for a zero offset. Dataclasses are handed
+    # to _default like the stock encoder.
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_PASSTHROUGH_DATACLASS
+except ImportError:
+    orjson = None
+
+
+_encoder = JSONEncoder()
+
+
+class _NeedsStockRenderer(Exception):
+    pass
+
+
+def _default(obj):
+    # Whatever orjson does not handle natively (Decimal, UUID, lazy strings,
+    # ...) goes through DRF's encoder so output matches the stock renderer.
+    # A Decimal becomes a float here, the one place this renderer sees floats
+    # it did not get from the payload: hand off the ones orjson would write
+    # differently (NaN/Infinity as null, 1e20 without Python's exponent
+    # style).
+    value = _encoder.default(obj)
+    if isinstance(value, float) and value and not 1e-4 <= abs(value) < 1e16:
+        raise _NeedsStockRenderer
+    return value
+
+
+# Renders the response envelope in one orjson call, byte for byte what DRF's
+# JSONRenderer would write. Payloads orjson cannot write the same way (indent,
+# integers past 64 bits, divergent Decimals, encoder errors) and a missing
+# orjson go through JSONRenderer itself; those are found when orjson raises,
+# the payload is never walked. Plain floats are written by orjson: the same
+# value, but NaN/Infinity become null rather than an error and floats outside
+# [1e-4, 1e16) are spelled 1e16 / 0.00001 rather than 1e+16 / 1e-05. No
+# serializer here has a FloatField, so those only come from JSON details.
+class FastJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def __init__(self):
+        self.fallback = JSONRenderer()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or not self.fallback.compact
+            or self.fallback.ensure_ascii
+            or self.fallback.get_indent(accepted_media_type or '', renderer_context or {}) is not None
+        ):
+            return self.fallback.render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return self.fallback.render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two so the output stays valid JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = FastJSONRenderer
+
+    def __init__(self):
+        self.fallback = JSONParser()
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return self.fallback.parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
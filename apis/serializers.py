@@ -1,8 +1,47 @@
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .models import Employee
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token['role'] = user.user_type
-        return token
\ No newline at end of file
+        # Tenant claims let views authenticate statelessly (see apis.authentication).
+        token['company_id'] = user.company_id
+        employee_id, department_id = Employee.objects.filter(user_id=user.pk).values_list('id', 'department_id').first() or (None, None)
+        token['employee_id'] = employee_id
+        token['department_id'] = department_id
+        return token
+
+
+# List serializer for read-only list endpoints: resolves the child's readable
+# fields once and returns plain dicts in a plain list instead of going
+# through ReturnDict/ReturnList. Set as Meta.list_serializer_class.
+class PlainListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        fields = [(field.field_name, field) for field in self.child._readable_fields]
+        rows = []
+        for instance in iterable:
+            row = {}
+            for name, field in fields:
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                row[name] = None if check_for_none is None else field.to_representation(attribute)
+            rows.append(row)
+        return rows
+
+    @property
+    def data(self):
+        if self.instance is None:
+            return super().data
+        if not hasattr(self, '_data'):
+            self._data = self.to_representation(self.instance)
+        return self._data
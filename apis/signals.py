@@ -0,0 +1,61 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_cached_users, revoke_user_tokens
+from .models import CustomUser, Company, Employee
+
+
+# Columns that stateless tokens depend on (role and company claims) or that
+# must end a session right away.
+TOKEN_FIELDS = ('user_type', 'company_id', 'is_active')
+
+
+@receiver(pre_save, sender=CustomUser)
+def revoke_changed_user_tokens(sender, instance, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'user_type', 'company', 'company_id', 'is_active'} & set(update_fields):
+        return
+    stored = CustomUser.objects.filter(pk=instance.pk).values_list(*TOKEN_FIELDS).first()
+    if stored is not None and stored != tuple(getattr(instance, field) for field in TOKEN_FIELDS):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_cached_users(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def drop_cached_company_users(sender, instance, **kwargs):
+    invalidate_cached_users(*CustomUser.objects.filter(company=instance).values_list('id', flat=True))
+
+
+# The employee and department claims go stale when a user gains or loses an
+# employee row or moves to another department.
+@receiver(pre_save, sender=Employee)
+def revoke_moved_employee_tokens(sender, instance, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'department', 'department_id'} & set(update_fields):
+        return
+    stored = Employee.objects.filter(pk=instance.pk).values_list('department_id', flat=True).first()
+    if stored != instance.department_id:
+        revoke_user_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=Employee)
+def revoke_new_employee_tokens(sender, instance, created, **kwargs):
+    if created:
+        revoke_user_tokens(instance.user_id)
+
+
+@receiver(post_delete, sender=Employee)
+def revoke_deleted_employee_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.user_id)
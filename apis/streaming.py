@@ -0,0 +1,83 @@
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[field]) for field in fields])
+
+
+def encode_jsonl(fields, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode({field: row[field] for field in fields}) + '\n'
+
+
+ENCODERS = {
+    'csv': encode_csv,
+    'jsonl': encode_jsonl,
+}
+
+
+def buffered(chunks, size=CHUNK_SIZE):
+    # Groups the per-row strings into larger byte chunks for the socket.
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer).encode()
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Streams `rows` (dicts, typically from .values().iterator()) without
+# materialising them, encoded as CSV or JSON lines and optionally gzipped.
+def export_response(rows, fields, filename, export_format='csv', compress=False):
+    chunks = buffered(ENCODERS[export_format](fields, rows))
+    if compress:
+        chunks = gzipped(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    return response
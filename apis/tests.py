@@ -1,3 +1,300 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import json
+import logging
+import threading
+import uuid
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from .authentication import StatelessJWTAuthentication, TokenPrincipal, get_cached_user
+from mailer.models import OutboundEmail
+from .log import BackgroundHandler, prometheus_lines as log_metric_lines
+from .models import Company, CustomUser
+from .renderers import FastJSONRenderer
+from .serializers import MyTokenObtainPairSerializer
+from .throttling import check_throttle, client_ip
 
-# Create your tests here.
+
+class StatelessAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['local'].clear()
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        self.user = CustomUser.objects.create_user(
+            username='admin', email='admin@acme.test', password='secret', user_type='admin', company=self.company,
+        )
+        self.authentication = StatelessJWTAuthentication()
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.authentication.authenticate(request)
+
+    def issue(self):
+        # Issued a second earlier: revocations have a one second resolution.
+        issued_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+        with mock.patch('rest_framework_simplejwt.tokens.aware_utcnow', return_value=issued_at):
+            return str(MyTokenObtainPairSerializer.get_token(self.user).access_token)
+
+    def test_claims_token_authenticates_without_user_lookup(self):
+        token = self.issue()
+        with CaptureQueriesContext(connection) as queries:
+            user, _ = self.authenticate(token)
+        self.assertFalse([query for query in queries if 'apis_customuser' in query['sql']])
+        self.assertIsInstance(user, TokenPrincipal)
+        self.assertEqual(user.company_id, self.company.id)
+        # The revocation lookup is then answered by the local tier, whatever
+        # the shared cache backend is.
+        with self.assertNumQueries(0):
+            self.authenticate(token)
+
+    def test_demoting_revokes_issued_tokens(self):
+        token = self.issue()
+        self.user.user_type = 'employee'
+        self.user.save()
+        with self.assertRaises(Exception):
+            self.authenticate(token)
+        self.assertIsNotNone(self.authenticate(str(MyTokenObtainPairSerializer.get_token(self.user).access_token)))
+
+    def test_deactivating_and_deleting_revoke_issued_tokens(self):
+        token = self.issue()
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(Exception):
+            self.authenticate(token)
+
+        other = CustomUser.objects.create_user(username='emp', email='emp@acme.test', password='secret', company=self.company)
+        self.user = other
+        token = self.issue()
+        other.delete()
+        with self.assertRaises(Exception):
+            self.authenticate(token)
+
+    def test_unrelated_saves_keep_tokens(self):
+        token = self.issue()
+        self.user.first_name = 'Renamed'
+        self.user.set_password('changed')
+        self.user.save()
+        self.assertIsNotNone(self.authenticate(token))
+
+    def test_cached_user_leaves_out_the_password_hash(self):
+        get_cached_user(self.user.id)
+        self.assertNotIn(self.user.password, repr(cache.get(f'jwt_user_{self.user.id}')))
+        with CaptureQueriesContext(connection) as queries:
+            user = get_cached_user(self.user.id)
+        self.assertFalse([query for query in queries if 'apis_customuser' in query['sql']])
+        self.assertEqual((user.email, user.company_id, user.user_type), ('admin@acme.test', self.company.id, 'admin'))
+        self.assertTrue(user.check_password('secret'))
+
+
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get('/apis/v1/metrics/').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_mail_gauges_are_cached_between_scrapes(self):
+        self.assertEqual(self.client.get('/apis/v1/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        response = self.client.get('/apis/v1/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertContains(response, 'hrms_mail_queued 0')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/apis/v1/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertFalse([query for query in queries if 'mailer_outboundemail' in query['sql']])
+        self.assertContains(response, 'hrms_log_records_dropped_total ')
+
+    @override_settings(METRICS_TOKEN='scrape-me', METRICS_MAIL_CACHE_SECONDS=0)
+    def test_delivery_counters_are_read_from_the_outbox(self):
+        # The worker sending mail is another process; its outcomes are rows.
+        queued_at = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        for status, attempts, delay in (('sent', 1, 30), ('sent', 2, 90), ('failed', 5, None), ('queued', 1, None), ('queued', 0, None)):
+            OutboundEmail.objects.create(subject='Hello', body='Hi', from_email='hr@acme.test', recipients=['x@acme.test'], status=status,
+                                         attempts=attempts, sent_at=queued_at + datetime.timedelta(seconds=delay) if delay else None)
+        OutboundEmail.objects.update(created_at=queued_at)
+        response = self.client.get('/apis/v1/metrics/', HTTP_AUTHORIZATION='Bearer scrape-me')
+        for line in ('hrms_mail_sent_total 2', 'hrms_mail_send_failures_total 7', 'hrms_mail_queued 2',
+                     'hrms_mail_queue_latency_seconds_sum 120.0', 'hrms_mail_queue_latency_seconds_count 2'):
+            self.assertContains(response, f'{line}\n')
+
+
+class BackgroundHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.handler = BackgroundHandler(stream=self.stream, maxsize=1)
+        self.addCleanup(self.handler.stop)
+
+    def record(self, message):
+        return logging.LogRecord('test', logging.INFO, __file__, 0, message, None, None)
+
+    def test_full_queue_drops_are_exported(self):
+        before = sum(int(line.split()[-1]) for line in log_metric_lines() if not line.startswith('#'))
+        self.handler.stop()
+        for index in range(3):
+            self.handler.emit(self.record(f'record {index}'))
+        self.assertEqual(self.handler.dropped, 2)
+        self.assertIn(f'hrms_log_records_dropped_total {before + 2}', log_metric_lines())
+
+    def test_forked_child_starts_on_a_fresh_queue(self):
+        self.handler.stop()
+        self.handler.emit(self.record('from the parent'))
+        parent_queue = self.handler.queue
+        self.handler.restart_in_child()
+        self.assertIsNot(self.handler.queue, parent_queue)
+        self.handler.emit(self.record('from the child'))
+        self.handler.stop()
+        self.assertEqual(self.stream.getvalue(), 'from the child\n')
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_matches_the_stock_renderer(self):
+        self.assertSameOutput({
+            'status': 'success',
+            'data': {
+                'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+                'updated_at': datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone(datetime.timedelta(hours=5, minutes=30))),
+                'naive': datetime.datetime(2026, 1, 2, 3, 4, 5),
+                'date': datetime.date(2026, 1, 2), 'time': datetime.time(9, 30, 15, 250000),
+                'salary': decimal.Decimal('1234.50'), 'id': uuid.UUID(int=7), 'label': gettext_lazy('Active'),
+                'rates': [0.1, 2.5, 1e15, 0.0], 'counts': {1: 2, 3: None}, 'flags': (True, False),
+                'text': 'Zoë\u2028line\u2029end',
+            },
+        })
+        self.assertSameOutput(None)
+
+    def test_divergent_values_go_through_the_stock_renderer(self):
+        for value in (decimal.Decimal('1e20'), decimal.Decimal('1e-05'), [2 ** 70]):
+            self.assertSameOutput({'value': value})
+        for value in (decimal.Decimal('NaN'), decimal.Decimal('Infinity')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'value': value})
+
+    def test_plain_floats_keep_their_value(self):
+        # Left to orjson: only the spelling differs, and non-finite ones are null.
+        data = {'values': [1e16, 1e-05, 1.5e300]}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), data)
+        self.assertEqual(FastJSONRenderer().render({'value': float('nan')}), b'{"value":null}')
+
+    def test_indent_and_unknown_types(self):
+        self.assertSameOutput({'a': [1, {'b': 2}]}, 'application/json; indent=4')
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({'value': object()})
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'db': {'BACKEND': 'apis.cache_backends.DatabaseCache', 'LOCATION': 'test_cache_table'},
+})
+class DatabaseCacheTests(TestCase):
+    def setUp(self):
+        call_command('createcachetable', 'test_cache_table', database='default', verbosity=0)
+        self.cache = caches['db']
+
+    def expires(self, key):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT expires FROM test_cache_table WHERE cache_key = %s', [self.cache.make_key(key)])
+            return cursor.fetchone()[0]
+
+    def test_incr_keeps_the_expiry(self):
+        self.cache.add('counter', 1, timeout=3600)
+        expires = self.expires('counter')
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.decr('counter', 5), -3)
+        self.assertEqual(async_to_sync(self.cache.aincr)('counter', 10), 7)
+        self.assertEqual((self.cache.get('counter'), self.expires('counter')), (7, expires))
+
+    def test_missing_or_expired_keys_raise(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('stale', 1, timeout=-1)
+        with self.assertRaises(ValueError):
+            self.cache.incr('stale')
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    THROTTLE_ENABLED=True,
+    THROTTLE_RATES={'login': {'ip': '100/m', 'email': '3/m'}, 'login-failed': {'company': '4/m'}},
+)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        for name in ('ann', 'bob', 'cid'):
+            CustomUser.objects.create_user(username=name, email=f'{name}@acme.test', password='secret', company=self.company)
+        # Start of a fixed window, so the sliding weight is known.
+        self.now = 1_800_000_000.0
+        clock = mock.patch('apis.throttling.time')
+        self.addCleanup(clock.stop)
+        clock.start().time.side_effect = lambda: self.now
+
+    def login(self, email, password='wrong', path='/apis/v1/auth/user/', **extra):
+        body = {'email': email, 'password': password, 'oldPassword': password, 'newPassword': password}
+        return self.client.post(path, body, content_type='application/json', **extra)
+
+    def test_burst_is_cut_off_and_rejections_are_not_counted(self):
+        self.assertEqual([self.login('ann@acme.test').status_code for _ in range(3)], [400] * 3)
+        for _ in range(5):
+            response = self.login('ann@acme.test', 'secret')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '61')
+        # Only the three allowed requests were counted: at the middle of the
+        # next window they weigh 3 * 0.5, leaving room for two more requests.
+        self.now += 90
+        self.assertEqual([self.login('ann@acme.test', 'secret').status_code for _ in range(2)], [200] * 2)
+        response = self.login('ann@acme.test', 'secret')
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '11'))
+        self.now += 10
+        self.assertEqual(self.login('ann@acme.test', 'secret').status_code, 429)
+        self.now += 1
+        self.assertEqual(self.login('ann@acme.test', 'secret').status_code, 200)
+
+    def test_update_password_shares_the_login_budget(self):
+        for _ in range(3):
+            self.login('bob@acme.test')
+        self.assertEqual(self.login('bob@acme.test', 'secret', path='/apis/v1/auth/update-password/').status_code, 429)
+
+    @override_settings(THROTTLE_RATES={'login': {'email': '10/m'}, 'login-failed': {'company': '4/m'}})
+    def test_company_budget_counts_failed_passwords_only(self):
+        for _ in range(6):
+            self.assertEqual(self.login('ann@acme.test', 'secret').status_code, 200)
+        self.assertEqual([self.login(email).status_code for email in ('ann@acme.test', 'bob@acme.test', 'cid@acme.test')], [400] * 3)
+        self.assertEqual(self.login('bob@acme.test', path='/apis/v1/auth/update-password/').status_code, 400)
+        self.assertEqual(self.login('cid@acme.test', 'secret').status_code, 429)
+
+    def test_concurrent_burst_gets_exactly_the_budget(self):
+        results = []
+        barrier = threading.Barrier(12)
+
+        def attempt():
+            barrier.wait()
+            results.append(check_throttle('login', email='eve@acme.test'))
+
+        threads = [threading.Thread(target=attempt) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(None), 3)
+
+    def test_forwarded_for_is_only_trusted_behind_proxies(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7')
+        self.assertEqual(client_ip(request), '10.0.0.2')
+        with override_settings(THROTTLE_TRUSTED_PROXIES=1):
+            self.assertEqual(client_ip(request), '203.0.113.7')
+        with override_settings(THROTTLE_TRUSTED_PROXIES=2):
+            self.assertEqual(client_ip(request), '6.6.6.6')
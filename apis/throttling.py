@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import re
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.settings import api_settings
+from .cache import shared_cache
+
+
+logger = logging.getLogger('apis.throttling')
+
+_RATE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\w*\s*$')
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # "10/m", "5/10m", "100/hour" -> (requests, window seconds)
+    match = _RATE.match(rate)
+    if match is None:
+        raise ValueError(f'Invalid throttle rate: {rate!r}')
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[period]
+
+
+def client_ip(request):
+    # REMOTE_ADDR, unless the app runs behind trusted proxies
+    # (THROTTLE_TRUSTED_PROXIES, or REST_FRAMEWORK['NUM_PROXIES']): then the
+    # X-Forwarded-For entry appended by the outermost of them. Entries further
+    # left come from the client and can be spoofed, so without trusted
+    # proxies the header is ignored.
+    proxies = getattr(settings, 'THROTTLE_TRUSTED_PROXIES', 0) or api_settings.NUM_PROXIES or 0
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+# Sliding-window counter per (scope, dimension, identity): the previous fixed
+# window's count weighted by how much of it still overlaps the sliding window,
+# plus the current window's count. Two counters per identity: the previous
+# one read in one get_many, the current one incremented.
+class Budget:
+    __slots__ = ('dimension', 'limit', 'window', 'previous_key', 'current_key', 'elapsed')
+
+    def __init__(self, scope, dimension, identity, rate, now):
+        self.dimension = dimension
+        self.limit, self.window = parse_rate(rate)
+        digest = hashlib.blake2b(str(identity).lower().encode(), digest_size=12).hexdigest()
+        index, elapsed = divmod(now, self.window)
+        self.elapsed = elapsed
+        self.previous_key = f'throttle:{scope}:{dimension}:{digest}:{int(index) - 1}'
+        self.current_key = f'throttle:{scope}:{dimension}:{digest}:{int(index)}'
+
+    def retry_after(self, counts):
+        previous = counts.get(self.previous_key, 0)
+        current = counts.get(self.current_key, 0)
+        weight = 1 - self.elapsed / self.window
+        if previous * weight + current < self.limit:
+            return None
+        if current < self.limit:
+            # Until enough of the previous window slid out.
+            wait = (weight - (self.limit - current) / previous) * self.window
+        else:
+            # Into the next window, until enough of this one slid out.
+            wait = self.window - self.elapsed + (1 - self.limit / current) * self.window
+        # First whole second past the point where the request fits.
+        return int(round(wait, 6)) + 1
+
+
+def _budgets(scope, identities):
+    if not settings.THROTTLE_ENABLED:
+        return []
+    rates = settings.THROTTLE_RATES.get(scope, {})
+    now = time.time()
+    return [
+        Budget(scope, dimension, identity, rates[dimension], now)
+        for dimension, identity in identities.items()
+        if identity not in (None, '') and rates.get(dimension)
+    ]
+
+
+def _rejected(scope, budgets, counts):
+    waits = [(budget.retry_after(counts), budget.dimension) for budget in budgets]
+    waits = [(wait, dimension) for wait, dimension in waits if wait is not None]
+    if not waits:
+        return None
+    wait, dimension = max(waits)
+    logger.warning("throttled scope=%s dimension=%s retry_after=%d", scope, dimension, wait)
+    return wait
+
+
+def _increment(cache, budget):
+    try:
+        return cache.incr(budget.current_key)
+    except ValueError:
+        if cache.add(budget.current_key, 1, timeout=budget.window * 2):
+            return 1
+        return cache.incr(budget.current_key)
+
+
+def _decrement(cache, budget):
+    try:
+        cache.decr(budget.current_key)
+    except ValueError:
+        pass
+
+
+# Counters rely on the shared cache's incr being atomic (see CACHE_BACKENDS
+# in settings): every request increments first and is judged on the value it
+# got back, so a concurrent burst cannot pass on one shared reading.
+def check_throttle(scope, **identities):
+    # Counts one request of `scope` against the budget of every identity
+    # given (ip=..., email=..., company=...). Returns the seconds to wait when
+    # any budget is used up (the increments are then taken back, so rejected
+    # requests are not counted), None when the request may go ahead. Cache
+    # failures let requests through.
+    budgets = _budgets(scope, identities)
+    if not budgets:
+        return None
+    cache = shared_cache()
+    try:
+        counts = cache.get_many([budget.previous_key for budget in budgets])
+        for budget in budgets:
+            # Requests before this one in the current window.
+            counts[budget.current_key] = _increment(cache, budget) - 1
+        wait = _rejected(scope, budgets, counts)
+        if wait is not None:
+            for budget in budgets:
+                _decrement(cache, budget)
+        return wait
+    except Exception:
+        logger.exception("throttle check failed scope=%s", scope)
+        return None
+
+
+def peek_throttle(scope, **identities):
+    # Seconds to wait when a budget of `scope` is used up, without counting
+    # anything; pair with record_throttle() for budgets of failures only.
+    budgets = _budgets(scope, identities)
+    if not budgets:
+        return None
+    try:
+        counts = shared_cache().get_many([key for budget in budgets for key in (budget.previous_key, budget.current_key)])
+        return _rejected(scope, budgets, counts)
+    except Exception:
+        logger.exception("throttle check failed scope=%s", scope)
+        return None
+
+
+def record_throttle(scope, **identities):
+    budgets = _budgets(scope, identities)
+    cache = shared_cache()
+    try:
+        for budget in budgets:
+            _increment(cache, budget)
+    except Exception:
+        logger.exception("throttle record failed scope=%s", scope)
+
+
+# BaseCache.aincr is a get followed by a set on every backend, so async
+# callers run the sync versions, in one thread hop per call.
+acheck_throttle = sync_to_async(check_throttle)
+apeek_throttle = sync_to_async(peek_throttle)
+arecord_throttle = sync_to_async(record_throttle)
@@ -1,15 +1,48 @@
+from django.conf import settings
 from django.urls import path
-from authentication.views import GoogleOAuthView, AuthView, UpdatePasswordView, ResetPasswordView, ResetPasswordConfirmView
-from company.views import CompanyView, PolicyView, DepartmentView
+from .views import MetricsView
+from authentication.views import GoogleOAuthView, AuthView, AsyncAuthView, UpdatePasswordView, ResetPasswordView, ResetPasswordConfirmView
+from company.views import CompanyView, PolicyView, DepartmentView, BootstrapView, CompanyExportView, OrgChartView
+from company.views import AsyncCompanyView, AsyncPolicyView, AsyncBootstrapView
+from employee.views import EmployeeDirectoryView, EmployeeImportView
+from attendance.views import PunchView, DailyAttendanceView
+from leave.views import LeaveRequestView, LeaveReviewView, LeaveCancelView, LeaveBalanceView
+from payroll.views import PayrollRunView, PayrollRunStatusView, CompensationView
+
+# Async read paths and login under ASGI, sync DRF views under WSGI.
+auth_view = AsyncAuthView if settings.ASYNC_VIEWS else AuthView
+company_view = AsyncCompanyView if settings.ASYNC_VIEWS else CompanyView
+policy_view = AsyncPolicyView if settings.ASYNC_VIEWS else PolicyView
+bootstrap_view = AsyncBootstrapView if settings.ASYNC_VIEWS else BootstrapView
 
 urlpatterns = [
     path('auth/google/', GoogleOAuthView.as_view(), name='google_oauth'),
-    path('auth/user/', AuthView.as_view(), name='auth'),
+    path('auth/user/', auth_view.as_view(), name='auth'),
     path('auth/update-password/', UpdatePasswordView.as_view(), name='update-password'),
     path('auth/reset/password/', ResetPasswordView.as_view(), name='reset-password'),
     path('auth/reset/otp/', ResetPasswordConfirmView.as_view(), name='reset-otp'),
     
-    path('company/details/', CompanyView.as_view(), name='company-details'),
-    path('company/policy/', PolicyView.as_view(), name='company-policy'),
+    path('company/details/', company_view.as_view(), name='company-details'),
+    path('company/policy/', policy_view.as_view(), name='company-policy'),
+    path('company/bootstrap/', bootstrap_view.as_view(), name='company-bootstrap'),
     path('department/', DepartmentView.as_view(), name='department'),
+    path('company/org-chart/', OrgChartView.as_view(), name='company-org-chart'),
+    path('company/export/<str:resource>/', CompanyExportView.as_view(), name='company-export'),
+
+    path('employees/', EmployeeDirectoryView.as_view(), name='employee-directory'),
+    path('employees/import/', EmployeeImportView.as_view(), name='employee-import'),
+
+    path('attendance/punches/', PunchView.as_view(), name='attendance-punches'),
+    path('attendance/daily/', DailyAttendanceView.as_view(), name='attendance-daily'),
+
+    path('leave/requests/', LeaveRequestView.as_view(), name='leave-requests'),
+    path('leave/requests/<int:request_id>/review/', LeaveReviewView.as_view(), name='leave-review'),
+    path('leave/requests/<int:request_id>/cancel/', LeaveCancelView.as_view(), name='leave-cancel'),
+    path('leave/balances/', LeaveBalanceView.as_view(), name='leave-balances'),
+
+    path('payroll/runs/', PayrollRunView.as_view(), name='payroll-runs'),
+    path('payroll/runs/<int:run_id>/', PayrollRunStatusView.as_view(), name='payroll-run-status'),
+    path('payroll/compensation/', CompensationView.as_view(), name='payroll-compensation'),
+
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
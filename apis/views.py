@@ -1,11 +1,28 @@
+import hmac
+import io
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from .authentication import StatelessJWTAuthentication, TokenPrincipal, ais_token_revoked
+from .instrumentation import measure, tag_request, registry
+from .log import log_payload, prometheus_lines as log_metric_lines
+from .renderers import FastJSONRenderer, FastJSONParser
+from mailer.metrics import prometheus_lines as mail_metric_lines
+
+
+logger = logging.getLogger('apis.responses')
 
 
 class BaseResponseMixin:
     def success_response(self, data, status=status.HTTP_200_OK):
-        print(data)
+        log_payload(logger, logging.DEBUG, "success response", data, status=status)
         return Response({
             "status": status,
             "success": True,
@@ -13,21 +30,124 @@ class BaseResponseMixin:
         }, status=status)
 
     def error_response(self, error_message, status=status.HTTP_400_BAD_REQUEST):
-        print(error_message)
+        log_payload(logger, logging.INFO, "error response", error_message, sample_rate=1, status=status)
         return Response({
             "status": status,
             "success": False,
             "error": error_message
         }, status=status)
+
+    def throttled_response(self, retry_after):
+        response = self.error_response(
+            error_message='Too many requests, please try again later.',
+            status=status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def serialized(self, serializer):
+        # serializer.data, timed into the request's serialize_ms metric.
+        with measure(self.request, 'serialize_ms'):
+            return serializer.data
     
 
+jwt_authentication = JWTAuthentication()
+stateless_jwt_authentication = StatelessJWTAuthentication()
+
+
 class JWTAuth(BaseResponseMixin):
-    def check_jwt_token(self, request):
-        user_auth_tuple = JWTAuthentication().authenticate(request)
+    # Views (or single handlers via `stateless=True`) that only need the
+    # caller's id, role and tenant can skip the user lookup entirely.
+    stateless_auth = False
+
+    def check_jwt_token(self, request, stateless=None):
+        if stateless is None:
+            stateless = self.stateless_auth
+        authenticator = stateless_jwt_authentication if stateless else jwt_authentication
+        try:
+            user_auth_tuple = authenticator.authenticate(request)
+        except AuthenticationFailed:
+            user_auth_tuple = None
         if not user_auth_tuple:
             return None, self.error_response(
                 error_message="Authentication failed",
-                status_code=status.HTTP_401_UNAUTHORIZED
+                status=status.HTTP_401_UNAUTHORIZED
             )
         user, auth = user_auth_tuple
-        return user, auth
\ No newline at end of file
+        tag_request(request, company_id=getattr(user, 'company_id', None))
+        return user, auth
+
+
+# Base for async-native Django views (DRF's APIView is sync only). Same
+# response envelope and logging as BaseResponseMixin, rendered with orjson.
+# Authentication is stateless: the token is verified inline and checked
+# against revocations, and only legacy tokens without tenant claims fall back
+# to the (sync) user lookup.
+class AsyncJWTAuth(BaseResponseMixin):
+    renderer = FastJSONRenderer()
+    parser = FastJSONParser()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated, so exempt from CSRF like DRF views.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def success_response(self, data, status=status.HTTP_200_OK):
+        log_payload(logger, logging.DEBUG, "success response", data, status=status)
+        return self.render({"status": status, "success": True, "data": data}, status)
+
+    def error_response(self, error_message, status=status.HTTP_400_BAD_REQUEST):
+        log_payload(logger, logging.INFO, "error response", error_message, sample_rate=1, status=status)
+        return self.render({"status": status, "success": False, "error": error_message}, status)
+
+    def request_data(self, request):
+        # JSON bodies as DRF would parse them; form posts as parsed by Django.
+        if request.content_type == 'application/json':
+            return self.parser.parse(io.BytesIO(request.body)) if request.body else {}
+        return request.POST
+
+    async def delegate(self, request, *args, **kwargs):
+        # Methods without an async implementation run the sync DRF view
+        # (`sync_view`) on the request's sync thread.
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    def render(self, payload, status):
+        with measure(self.request, 'render_ms'):
+            content = self.renderer.render(payload)
+        return HttpResponse(content, status=status, content_type='application/json')
+
+    async def check_jwt_token(self, request):
+        authenticator = stateless_jwt_authentication
+        user = validated_token = None
+        try:
+            header = authenticator.get_header(request)
+            raw_token = authenticator.get_raw_token(header) if header is not None else None
+            if raw_token is not None:
+                validated_token = authenticator.get_validated_token(raw_token)
+                if 'company_id' in validated_token:
+                    if not await ais_token_revoked(validated_token):
+                        user = TokenPrincipal(validated_token)
+                else:
+                    user = await sync_to_async(authenticator.get_user)(validated_token)
+        except AuthenticationFailed:
+            user = None
+        if user is None:
+            return None, self.error_response(
+                error_message="Authentication failed",
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        tag_request(request, company_id=getattr(user, 'company_id', None))
+        return user, validated_token
+
+
+# Prometheus text endpoint for request, tenant and mail queue metrics
+class MetricsView(View):
+    def get(self, request):
+        # Closed until METRICS_TOKEN is configured.
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if not token:
+            return HttpResponse(status=403)
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+        lines = registry.render() + log_metric_lines() + mail_metric_lines()
+        return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,79 @@
+from django.utils import timezone
+from company.policies import pick_effective_policies
+from company.schemas import WorkingHours, LatePolicy, OvertimePolicy
+
+
+# Policy details read here (all optional, see company.schemas):
+#   working_hours: start, end, minutes
+#   late:          grace_minutes
+#   overtime:      after_minutes, min_minutes
+# Employee.working_hours uses the same keys as the working_hours policy and
+# overrides it. Without an explicit "minutes" the shift length is end - start,
+# and overtime starts after the shift length unless "after_minutes" is set.
+DEFAULT_SHIFT_MINUTES = 8 * 60
+
+
+def _minutes_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+class AttendanceRules:
+    __slots__ = ('shift_start', 'shift_minutes', 'grace_minutes', 'overtime_after', 'overtime_min', 'overtime_eligible', 'time_zone')
+
+    # `time_zone` is the company's; None reads punches in the current zone.
+    def __init__(self, working_hours, late, overtime, overtime_eligible=True, time_zone=None):
+        self.time_zone = time_zone
+        self.shift_start = working_hours.start
+        if working_hours.minutes is not None:
+            self.shift_minutes = working_hours.minutes
+        elif working_hours.start and working_hours.end:
+            self.shift_minutes = (_minutes_of_day(working_hours.end) - _minutes_of_day(working_hours.start)) % (24 * 60)
+        else:
+            self.shift_minutes = DEFAULT_SHIFT_MINUTES
+        self.grace_minutes = late.grace_minutes or 0
+        self.overtime_after = self.shift_minutes if overtime.after_minutes is None else overtime.after_minutes
+        self.overtime_min = overtime.min_minutes or 0
+        self.overtime_eligible = overtime_eligible
+
+
+def build_rules(policies, employee_working_hours=None, overtime_eligible=True, time_zone=None):
+    details = {policy.type: policy.parsed_details for policy in policies}
+    working_hours = details.get('working_hours', WorkingHours()).merged(WorkingHours.parse(employee_working_hours))
+    return AttendanceRules(
+        working_hours, details.get('late', LatePolicy()), details.get('overtime', OvertimePolicy()), overtime_eligible, time_zone,
+    )
+
+
+def rules_for_employees(company_policies, employees, time_zone=None):
+    # `employees` are dicts with id, department_id, working_hours and
+    # overtime_eligible; rules are built from policies already in memory.
+    return {
+        employee['id']: build_rules(
+            pick_effective_policies(company_policies, employee['department_id'], employee['id']),
+            employee['working_hours'],
+            employee['overtime_eligible'],
+            time_zone,
+        )
+        for employee in employees
+    }
+
+
+def evaluate_summary(summary, rules):
+    summary.worked_minutes = 0
+    summary.is_late = False
+    summary.late_minutes = 0
+    summary.overtime_minutes = 0
+
+    if summary.first_in and rules.shift_start:
+        arrived = _minutes_of_day(timezone.localtime(summary.first_in, rules.time_zone))
+        late_by = arrived - _minutes_of_day(rules.shift_start)
+        if late_by > rules.grace_minutes:
+            summary.is_late = True
+            summary.late_minutes = late_by
+
+    if summary.first_in and summary.last_out and summary.last_out > summary.first_in:
+        summary.worked_minutes = int((summary.last_out - summary.first_in).total_seconds() // 60)
+        extra = summary.worked_minutes - rules.overtime_after
+        if rules.overtime_eligible and extra > 0 and extra >= rules.overtime_min:
+            summary.overtime_minutes = extra
+    return summary
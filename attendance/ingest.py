@@ -0,0 +1,158 @@
+import zoneinfo
+from django.db import transaction
+from django.db.models import Min, Max, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from apis.models import Company, Employee
+from company.policies import resolve_company_policies
+from .evaluation import rules_for_employees, evaluate_summary
+from .models import Punch, DailyAttendance
+
+
+SUMMARY_FIELDS = ['first_in', 'last_out', 'worked_minutes', 'is_late', 'late_minutes', 'overtime_minutes', 'updated_at']
+REBUILD_BATCH_SIZE = 2000
+
+
+def _summary_key(punch):
+    return (punch.employee_id, punch.date)
+
+
+def company_time_zone(company_id):
+    name = Company.objects.filter(pk=company_id).values_list('time_zone', flat=True).first()
+    return zoneinfo.ZoneInfo(name) if name else timezone.get_default_timezone()
+
+
+def load_rules(company_id, employee_ids=None, time_zone=None):
+    # Employees asked for by id are loaded whatever company they belong to
+    # now: punches recorded for this company are evaluated under its policies.
+    if employee_ids is None:
+        employees = Employee.objects.filter(company_id=company_id)
+    else:
+        employees = Employee.objects.filter(id__in=employee_ids)
+    return rules_for_employees(
+        resolve_company_policies(company_id),
+        employees.values('id', 'department_id', 'working_hours', 'overtime_eligible'),
+        time_zone or company_time_zone(company_id),
+    )
+
+
+# Folds new punches into the per-day summary rows they touch. Missing rows
+# are created first so every touched row can be locked and merged.
+def update_daily_summaries(company_id, punches, time_zone=None):
+    touched = {}
+    for punch in punches:
+        first_in, last_out = touched.get(_summary_key(punch), (None, None))
+        if punch.kind == 'in':
+            first_in = punch.punched_at if first_in is None else min(first_in, punch.punched_at)
+        else:
+            last_out = punch.punched_at if last_out is None else max(last_out, punch.punched_at)
+        touched[_summary_key(punch)] = (first_in, last_out)
+    if not touched:
+        return []
+
+    DailyAttendance.objects.bulk_create([
+        DailyAttendance(company_id=company_id, employee_id=employee_id, date=day)
+        for employee_id, day in touched
+    ], ignore_conflicts=True)
+
+    rows = DailyAttendance.objects.select_for_update().filter(
+        employee_id__in={employee_id for employee_id, _ in touched},
+        date__in={day for _, day in touched},
+    ).order_by('employee_id', 'date')
+
+    rules = load_rules(company_id, {employee_id for employee_id, _ in touched}, time_zone)
+    now = timezone.now()
+    changed = []
+    for row in rows:
+        key = (row.employee_id, row.date)
+        if key not in touched:
+            continue
+        first_in, last_out = touched[key]
+        if first_in is not None and (row.first_in is None or first_in < row.first_in):
+            row.first_in = first_in
+        if last_out is not None and (row.last_out is None or last_out > row.last_out):
+            row.last_out = last_out
+        evaluate_summary(row, rules[row.employee_id])
+        row.updated_at = now
+        changed.append(row)
+    DailyAttendance.objects.bulk_update(changed, SUMMARY_FIELDS)
+    return changed
+
+
+# Recomputes every summary of a company (optionally within a date range) from
+# the raw punches, e.g. after policies or working hours changed. Punch dates
+# are re-derived in the company's time zone first, so after a time zone change
+# rebuild without a range.
+def rebuild_daily_summaries(company_id, date_from=None, date_to=None):
+    punches = Punch.objects.filter(company_id=company_id)
+    summaries = DailyAttendance.objects.filter(company_id=company_id)
+    if date_from:
+        punches = punches.filter(date__gte=date_from)
+        summaries = summaries.filter(date__gte=date_from)
+    if date_to:
+        punches = punches.filter(date__lte=date_to)
+        summaries = summaries.filter(date__lte=date_to)
+
+    time_zone = company_time_zone(company_id)
+    rules = load_rules(company_id, time_zone=time_zone)
+    days = punches.values('employee_id', 'date').annotate(
+        first_in=Min('punched_at', filter=Q(kind='in')),
+        last_out=Max('punched_at', filter=Q(kind='out')),
+    ).order_by('employee_id', 'date')
+
+    rebuilt = 0
+    with transaction.atomic():
+        punches.update(date=TruncDate('punched_at', tzinfo=time_zone))
+        summaries.delete()
+        batch = []
+        for day in days.iterator(chunk_size=REBUILD_BATCH_SIZE):
+            if day['employee_id'] not in rules:
+                # Punches of an employee who has since moved to another company.
+                rules.update(load_rules(company_id, [day['employee_id']], time_zone))
+            batch.append(evaluate_summary(DailyAttendance(company_id=company_id, **day), rules[day['employee_id']]))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                DailyAttendance.objects.bulk_create(batch)
+                rebuilt += len(batch)
+                batch = []
+        if batch:
+            DailyAttendance.objects.bulk_create(batch)
+            rebuilt += len(batch)
+    return rebuilt
+
+
+def ingest_punches(company_id, punches):
+    # `punches` are validated dicts that already carry `employee_id`.
+    keyed = {(punch['employee_id'], punch['client_id']) for punch in punches if punch.get('client_id')}
+    known = set()
+    if keyed:
+        known = set(Punch.objects.filter(
+            employee_id__in={employee_id for employee_id, _ in keyed},
+            client_id__in={client_id for _, client_id in keyed},
+        ).values_list('employee_id', 'client_id'))
+
+    time_zone = company_time_zone(company_id)
+    new_punches = []
+    for punch in punches:
+        key = (punch['employee_id'], punch.get('client_id'))
+        if punch.get('client_id'):
+            if key in known:
+                continue
+            known.add(key)
+        new_punches.append(Punch(
+            company_id=company_id,
+            employee_id=punch['employee_id'],
+            date=timezone.localdate(punch['punched_at'], time_zone),
+            punched_at=punch['punched_at'],
+            kind=punch['kind'],
+            source=punch.get('source', 'app'),
+            client_id=punch.get('client_id') or None,
+            latitude=punch.get('latitude'),
+            longitude=punch.get('longitude'),
+        ))
+
+    with transaction.atomic():
+        # ignore_conflicts covers a concurrent resend of the same client_id;
+        # merging it into the summary again is harmless (min/max).
+        Punch.objects.bulk_create(new_punches, batch_size=1000, ignore_conflicts=True)
+        update_daily_summaries(company_id, new_punches, time_zone)
+    return len(new_punches), len(punches) - len(new_punches)
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from apis.models import Company
+from attendance.ingest import rebuild_daily_summaries
+
+
+def _rebuild(company_id, date_from, date_to):
+    # Each worker thread gets its own connection; close it when done.
+    try:
+        return rebuild_daily_summaries(company_id, date_from, date_to)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily attendance summaries from raw punches, one company per worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, action='append', dest='companies', help='Company id (repeatable). Defaults to all companies.')
+        parser.add_argument('--date-from', type=date.fromisoformat)
+        parser.add_argument('--date-to', type=date.fromisoformat)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        company_ids = options['companies'] or list(Company.objects.values_list('id', flat=True))
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(_rebuild, company_id, options['date_from'], options['date_to']): company_id
+                for company_id in company_ids
+            }
+            for future in as_completed(futures):
+                company_id = futures[future]
+                try:
+                    self.stdout.write(f"Company {company_id}: rebuilt {future.result()} summaries.")
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Company {company_id}: rebuild failed: {e}")
+        if failed:
+            raise CommandError(f'{failed} of {len(company_ids)} companies failed.')
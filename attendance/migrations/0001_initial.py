@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('apis', '0007_employee_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('first_in', models.DateTimeField(blank=True, null=True)),
+                ('last_out', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='apis.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'date'], name='attendance__company_f48ad4_idx')],
+                'unique_together': {('employee', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Punch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('punched_at', models.DateTimeField()),
+                ('kind', models.CharField(choices=[('in', 'Clock In'), ('out', 'Clock Out')], max_length=3)),
+                ('source', models.CharField(choices=[('app', 'App'), ('offline', 'Offline Queue'), ('device', 'Device'), ('admin', 'Admin')], default='app', max_length=10)),
+                ('client_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='punches', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='punches', to='apis.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'date'], name='attendance__company_8ee76a_idx'), models.Index(fields=['employee', 'date', 'punched_at'], name='attendance__employe_7cf3a3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'client_id'), name='attendance_punch_unique_client_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyattendance',
+            name='is_late',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dailyattendance',
+            name='late_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailyattendance',
+            name='overtime_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailyattendance',
+            name='worked_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
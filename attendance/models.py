@@ -0,0 +1,62 @@
+from django.db import models
+
+
+# Append-only log of clock-in/clock-out events. Rows are only ever inserted;
+# reads go through DailyAttendance.
+class Punch(models.Model):
+    KIND_CHOICES = (
+        ('in', 'Clock In'),
+        ('out', 'Clock Out'),
+    )
+    SOURCE_CHOICES = (
+        ('app', 'App'),
+        ('offline', 'Offline Queue'),
+        ('device', 'Device'),
+        ('admin', 'Admin'),
+    )
+
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='punches')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='punches')
+    date = models.DateField()
+    punched_at = models.DateTimeField()
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default='app')
+    # Client generated id so offline queues can safely resend the same punch.
+    client_id = models.CharField(max_length=64, null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.kind} at {self.punched_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'date']),
+            models.Index(fields=['employee', 'date', 'punched_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'client_id'], name='attendance_punch_unique_client_id'),
+        ]
+
+
+class DailyAttendance(models.Model):
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='daily_attendance')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='daily_attendance')
+    date = models.DateField()
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    worked_minutes = models.PositiveIntegerField(default=0)
+    is_late = models.BooleanField(default=False)
+    late_minutes = models.PositiveIntegerField(default=0)
+    overtime_minutes = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id} on {self.date}"
+
+    class Meta:
+        unique_together = ['employee', 'date']
+        indexes = [
+            models.Index(fields=['company', 'date']),
+        ]
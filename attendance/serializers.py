@@ -0,0 +1,38 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Punch, DailyAttendance
+from apis.serializers import PlainListSerializer
+
+
+MAX_PUNCH_BACKDATE = timedelta(days=getattr(settings, 'ATTENDANCE_MAX_BACKDATE_DAYS', 7))
+MAX_PUNCH_CLOCK_DRIFT = timedelta(minutes=5)
+
+
+class PunchSerializer(serializers.Serializer):
+    employee = serializers.IntegerField(required=False)
+    punched_at = serializers.DateTimeField()
+    kind = serializers.ChoiceField(choices=Punch.KIND_CHOICES)
+    source = serializers.ChoiceField(choices=Punch.SOURCE_CHOICES, default='app')
+    client_id = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    latitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    longitude = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+
+    def validate_punched_at(self, value):
+        now = timezone.now()
+        if value > now + MAX_PUNCH_CLOCK_DRIFT:
+            raise serializers.ValidationError("Punch time cannot be in the future.")
+        if value < now - MAX_PUNCH_BACKDATE:
+            raise serializers.ValidationError("Punch is too old to be accepted.")
+        return value
+
+
+class DailyAttendanceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailyAttendance
+        list_serializer_class = PlainListSerializer
+        fields = [
+            'employee', 'date', 'first_in', 'last_out', 'worked_minutes',
+            'is_late', 'late_minutes', 'overtime_minutes', 'updated_at'
+        ]
@@ -0,0 +1,57 @@
+import datetime
+from django.core.cache import cache
+from django.test import TestCase
+from apis.cache import hot_cache
+from apis.models import Company, CustomUser, Employee
+from company.models import Department, Policy
+from .ingest import ingest_punches, rebuild_daily_summaries
+from .models import DailyAttendance, Punch
+
+
+def utc(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+class CompanyTimeZoneTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear_local()
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test', time_zone='Asia/Kolkata')
+        department = Department.objects.create(company=self.company, name='Engineering', leave_allotments={})
+        user = CustomUser.objects.create_user(username='emp', email='emp@acme.test', password='secret', company=self.company)
+        self.employee = Employee.objects.create(
+            employee_id='E1', user=user, company=self.company, department=department,
+            first_name='Emp', employee_type='office', joining_date=datetime.date(2024, 1, 1),
+        )
+        Policy.objects.create(company=self.company, type='working_hours', title='Hours', details={'start': '09:00', 'end': '18:00'})
+        Policy.objects.create(company=self.company, type='late', title='Late', details={'grace_minutes': 10})
+        Policy.objects.create(company=self.company, type='overtime', title='Overtime', details={'min_minutes': 30})
+
+    def punch(self, punched_at, kind):
+        return {'employee_id': self.employee.id, 'punched_at': punched_at, 'kind': kind}
+
+    def test_shift_is_evaluated_in_the_company_time_zone(self):
+        # 09:30 to 19:30 IST: 30 minutes late, 10 hours worked.
+        ingest_punches(self.company.id, [self.punch(utc(2026, 9, 1, 4, 0), 'in'), self.punch(utc(2026, 9, 1, 14, 0), 'out')])
+        summary = DailyAttendance.objects.get()
+        self.assertEqual(summary.date, datetime.date(2026, 9, 1))
+        self.assertEqual((summary.is_late, summary.late_minutes), (True, 30))
+        self.assertEqual((summary.worked_minutes, summary.overtime_minutes), (600, 60))
+
+    def test_punches_after_utc_midnight_count_for_the_local_day(self):
+        # 08:55 IST on Sep 1, and 01:30 IST on Sep 2 (still Sep 1 in UTC).
+        ingest_punches(self.company.id, [self.punch(utc(2026, 9, 1, 3, 25), 'in'), self.punch(utc(2026, 9, 1, 20, 0), 'in')])
+        summaries = {summary.date: summary for summary in DailyAttendance.objects.all()}
+        self.assertEqual(set(summaries), {datetime.date(2026, 9, 1), datetime.date(2026, 9, 2)})
+        self.assertFalse(summaries[datetime.date(2026, 9, 1)].is_late)
+        self.assertEqual(summaries[datetime.date(2026, 9, 2)].first_in, utc(2026, 9, 1, 20, 0))
+
+    def test_rebuild_redates_punches_after_a_time_zone_change(self):
+        Company.objects.filter(pk=self.company.pk).update(time_zone='UTC')
+        ingest_punches(self.company.id, [self.punch(utc(2026, 9, 1, 20, 0), 'in')])
+        self.assertEqual(Punch.objects.get().date, datetime.date(2026, 9, 1))
+
+        Company.objects.filter(pk=self.company.pk).update(time_zone='Asia/Kolkata')
+        self.assertEqual(rebuild_daily_summaries(self.company.id), 1)
+        self.assertEqual(Punch.objects.get().date, datetime.date(2026, 9, 2))
+        self.assertEqual(DailyAttendance.objects.get().date, datetime.date(2026, 9, 2))
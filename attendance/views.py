@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+from django.conf import settings
+from rest_framework import status
+from rest_framework.views import APIView
+from apis.authentication import resolve_employee_id
+from apis.models import Employee
+from apis.views import JWTAuth
+from .ingest import ingest_punches
+from .models import DailyAttendance
+from .serializers import PunchSerializer, DailyAttendanceSerializer
+
+
+MAX_PUNCHES_PER_REQUEST = getattr(settings, 'ATTENDANCE_MAX_PUNCHES_PER_REQUEST', 500)
+MAX_SUMMARY_RANGE_DAYS = 31
+
+
+# Batched punch ingestion; offline clients send their queued punches at once
+class PunchView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def post(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            data = request.data.get('punches') if isinstance(request.data, dict) else request.data
+            if not isinstance(data, list) or not data:
+                return self.error_response(error_message="Missing required fields: punches", status=status.HTTP_400_BAD_REQUEST)
+            if len(data) > MAX_PUNCHES_PER_REQUEST:
+                return self.error_response(error_message=f"At most {MAX_PUNCHES_PER_REQUEST} punches can be sent at once.", status=status.HTTP_400_BAD_REQUEST)
+
+            serializer = PunchSerializer(data=data, many=True)
+            if not serializer.is_valid():
+                return self.error_response(error_message=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            punches = serializer.validated_data
+
+            is_admin = getattr(user, 'user_type', None) == 'admin'
+            if is_admin:
+                # Admins punch on behalf of employees of their own company.
+                employee_ids = {punch.get('employee') for punch in punches}
+                if None in employee_ids:
+                    return self.error_response(error_message="Missing required fields: employee", status=status.HTTP_400_BAD_REQUEST)
+                known = set(Employee.objects.filter(company_id=company_id, id__in=employee_ids).values_list('id', flat=True))
+                if employee_ids - known:
+                    return self.error_response(error_message="Employee must belong to your company.", status=status.HTTP_400_BAD_REQUEST)
+                for punch in punches:
+                    punch['employee_id'] = punch['employee']
+            else:
+                employee_id = resolve_employee_id(user)
+                if not employee_id:
+                    return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+                if any(punch.get('employee') not in (None, employee_id) for punch in punches):
+                    return self.error_response(error_message="You can only punch for yourself.", status=status.HTTP_403_FORBIDDEN)
+                for punch in punches:
+                    punch['employee_id'] = employee_id
+
+            accepted, duplicates = ingest_punches(company_id, punches)
+            return self.success_response({
+                "accepted": accepted,
+                "duplicates": duplicates,
+                "message": "Punches recorded successfully."
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Daily summaries; employees see their own days, admins the whole company
+class DailyAttendanceView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            params = request.query_params
+            try:
+                date_to = date.fromisoformat(params['date_to']) if params.get('date_to') else date.today()
+                date_from = date.fromisoformat(params['date_from']) if params.get('date_from') else date_to
+            except ValueError:
+                return self.error_response(error_message="Dates must be in YYYY-MM-DD format.", status=status.HTTP_400_BAD_REQUEST)
+            if date_from > date_to or date_to - date_from > timedelta(days=MAX_SUMMARY_RANGE_DAYS):
+                return self.error_response(error_message=f"Date range must be at most {MAX_SUMMARY_RANGE_DAYS} days.", status=status.HTTP_400_BAD_REQUEST)
+
+            summaries = DailyAttendance.objects.filter(company_id=company_id, date__gte=date_from, date__lte=date_to)
+            if getattr(user, 'user_type', None) == 'admin':
+                if params.get('employee'):
+                    summaries = summaries.filter(employee_id=params['employee'])
+            else:
+                employee_id = resolve_employee_id(user)
+                if not employee_id:
+                    return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+                summaries = summaries.filter(employee_id=employee_id)
+
+            serializer = DailyAttendanceSerializer(summaries.order_by('date', 'employee_id'), many=True)
+            return self.success_response({
+                "attendance": self.serialized(serializer),
+                "message": "Attendance fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
@@ -1,6 +1,17 @@
-from firebase_admin import credentials
-import firebase_admin
+import json
+from django.conf import settings
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate("firebase-service-account.json")
-    firebase_admin.initialize_app(cred)
\ No newline at end of file
+
+_project_id = None
+
+
+# The service account file is only read for its project id, and only when
+# FIREBASE_PROJECT_ID is not set.
+def get_firebase_project_id():
+    global _project_id
+    if _project_id is None:
+        _project_id = settings.FIREBASE_PROJECT_ID
+        if not _project_id:
+            with open(settings.FIREBASE_CREDENTIALS_FILE, encoding='utf-8') as credentials_file:
+                _project_id = json.load(credentials_file)['project_id']
+    return _project_id
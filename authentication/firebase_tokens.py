@@ -0,0 +1,139 @@
+import logging
+import re
+import threading
+import time
+import jwt
+import requests
+from cryptography.x509 import load_pem_x509_certificate
+from django.conf import settings
+from .firebase_init import get_firebase_project_id
+
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class InvalidIdToken(ValueError):
+    pass
+
+
+def fetch_google_certificates(url=GOOGLE_CERTS_URL):
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    match = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+    return response.json(), int(match.group(1)) if match else None
+
+
+# Process-wide cache of Google's token signing keys. Entries live for the
+# Cache-Control max-age Google sends (at least `min_ttl` seconds) and are
+# refreshed in a background thread once they are within `refresh_margin`
+# seconds of expiring. Fetches are single flight: requests that find the keys
+# expired wait for one fetch instead of each starting their own.
+class CertificateCache:
+    def __init__(self, fetch=fetch_google_certificates, refresh_margin=300, min_refresh_interval=60, min_ttl=600, clock=time.time):
+        self._fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self.min_ttl = min_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = 0
+        self._refreshing = False
+
+    def refresh(self):
+        certificates, max_age = self._fetch()
+        keys = {
+            kid: load_pem_x509_certificate(pem.encode()).public_key()
+            for kid, pem in certificates.items()
+        }
+        now = self._clock()
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + max(max_age or 0, self.min_ttl)
+        return keys
+
+    def _refresh_once(self, seen_fetched_at):
+        # Callers that waited while another thread fetched reuse its keys.
+        with self._refresh_lock:
+            with self._lock:
+                if self._fetched_at != seen_fetched_at:
+                    return self._keys
+            return self.refresh()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._refresh_lock:
+                    self.refresh()
+            except Exception as e:
+                logger.warning("Refreshing Google signing keys failed: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='google-certs-refresh', daemon=True).start()
+
+    def get_key(self, kid):
+        now = self._clock()
+        with self._lock:
+            keys, expires_at, fetched_at = self._keys, self._expires_at, self._fetched_at
+
+        if now >= expires_at:
+            keys = self._refresh_once(fetched_at)
+        elif kid not in keys and now - fetched_at >= self.min_refresh_interval:
+            # Google may have rotated keys before our copy expired.
+            keys = self._refresh_once(fetched_at)
+        elif now >= expires_at - self.refresh_margin:
+            self._refresh_in_background()
+
+        try:
+            return keys[kid]
+        except KeyError:
+            raise InvalidIdToken('Firebase ID token has an unknown "kid" header.')
+
+
+google_certificates = CertificateCache()
+
+
+# Verifies a Firebase ID token's signature and claims locally, with the same
+# checks as firebase_admin.auth.verify_id_token minus the network round trip.
+def verify_firebase_id_token(token, project_id=None, certificates=None):
+    project_id = project_id or get_firebase_project_id()
+    certificates = certificates or google_certificates
+    try:
+        header = jwt.get_unverified_header(token)
+        if header.get('alg') != 'RS256':
+            raise InvalidIdToken('Firebase ID token has an incorrect algorithm.')
+        if not header.get('kid'):
+            raise InvalidIdToken('Firebase ID token has no "kid" header.')
+
+        claims = jwt.decode(
+            token,
+            key=certificates.get_key(header['kid']),
+            algorithms=['RS256'],
+            audience=project_id,
+            issuer=f'https://securetoken.google.com/{project_id}',
+            leeway=settings.FIREBASE_CLOCK_SKEW_SECONDS,
+            options={'require': ['exp', 'iat', 'aud', 'iss', 'sub']},
+        )
+    except jwt.PyJWTError as e:
+        raise InvalidIdToken(f'Firebase ID token is invalid: {e}')
+
+    subject = claims['sub']
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise InvalidIdToken('Firebase ID token has an invalid "sub" claim.')
+    if claims.get('auth_time', 0) > time.time() + settings.FIREBASE_CLOCK_SKEW_SECONDS:
+        raise InvalidIdToken('Firebase ID token has an "auth_time" in the future.')
+    claims['uid'] = subject
+    return claims
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apis.bench import summarize, timed, format_row, count_queries
+from authentication.usernames import allocate_username, username_base, format_username
+
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+def probe_username(name):
+    # The previous allocator: one EXISTS query per taken suffix.
+    base = username_base(name)
+    username = base
+    counter = 1
+    while User.objects.filter(username=username).exists():
+        username = f"{base}_{counter}"
+        counter += 1
+    return username
+
+
+class Command(BaseCommand):
+    help = 'Measure sign-up username allocation latency as more users share a base name. All writes are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='0,100,1000,5000', help='Comma separated counts of existing users sharing the base name.')
+        parser.add_argument('--samples', type=int, default=50)
+        parser.add_argument('--name', default='Bench Rahul Sharma')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        for allocator, label in ((allocate_username, 'sequence'), (probe_username, 'probe')):
+            for size in sizes:
+                try:
+                    with transaction.atomic():
+                        self.run_case(allocator, label, options['name'], size, options['samples'])
+                        raise Rollback
+                except Rollback:
+                    pass
+
+    def run_case(self, allocator, label, name, size, samples):
+        base = username_base(name)
+        User.objects.bulk_create([
+            User(username=format_username(base, suffix), email=f"{base}.{suffix}@bench.invalid")
+            for suffix in range(size)
+        ], batch_size=1000)
+        allocator(name)
+
+        timings = []
+        with count_queries() as queries:
+            for index in range(samples):
+                with timed(timings):
+                    User.objects.create(username=allocator(name), email=f"{base}.new{index}@bench.invalid")
+        self.stdout.write(format_row(f"{label} existing={size}", summarize(timings)) + f" queries/signup={queries.count / samples:.1f}")
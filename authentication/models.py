@@ -1,3 +1,12 @@
 from django.db import models
 
-# Create your models here.
+
+# Next numeric suffix to hand out per username base ("rahul_sharma" ->
+# "rahul_sharma_7"), so allocating a username is a single locked row update.
+class UsernameSequence(models.Model):
+    base = models.CharField(max_length=150, unique=True)
+    next_suffix = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.base} ({self.next_suffix})"
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+# Hashers listed in PASSWORD_HASHERS (see PASSWORD_HASHER in settings), with
+# their cost parameters read from settings. Changing a parameter makes
+# must_update() true for older hashes, so they are upgraded on the next login.
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+# Needs the argon2-cffi package.
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+# Hasher for the random temporary passwords generated by the employee import,
+# at PASSWORD_INITIAL_PBKDF2_ITERATIONS. They carry 72 bits of entropy, so a
+# low iteration count still leaves them out of brute-force reach, and a large
+# import hashes in seconds instead of minutes. It is never the preferred
+# hasher, so check_password rehashes with PASSWORD_HASHER on the first login.
+class InitialPasswordHasher(hashers.PBKDF2PasswordHasher):
+    algorithm = 'pbkdf2_sha256_initial'
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_INITIAL_PBKDF2_ITERATIONS
+
+
+def check_password(user, raw_password):
+    # Rehashes with the preferred hasher and parameters when the stored hash
+    # is outdated, like AbstractBaseUser.check_password, but saves only the
+    # password column.
+    is_correct, must_update = hashers.verify_password(raw_password, user.password)
+    if is_correct and must_update:
+        set_password(user, raw_password)
+    return is_correct
+
+
+def set_password(user, raw_password):
+    user.set_password(raw_password)
+    user.save(update_fields=['password'])
+
+
+# Async callers hash on this pool instead of the event loop or the request's
+# single sync thread. hashlib and argon2 release the GIL, so hashes of
+# concurrent logins run in parallel.
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hash_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_THREADS, thread_name_prefix='password-hash')
+    return _executor
+
+
+async def _in_executor(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(hash_executor(), func, *args)
+
+
+async def acheck_password(user, raw_password):
+    is_correct, must_update = await _in_executor(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        await aset_password(user, raw_password)
+    return is_correct
+
+
+async def aset_password(user, raw_password):
+    user.password = await _in_executor(hashers.make_password, raw_password)
+    await user.asave(update_fields=['password'])
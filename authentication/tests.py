@@ -1,3 +1,158 @@
-from django.test import TestCase
+import datetime
+import threading
+import time
+import jwt
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.test import SimpleTestCase
+from .firebase_tokens import CertificateCache, InvalidIdToken, verify_firebase_id_token
 
-# Create your tests here.
+
+PROJECT_ID = 'hrms-test'
+
+
+def generate_signing_key():
+    # RSA key and the self-signed certificate Google would publish for it.
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken.test')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return key, certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class FakeGoogle:
+    def __init__(self, certificates, max_age=3600):
+        self.certificates = certificates
+        self.max_age = max_age
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return dict(self.certificates), self.max_age
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FirebaseTokenTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.key, cls.pem = generate_signing_key()
+        cls.other_key, cls.other_pem = generate_signing_key()
+
+    def setUp(self):
+        self.google = FakeGoogle({'kid-1': self.pem})
+        self.clock = Clock()
+        self.certificates = CertificateCache(fetch=self.google, clock=self.clock)
+
+    def token(self, kid='kid-1', key=None, **claims):
+        now = int(time.time())
+        payload = {
+            'aud': PROJECT_ID, 'iss': f'https://securetoken.google.com/{PROJECT_ID}',
+            'sub': 'firebase-uid', 'iat': now, 'exp': now + 3600, 'auth_time': now, 'email': 'user@example.com',
+        }
+        payload.update(claims)
+        return jwt.encode(payload, key or self.key, algorithm='RS256', headers={'kid': kid})
+
+    def verify(self, token):
+        return verify_firebase_id_token(token, project_id=PROJECT_ID, certificates=self.certificates)
+
+    def test_valid_token(self):
+        claims = self.verify(self.token())
+        self.assertEqual((claims['uid'], claims['email']), ('firebase-uid', 'user@example.com'))
+        self.verify(self.token())
+        self.assertEqual(self.google.calls, 1)
+
+    def test_rejects_wrong_audience_issuer_and_signature(self):
+        for token in (
+            self.token(aud='another-project'),
+            self.token(iss='https://securetoken.google.com/another-project'),
+            self.token(key=self.other_key),
+        ):
+            with self.assertRaises(InvalidIdToken):
+                self.verify(token)
+
+    def test_rejects_expired_token(self):
+        now = int(time.time())
+        with self.assertRaisesMessage(InvalidIdToken, 'expired'):
+            self.verify(self.token(iat=now - 7200, exp=now - 3600))
+
+    def test_unknown_kid_refetches_at_most_once_per_interval(self):
+        self.verify(self.token())
+        self.clock.now += self.certificates.min_refresh_interval
+        self.google.certificates['kid-2'] = self.other_pem
+        self.verify(self.token(kid='kid-2', key=self.other_key))
+        self.assertEqual(self.google.calls, 2)
+        with self.assertRaisesMessage(InvalidIdToken, 'unknown "kid"'):
+            self.verify(self.token(kid='kid-3'))
+        self.assertEqual(self.google.calls, 2)
+
+    def test_keys_expire_after_max_age(self):
+        self.verify(self.token())
+        self.clock.now += 3600
+        self.verify(self.token())
+        self.assertEqual(self.google.calls, 2)
+
+    def test_missing_max_age_uses_minimum_ttl(self):
+        self.google.max_age = None
+        self.verify(self.token())
+        self.clock.now += self.certificates.min_ttl - self.certificates.refresh_margin - 1
+        self.verify(self.token())
+        self.assertEqual(self.google.calls, 1)
+
+    def test_refreshes_in_background_before_expiry(self):
+        self.verify(self.token())
+        self.clock.now += 3600 - self.certificates.refresh_margin
+        self.google.started.clear()
+        self.google.release.clear()
+        # Served from the current keys while the refresh runs.
+        self.verify(self.token())
+        self.assertTrue(self.google.started.wait(5))
+        self.verify(self.token())
+        self.google.release.set()
+        for _ in range(50):
+            if not self.certificates._refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.google.calls, 2)
+
+    def test_expired_keys_are_fetched_once_for_concurrent_requests(self):
+        self.google.release.clear()
+        token = self.token()
+        errors = []
+
+        def verify():
+            try:
+                self.verify(token)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=verify) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(self.google.started.wait(5))
+        time.sleep(0.05)
+        self.google.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.google.calls, 1)
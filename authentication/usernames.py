@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction, IntegrityError
+from .models import UsernameSequence
+
+
+User = get_user_model()
+
+# Leaves room for "_<suffix>" within AbstractUser.username's 150 characters.
+MAX_BASE_LENGTH = 140
+
+
+def username_base(name):
+    return ((name or '').strip().lower().replace(' ', '_') or 'user')[:MAX_BASE_LENGTH]
+
+
+def format_username(base, suffix):
+    return base if suffix == 0 else f"{base}_{suffix}"
+
+
+def highest_taken_suffix(base):
+    # One prefix query; only runs the first time a base is seen.
+    highest = -1
+    for username in User.objects.filter(username__startswith=base).values_list('username', flat=True):
+        if username == base:
+            highest = max(highest, 0)
+        elif username.startswith(base + '_') and username[len(base) + 1:].isdigit():
+            highest = max(highest, int(username[len(base) + 1:]))
+    return highest
+
+
+def allocate_username(name):
+    base = username_base(name)
+    with transaction.atomic():
+        sequence = UsernameSequence.objects.select_for_update().filter(base=base).first()
+        if sequence is None:
+            try:
+                with transaction.atomic():
+                    sequence = UsernameSequence.objects.create(base=base, next_suffix=highest_taken_suffix(base) + 1)
+            except IntegrityError:
+                # Another sign-up seeded the same base concurrently.
+                sequence = UsernameSequence.objects.select_for_update().get(base=base)
+        suffix = sequence.next_suffix
+        sequence.next_suffix = suffix + 1
+        sequence.save(update_fields=['next_suffix', 'updated_at'])
+    return format_username(base, suffix)
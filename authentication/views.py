@@ -1,23 +1,40 @@
+import logging
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.views import APIView
+from django.views import View
 from django.contrib.auth import get_user_model
 import random
 import string
 from apis.models import Employee, Company
-from firebase_admin import auth
-from apis.views import BaseResponseMixin, JWTAuth
-from django.core.mail import send_mail
-from django.conf import settings
-from company.models import Policy
+from apis.views import BaseResponseMixin, JWTAuth, AsyncJWTAuth
+from apis.throttling import (
+    check_throttle, acheck_throttle, peek_throttle, apeek_throttle, record_throttle, arecord_throttle, client_ip,
+)
+from mailer.outbox import enqueue_mail
 from django.core.cache import cache
-import authentication.firebase_init
+from .firebase_tokens import verify_firebase_id_token
 from apis.serializers import MyTokenObtainPairSerializer
-from company.serializers import CompanyInfoSerializer
-from django.db import transaction
+from company.bootstrap import get_user_bootstrap, aget_user_bootstrap
+from django.db import transaction, IntegrityError
+from .usernames import allocate_username
+from .passwords import check_password, set_password, acheck_password
 
 
 User = get_user_model()
 
+logger = logging.getLogger('authentication')
+
+USERNAME_ALLOCATION_ATTEMPTS = 5
+
+
+def issue_tokens(user):
+    refresh = MyTokenObtainPairSerializer.get_token(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token)
+    }
+
 # Login & user delete by admin API
 class AuthView(APIView, BaseResponseMixin):
 
@@ -26,29 +43,25 @@ class AuthView(APIView, BaseResponseMixin):
         password = request.data.get('password')
 
         try:
+            # Budgets by IP and email before the user lookup, failed logins
+            # by company before the password hash.
+            retry_after = check_throttle('login', ip=client_ip(request), email=email)
+            if retry_after:
+                return self.throttled_response(retry_after)
             if email:
                 user = User.objects.select_related('company').get(email=email)
             else:
                 return self.error_response(error_message='Email is required!')
-            if user.check_password(password):
-                serializer = MyTokenObtainPairSerializer(data={'email': email, 'password': password, 'username': user.username})
-                serializer.is_valid(raise_exception=True)
-                tokens = serializer.validated_data
-                company = user.company
-                company_data = CompanyInfoSerializer(company).data if company else None
-                if user.user_type == 'admin':
-                    required_types = [choice[0] for choice in Policy.POLICY_TYPE_CHOICES if choice[0] != 'others']
-                    existing_types = Policy.objects.filter(
-                        company=company,
-                        employee__isnull=True,
-                        department__isnull=True,
-                        type__in=required_types
-                    ).values_list('type', flat=True).distinct()
-                    has_company_policy = all(t in existing_types for t in required_types) if company else False
-                    from company.models import Department
-                    departments = Department.objects.filter(company=company)
-                
-                departments_csv = ','.join([f"{dept.name}:{dept.id}" for dept in departments]) if user.user_type == 'admin' else None
+            retry_after = peek_throttle('login-failed', company=user.company_id)
+            if retry_after:
+                return self.throttled_response(retry_after)
+            if check_password(user, password):
+                # Verified once here; the token serializer would authenticate
+                # (and hash) a second time.
+                if not user.is_active:
+                    return self.error_response(error_message='No active account found with the given credentials')
+                tokens = issue_tokens(user)
+                bootstrap = get_user_bootstrap(user, user.company)
                 return self.success_response(data={
                     'message': 'Login successful!',
                     'access_token': tokens['access'],
@@ -60,12 +73,13 @@ class AuthView(APIView, BaseResponseMixin):
                         'profile_picture': user.profile_picture,
                         'username': user.username,
                     },
-                    'company': company_data,
+                    'company': bootstrap['company'],
                     'role': user.user_type,
-                    'has_company_policy': has_company_policy if user.user_type == 'admin' else None,
-                    'departments': departments_csv,
+                    'has_company_policy': bootstrap['has_company_policy'],
+                    'departments': bootstrap['departments'],
                 })
             
+            record_throttle('login-failed', company=user.company_id)
             return self.error_response(error_message='Username or Password is incorrect!')
         
         except User.DoesNotExist:
@@ -84,20 +98,75 @@ class AuthView(APIView, BaseResponseMixin):
                 return error
 
             if admin.user_type != 'admin':
-                return self.error_response(error_message='Only company admins can delete users.', status_code=status.HTTP_403_FORBIDDEN)
+                return self.error_response(error_message='Only company admins can delete users.', status=status.HTTP_403_FORBIDDEN)
 
             employee = Employee.objects.select_related('company', 'user').get(employee_id=emp_id)
             if employee.company != admin.company:
-                return self.error_response(error_message='You can only delete users from your own company.', status_code=status.HTTP_403_FORBIDDEN)
+                return self.error_response(error_message='You can only delete users from your own company.', status=status.HTTP_403_FORBIDDEN)
             
             with transaction.atomic():
                 user = employee.user
                 user.delete()
             return self.success_response(data={'message': 'User deleted successfully!'})
         except Exception as e:
-            return self.error_response(error_message=f'Some error occurred: {e}', status_code=status.HTTP_400_BAD_REQUEST)
+            return self.error_response(error_message=f'Some error occurred: {e}', status=status.HTTP_400_BAD_REQUEST)
         
 
+# Async login for ASGI deployments (routed instead of AuthView when
+# ASYNC_VIEWS is set): the password is verified on the hashing thread pool,
+# not on the event loop. Deletes are delegated to AuthView.
+class AsyncAuthView(AsyncJWTAuth, View):
+    sync_view = staticmethod(AuthView.as_view())
+
+    async def post(self, request):
+        try:
+            data = self.request_data(request)
+            email = data.get('email')
+            password = data.get('password')
+            retry_after = await acheck_throttle('login', ip=client_ip(request), email=email)
+            if retry_after:
+                return self.throttled_response(retry_after)
+            if not email:
+                return self.error_response(error_message='Email is required!')
+            user = await User.objects.aget(email=email)
+            retry_after = await apeek_throttle('login-failed', company=user.company_id)
+            if retry_after:
+                return self.throttled_response(retry_after)
+            if await acheck_password(user, password):
+                if not user.is_active:
+                    return self.error_response(error_message='No active account found with the given credentials')
+                tokens = await sync_to_async(issue_tokens)(user)
+                bootstrap = await aget_user_bootstrap(user)
+                return self.success_response(data={
+                    'message': 'Login successful!',
+                    'access_token': tokens['access'],
+                    'refresh_token': tokens['refresh'],
+                    'user': {
+                        'id': user.id,
+                        'email': user.email,
+                        'name': user.first_name,
+                        'profile_picture': user.profile_picture,
+                        'username': user.username,
+                    },
+                    'company': bootstrap['company'],
+                    'role': user.user_type,
+                    'has_company_policy': bootstrap['has_company_policy'],
+                    'departments': bootstrap['departments'],
+                })
+
+            await arecord_throttle('login-failed', company=user.company_id)
+            return self.error_response(error_message='Username or Password is incorrect!')
+
+        except User.DoesNotExist:
+            return self.error_response(error_message='Username doesn\'t exists!')
+
+        except Exception as e:
+            return self.error_response(error_message=f'Some error occurred: {e}')
+
+    async def delete(self, request):
+        return await self.delegate(request)
+
+
 # Google oAuth API
 class GoogleOAuthView(APIView, BaseResponseMixin):
     
@@ -105,26 +174,18 @@ class GoogleOAuthView(APIView, BaseResponseMixin):
         token = request.data.get('id_token').strip()
 
         try:
-            decoded_token = auth.verify_id_token(token)
+            decoded_token = verify_firebase_id_token(token)
             uid = decoded_token.get("user_id") or decoded_token.get("uid")
             email = decoded_token.get("email")
             name = decoded_token.get("name")
             profile_picture = decoded_token.get("picture")
 
-            username = self.generate_unique_username(name)
-
             with transaction.atomic():
-                user, created = User.objects.select_related('company').get_or_create(
-                    email=email, 
-                    defaults={
-                        'username': username,
-                        'first_name': name,
-                        'google_id': uid,
-                        'profile_picture': profile_picture,
-                        'user_type': 'admin',
-                    }
-                )
-                
+                user = User.objects.select_related('company').filter(email=email).first()
+                created = False
+                if user is None:
+                    user, created = self.create_google_user(email, name, uid, profile_picture)
+
                 if created:
                     company = Company.objects.create(
                         name=name + "'s Company",
@@ -132,43 +193,26 @@ class GoogleOAuthView(APIView, BaseResponseMixin):
                         email=email,
                     )
                     user.company = company
-                    user.set_password(username)
+                    user.set_password(user.username)
                     user.save()
-                else:
-                    if not user.company:
-                        company = Company.objects.create(
-                            name=name + "'s Company",
-                            ownerName=name,
-                            email=email,
-                        )
-                        user.company = company
-                        user.save()
-                    
-                    required_types = [choice[0] for choice in Policy.POLICY_TYPE_CHOICES if choice[0] != 'others']
-                    existing_types = Policy.objects.filter(
-                        company=company,
-                        employee__isnull=True,
-                        department__isnull=True,
-                        type__in=required_types
-                    ).values_list('type', flat=True).distinct()
-                    has_company_policy = all(t in existing_types for t in required_types) if company else False
-
-            company = user.company
-            company_data = CompanyInfoSerializer(company).data if company else None
-            from company.models import Department
-            departments = Department.objects.filter(company=company)
-            departments_csv = ','.join([f"{dept.name}:{dept.id}" for dept in departments]) if user.user_type == 'admin' else None
+                elif not user.company:
+                    company = Company.objects.create(
+                        name=name + "'s Company",
+                        ownerName=name,
+                        email=email,
+                    )
+                    user.company = company
+                    user.save()
+
+            username = user.username
+            bootstrap = get_user_bootstrap(user, user.company)
 
             serializer = MyTokenObtainPairSerializer(data={'email': email, 'password': username if created else None, 'username': username if created else None})
             if created:
                 serializer.is_valid(raise_exception=True)
                 tokens = serializer.validated_data
             else:
-                refresh = MyTokenObtainPairSerializer.get_token(user)
-                tokens = {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token)
-                }
+                tokens = issue_tokens(user)
 
             return self.success_response(data={
                 'message': 'Token verified successfully!',
@@ -181,26 +225,39 @@ class GoogleOAuthView(APIView, BaseResponseMixin):
                     'profile_picture': user.profile_picture,
                     'username': user.username,
                 },
-                'company': company_data,
+                'company': bootstrap['company'],
                 'role': 'admin',
-                'has_company_policy': has_company_policy if not created else False,
-                'departments': departments_csv,
+                'has_company_policy': bootstrap['has_company_policy'] if not created else False,
+                'departments': bootstrap['departments'],
             })
         
         except ValueError as e:
-            return self.error_response(error_message=f'Invalid Google token {e}', status_code=status.HTTP_400_BAD_REQUEST,)
+            return self.error_response(error_message=f'Invalid Google token {e}', status=status.HTTP_400_BAD_REQUEST,)
         
         except Exception as e:
-            return self.error_response(error_message=f'{e}', status_code=status.HTTP_400_BAD_REQUEST,)
+            return self.error_response(error_message=f'{e}', status=status.HTTP_400_BAD_REQUEST,)
             
-    def generate_unique_username(self, name):
-        base_username = name.lower().replace(' ', '_') or 'user'
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            username = f"{base_username}_{counter}"
-            counter += 1
-        return username
+    def create_google_user(self, email, name, uid, profile_picture):
+        # The username sequence can still collide with names taken outside of
+        # it, so retry with the next suffix inside a savepoint.
+        for attempt in range(USERNAME_ALLOCATION_ATTEMPTS):
+            username = allocate_username(name)
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(
+                        email=email,
+                        username=username,
+                        first_name=name,
+                        google_id=uid,
+                        profile_picture=profile_picture,
+                        user_type='admin',
+                    )
+                return user, True
+            except IntegrityError:
+                existing = User.objects.select_related('company').filter(email=email).first()
+                if existing is not None:
+                    return existing, False
+        raise IntegrityError('Could not allocate a unique username.')
     
 
 
@@ -213,13 +270,20 @@ class UpdatePasswordView(APIView, BaseResponseMixin):
         newPassword = request.data.get('newPassword')
 
         try:
+            # Same budgets as login: this endpoint checks a password too.
+            retry_after = check_throttle('login', ip=client_ip(request), email=email)
+            if retry_after:
+                return self.throttled_response(retry_after)
             user = User.objects.get(email=email)
-            if user.check_password(oldPassword):
-                user.set_password(newPassword)
-                user.save()
+            retry_after = peek_throttle('login-failed', company=user.company_id)
+            if retry_after:
+                return self.throttled_response(retry_after)
+            if check_password(user, oldPassword):
+                set_password(user, newPassword)
                 return self.success_response(data={
                     'message': 'Password updated successfully!',
                 })
+            record_throttle('login-failed', company=user.company_id)
             return self.error_response(error_message='Incorrect password!')
         except User.DoesNotExist:
             return self.error_response(error_message='Username doesn\'t exists!')
@@ -233,11 +297,18 @@ class ResetPasswordView(APIView, BaseResponseMixin):
         email = request.data.get('email')
 
         try:
+            retry_after = check_throttle('reset-password', ip=client_ip(request), email=email)
+            if retry_after:
+                return self.throttled_response(retry_after)
             user = User.objects.select_related('company').get(email=email)
+            retry_after = check_throttle('reset-password', company=user.company_id)
+            if retry_after:
+                return self.throttled_response(retry_after)
             otp = ''.join(random.choices(string.digits, k=6))
+            # Default (shared) cache: the confirm request may hit another worker.
             cache.set(f'otp_{user.id}', otp, timeout=600)
 
-            print(otp)
+            logger.info("password reset otp issued user_id=%s", user.id)
 
             self.send_email_to_user(
                 subject='HRMS Password Reset OTP',
@@ -256,16 +327,15 @@ class ResetPasswordView(APIView, BaseResponseMixin):
         
     def send_email_to_user(self, subject, message, recipient_email):
         try:
-            send_mail(
+            enqueue_mail(
                 subject=subject,
                 message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[recipient_email],
-                fail_silently=False,
+                sensitive=True,
             )
             return True
-        except Exception as e:
-            print(f"Email sending failed: {e}")
+        except Exception:
+            logger.exception("email queueing failed")
             return False
         
 
@@ -277,17 +347,20 @@ class ResetPasswordConfirmView(APIView, BaseResponseMixin):
         new_password=request.data.get('new_password')
 
         try:
+            # Caps OTP guesses per email within the OTP's lifetime.
+            retry_after = check_throttle('reset-otp', ip=client_ip(request), email=email)
+            if retry_after:
+                return self.throttled_response(retry_after)
             user=User.objects.get(email=email)
             
             cached_otp=cache.get(f'otp_{user.id}')
             if not cached_otp or cached_otp != otp:
                 return self.error_response(error_message='Invalid OTP!')
             
-            user.set_password(new_password)
-            user.save()
+            set_password(user, new_password)
             cache.delete(f'otp_{user.id}')
             return self.success_response(data={'message': 'Password reset successfully'})
         except User.DoesNotExist:
-            return self.error_response(error_message='Invalid user', status_code=status.HTTP_400_BAD_REQUEST)
+            return self.error_response(error_message='Invalid user', status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return self.error_response(error_message=f'Some error occurred: {e}', status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return self.error_response(error_message=f'Some error occurred: {e}', status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CompanyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'company'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .schemas import compile_schemas
+        compile_schemas()
@@ -0,0 +1,105 @@
+import asyncio
+from apis.cache import versioned_key, aversioned_key, bump_cache_version, hot_cache
+from apis.models import Company
+from .models import Policy, Department
+from .serializers import CompanyInfoSerializer
+
+
+BOOTSTRAP_CACHE_NAME = 'bootstrap'
+BOOTSTRAP_CACHE_TIMEOUT = 60 * 60
+
+REQUIRED_POLICY_TYPES = [choice[0] for choice in Policy.POLICY_TYPE_CHOICES if choice[0] != 'others']
+
+
+def _company_policy_types(company_id):
+    return Policy.objects.filter(
+        company_id=company_id,
+        employee__isnull=True,
+        department__isnull=True,
+        type__in=REQUIRED_POLICY_TYPES
+    ).values_list('type', flat=True).distinct()
+
+
+def _bootstrap_payload(company, existing_types, departments):
+    existing_types = set(existing_types)
+    return {
+        'company': CompanyInfoSerializer(company).data,
+        'has_company_policy': all(t in existing_types for t in REQUIRED_POLICY_TYPES),
+        'departments': ','.join(f"{name}:{dept_id}" for name, dept_id in departments),
+    }
+
+
+def build_company_bootstrap(company):
+    return _bootstrap_payload(
+        company,
+        _company_policy_types(company.id),
+        Department.objects.filter(company=company).values_list('name', 'id'),
+    )
+
+
+async def alist(queryset):
+    # Evaluates a queryset through async iteration, as an awaitable for gather().
+    return [row async for row in queryset]
+
+
+async def abuild_company_bootstrap(company_id):
+    # The three reads are independent, so they are awaited together.
+    company, existing_types, departments = await asyncio.gather(
+        Company.objects.aget(pk=company_id),
+        alist(_company_policy_types(company_id)),
+        alist(Department.objects.filter(company_id=company_id).values_list('name', 'id')),
+    )
+    return _bootstrap_payload(company, existing_types, departments)
+
+
+# Company payload, company-policy completeness and department CSV shared by the
+# login views and the bootstrap endpoint. Bumped whenever a Company, Policy or
+# Department row of the company changes (see company.signals).
+def get_company_bootstrap(company_id, company=None):
+    key = versioned_key(BOOTSTRAP_CACHE_NAME, company_id)
+    data = hot_cache.get(key)
+    if data is None:
+        if company is None:
+            company = Company.objects.get(pk=company_id)
+        data = build_company_bootstrap(company)
+        hot_cache.set(key, data, timeout=BOOTSTRAP_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_company_bootstrap(company_id):
+    key = await aversioned_key(BOOTSTRAP_CACHE_NAME, company_id)
+    data = await hot_cache.aget(key)
+    if data is None:
+        data = await abuild_company_bootstrap(company_id)
+        await hot_cache.aset(key, data, timeout=BOOTSTRAP_CACHE_TIMEOUT)
+    return data
+
+
+def _without_company(user):
+    if user.user_type != 'admin':
+        return {'company': None, 'has_company_policy': None, 'departments': None}
+    return {'company': None, 'has_company_policy': False, 'departments': ''}
+
+
+def _for_role(user, data):
+    if user.user_type != 'admin':
+        return {'company': data['company'], 'has_company_policy': None, 'departments': None}
+    return data
+
+
+def get_user_bootstrap(user, company=None):
+    # Non-admins only get the company payload, as the login views always did.
+    # `user` may be a CustomUser or a stateless TokenPrincipal.
+    if not user.company_id:
+        return _without_company(user)
+    return _for_role(user, get_company_bootstrap(user.company_id, company))
+
+
+async def aget_user_bootstrap(user):
+    if not user.company_id:
+        return _without_company(user)
+    return _for_role(user, await aget_company_bootstrap(user.company_id))
+
+
+def invalidate_company_bootstrap(company_id):
+    bump_cache_version(BOOTSTRAP_CACHE_NAME, company_id)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Cast, Concat
+
+
+def set_root_paths(apps, schema_editor):
+    # Existing departments have no parent, so each one is its own root.
+    Department = apps.get_model('company', 'Department')
+    Department.objects.update(path=Concat(Value('/'), Cast('id', models.CharField()), Value('/'), output_field=models.CharField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apis', '0007_employee_directory_indexes'),
+        ('company', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='company.department'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(set_root_paths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='policy',
+            name='type',
+            field=models.CharField(choices=[('leave', 'Leave'), ('attendance', 'Attendance'), ('overtime', 'Overtime'), ('late', 'Late'), ('working_hours', 'Working Hours'), ('others', 'Others')], db_index=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['company', 'path'], name='company_dep_company_2db559_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(fields=['company', 'department', 'type'], name='company_pol_company_45bd6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(fields=['company', 'type'], name='company_pol_company_bf1f8a_idx'),
+        ),
+    ]
@@ -1,20 +1,72 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils.functional import cached_property
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
 from django.core.exceptions import ValidationError
+from .schemas import parse_policy_details
 
 class Department(models.Model):
     company = models.ForeignKey('apis.Company', on_delete=models.CASCADE)
     name = models.CharField(max_length=60)
     description = models.TextField(blank=True)
     head = models.ForeignKey('apis.Employee', on_delete=models.SET_NULL, null=True, blank=True, related_name='headed_departments')
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='children')
+    # Materialized path of ids from the root, e.g. "/1/4/9/". Subtrees are
+    # prefix matches, so "everything under 4" is path__startswith=<4's path>.
+    path = models.CharField(max_length=255, blank=True, editable=False)
     leave_allotments = models.JSONField(default=dict, blank=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.company} - {self.name}"
-    
+
+    def clean_parent(self, parent_path):
+        if not self.parent_id:
+            return
+        if self.parent.company_id != self.company_id:
+            raise ValidationError("Parent department must belong to the same company.")
+        if self.pk and (self.parent_id == self.pk or f'/{self.pk}/' in parent_path):
+            raise ValidationError("A department cannot be moved under itself.")
+
+    def stored_paths(self):
+        # Paths are read from the database since instances may be stale.
+        ids = [pk for pk in (self.pk, self.parent_id) if pk]
+        return dict(Department.objects.filter(pk__in=ids).values_list('id', 'path')) if ids else {}
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            paths = self.stored_paths()
+            parent_path = paths.get(self.parent_id, '/') if self.parent_id else '/'
+            self.clean_parent(parent_path)
+            old_path = paths.get(self.pk, '') if self.pk else ''
+            super().save(*args, **kwargs)
+            path = f"{parent_path}{self.pk}/"
+            if path != old_path:
+                Department.objects.filter(pk=self.pk).update(path=path)
+                if old_path:
+                    self.rewrite_descendant_paths(old_path, path)
+            self.path = path
+
+    def delete(self, *args, **kwargs):
+        # Children are detached (parent SET_NULL) and become roots.
+        with transaction.atomic():
+            path = self.stored_paths().get(self.pk, '')
+            result = super().delete(*args, **kwargs)
+            if path:
+                self.rewrite_descendant_paths(path, '/')
+        return result
+
+    def rewrite_descendant_paths(self, old_path, new_path):
+        Department.objects.filter(company_id=self.company_id, path__startswith=old_path).exclude(pk=self.pk).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=models.CharField())
+        )
+
     class Meta:
         unique_together = ['company', 'name']
+        indexes = [
+            models.Index(fields=['company', 'path']),
+        ]
 
 
 class Policy(models.Model):
@@ -48,6 +100,22 @@ class Policy(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
+        self.invalidate_resolved_policies()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_resolved_policies()
+        return result
+
+    def invalidate_resolved_policies(self):
+        from .policies import invalidate_policy_cache
+        company_id = self.company_id
+        transaction.on_commit(lambda: invalidate_policy_cache(company_id))
+
+    @cached_property
+    def parsed_details(self):
+        # Typed view of `details` (see company.schemas).
+        return parse_policy_details(self.type, self.details)
 
     def __str__(self):
         if self.employee:
@@ -0,0 +1,65 @@
+from django.db.models import Count
+from apis.cache import versioned_key, bump_cache_version, hot_cache
+from .models import Department
+
+
+ORG_CHART_CACHE_NAME = 'org_chart'
+ORG_CHART_CACHE_TIMEOUT = 60 * 60
+
+
+def fetch_org_chart_nodes(company_id):
+    # Every department with its head and headcount in a single query, ordered
+    # by path so parents always come before their children.
+    rows = Department.objects.filter(company_id=company_id).annotate(employee_count=Count('employees')).values(
+        'id', 'name', 'parent_id', 'path', 'head_id', 'head__employee_id', 'head__first_name', 'head__last_name', 'employee_count',
+    ).order_by('path')
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'parent': row['parent_id'],
+            'path': row['path'],
+            'head': {
+                'id': row['head_id'],
+                'employee_id': row['head__employee_id'],
+                'name': f"{row['head__first_name']} {row['head__last_name']}".strip(),
+            } if row['head_id'] else None,
+            'employee_count': row['employee_count'],
+        }
+        for row in rows
+    ]
+
+
+def get_org_chart_nodes(company_id):
+    key = versioned_key(ORG_CHART_CACHE_NAME, company_id)
+    nodes = hot_cache.get(key)
+    if nodes is None:
+        nodes = fetch_org_chart_nodes(company_id)
+        hot_cache.set(key, nodes, timeout=ORG_CHART_CACHE_TIMEOUT)
+    return nodes
+
+
+def invalidate_org_chart(company_id):
+    bump_cache_version(ORG_CHART_CACHE_NAME, company_id)
+
+
+def subtree_nodes(nodes, department_ids):
+    prefixes = tuple(node['path'] for node in nodes if node['id'] in department_ids)
+    return [node for node in nodes if prefixes and node['path'].startswith(prefixes)]
+
+
+def overseen_nodes(nodes, employee_id):
+    # Departments headed by the employee, plus everything below them.
+    return subtree_nodes(nodes, {node['id'] for node in nodes if node['head'] and node['head']['id'] == employee_id})
+
+
+def build_tree(nodes):
+    by_id = {node['id']: {**node, 'children': []} for node in nodes}
+    roots = []
+    for node in by_id.values():
+        parent = by_id.get(node['parent'])
+        if parent is None:
+            roots.append(node)
+        else:
+            parent['children'].append(node)
+    return roots
@@ -0,0 +1,201 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from apis.cache import versioned_key, aversioned_key, bump_cache_version, hot_cache
+from .models import Policy
+
+
+POLICY_CACHE_NAME = 'policy'
+POLICY_CACHE_TIMEOUT = 60 * 15
+
+POLICY_TYPES = [choice[0] for choice in Policy.POLICY_TYPE_CHOICES]
+
+
+def _specificity(policy):
+    if policy.employee_id:
+        return 2
+    if policy.department_id:
+        return 1
+    return 0
+
+
+def _pick_most_specific(policies):
+    resolved = {}
+    for policy in policies:
+        current = resolved.get(policy.type)
+        if current is None or _specificity(policy) > _specificity(current):
+            resolved[policy.type] = policy
+    return [resolved[policy_type] for policy_type in POLICY_TYPES if policy_type in resolved]
+
+
+def _parsed(policies):
+    # Parses the details before caching so cached copies carry them.
+    for policy in policies:
+        policy.parsed_details
+    return policies
+
+
+def _effective_scope(department_id=None, employee_id=None):
+    scope = Q(department__isnull=True, employee__isnull=True)
+    if department_id:
+        scope |= Q(department_id=department_id, employee__isnull=True)
+    if employee_id:
+        scope |= Q(employee_id=employee_id)
+    return scope
+
+
+def fetch_effective_policies(company_id, department_id=None, employee_id=None):
+    # Company, department and employee scoped rows in a single query; the most
+    # specific row per type wins.
+    return _pick_most_specific(Policy.objects.filter(_effective_scope(department_id, employee_id), company_id=company_id))
+
+
+def resolve_effective_policies(company_id, department_id=None, employee_id=None):
+    key = versioned_key(POLICY_CACHE_NAME, company_id, department_id or 0, employee_id or 0)
+    policies = hot_cache.get(key)
+    if policies is None:
+        policies = fetch_effective_policies(company_id, department_id, employee_id)
+        hot_cache.set(key, _parsed(policies), timeout=POLICY_CACHE_TIMEOUT)
+    return policies
+
+
+async def afetch_effective_policies(company_id, department_id=None, employee_id=None):
+    return _pick_most_specific([
+        policy async for policy in Policy.objects.filter(_effective_scope(department_id, employee_id), company_id=company_id)
+    ])
+
+
+async def aresolve_effective_policies(company_id, department_id=None, employee_id=None):
+    key = await aversioned_key(POLICY_CACHE_NAME, company_id, department_id or 0, employee_id or 0)
+    policies = await hot_cache.aget(key)
+    if policies is None:
+        policies = await afetch_effective_policies(company_id, department_id, employee_id)
+        await hot_cache.aset(key, _parsed(policies), timeout=POLICY_CACHE_TIMEOUT)
+    return policies
+
+
+def pick_effective_policies(policies, department_id=None, employee_id=None):
+    # In-memory counterpart of fetch_effective_policies for callers that
+    # already hold every policy of the company.
+    return _pick_most_specific(
+        policy for policy in policies
+        if (policy.employee_id and policy.employee_id == employee_id)
+        or (not policy.employee_id and policy.department_id and policy.department_id == department_id)
+        or (not policy.employee_id and not policy.department_id)
+    )
+
+
+def resolve_company_policies(company_id):
+    key = versioned_key(POLICY_CACHE_NAME, company_id, 'all')
+    policies = hot_cache.get(key)
+    if policies is None:
+        policies = list(Policy.objects.filter(company_id=company_id))
+        hot_cache.set(key, _parsed(policies), timeout=POLICY_CACHE_TIMEOUT)
+    return policies
+
+
+def resolve_policies_for_employee(employee):
+    return resolve_effective_policies(employee.company_id, employee.department_id, employee.id)
+
+
+def invalidate_policy_cache(company_id):
+    bump_cache_version(POLICY_CACHE_NAME, company_id)
+
+
+class PolicyExistsError(Exception):
+    def __init__(self, policy_type):
+        super().__init__(f"A policy of type '{policy_type}' already exists. Please update it to make changes.")
+        self.policy_type = policy_type
+
+
+def _policy_key(policy_type, department_id, employee_id):
+    # Employee scoped rows are unique per employee regardless of the department
+    # they were stored with.
+    return (policy_type, None if employee_id else department_id, employee_id)
+
+
+def bulk_upsert_policies(company, items, update_existing=False):
+    # `items` are PolicyBulkItemSerializer validated dicts. Referenced rows are
+    # resolved with one in_bulk per model and existing policies with one query,
+    # so the cost does not grow with the number of items.
+    from apis.models import Employee
+    from .bootstrap import invalidate_company_bootstrap
+    from .models import Department
+
+    employee_ids = {item['employee'] for item in items if item.get('employee')}
+    department_ids = {item['department'] for item in items if item.get('department')}
+    employees = Employee.objects.filter(company=company).only('id', 'department_id').in_bulk(employee_ids) if employee_ids else {}
+    departments = Department.objects.filter(company=company).only('id').in_bulk(department_ids) if department_ids else {}
+
+    errors = []
+    resolved = []
+    seen = set()
+    for item in items:
+        item_errors = {}
+        employee_id = item.get('employee')
+        department_id = item.get('department')
+        if employee_id:
+            employee = employees.get(employee_id)
+            if employee is None:
+                item_errors['employee'] = 'Employee must belong to the specified company.'
+            else:
+                if department_id and department_id != employee.department_id:
+                    item_errors['employee'] = 'Employee must belong to the specified department.'
+                department_id = employee.department_id
+        elif department_id and department_id not in departments:
+            item_errors['department'] = 'Department must belong to the specified company.'
+
+        key = _policy_key(item['type'], department_id, employee_id)
+        if key in seen:
+            item_errors['type'] = 'Duplicate policy in request.'
+        seen.add(key)
+        errors.append(item_errors)
+        resolved.append((key, department_id, item))
+
+    if any(errors):
+        raise serializers.ValidationError(errors)
+
+    scope = Q(department__isnull=True, employee__isnull=True)
+    if department_ids:
+        scope |= Q(department_id__in=department_ids, employee__isnull=True)
+    if employees:
+        scope |= Q(employee_id__in=employees.keys())
+    existing = {
+        _policy_key(policy.type, policy.department_id, policy.employee_id): policy
+        for policy in Policy.objects.filter(scope, company=company, type__in={key[0] for key in seen})
+    }
+
+    to_create = []
+    to_update = []
+    now = timezone.now()
+    for key, department_id, item in resolved:
+        policy = existing.get(key)
+        if policy is None:
+            to_create.append(Policy(
+                company=company,
+                department_id=department_id,
+                employee_id=item.get('employee'),
+                type=item['type'],
+                title=item['title'],
+                details=item.get('details', {}),
+                effective_date=item.get('effective_date'),
+            ))
+        elif not update_existing:
+            raise PolicyExistsError(item['type'])
+        else:
+            policy.title = item['title']
+            policy.details = item.get('details', {})
+            policy.effective_date = item.get('effective_date')
+            policy.updated_at = now
+            to_update.append(policy)
+
+    with transaction.atomic():
+        if to_create:
+            Policy.objects.bulk_create(to_create)
+        if to_update:
+            Policy.objects.bulk_update(to_update, ['title', 'details', 'effective_date', 'updated_at'])
+        transaction.on_commit(lambda: invalidate_policy_cache(company.id))
+        transaction.on_commit(lambda: invalidate_company_bootstrap(company.id))
+
+    return to_create, to_update
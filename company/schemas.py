@@ -0,0 +1,353 @@
+import re
+from datetime import time
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+
+
+# Schemas of the JSON documents kept in JSONFields (Policy.details per policy
+# type, Department.leave_allotments, Employee.working_hours and
+# Employee.emergency_contact), in a small JSON Schema subset. They are
+# compiled once into nested validator functions (compile_schemas, called from
+# CompanyConfig.ready) and checked by the serializers on write. Readers go
+# through the typed representations further down instead of walking dicts.
+#
+# Numeric strings ("10") are accepted where numbers are expected, and bounded
+# like numbers: the consumers always coerced them and existing clients send
+# them.
+COUNT = {'type': ['integer', 'string'], 'minimum': 0, 'pattern': r'^\d+$'}
+AMOUNT = {'type': ['number', 'string'], 'minimum': 0, 'pattern': r'^\d+(\.\d+)?$'}
+TIME = {'type': 'string', 'format': 'time'}
+
+WORKING_HOURS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'start': TIME,
+        'end': TIME,
+        'minutes': {**COUNT, 'maximum': 24 * 60},
+        'days_per_month': {**AMOUNT, 'exclusiveMinimum': 0, 'maximum': 31},
+    },
+}
+
+POLICY_DETAILS_SCHEMAS = {
+    'working_hours': WORKING_HOURS_SCHEMA,
+    'late': {
+        'type': 'object',
+        'properties': {
+            'grace_minutes': COUNT,
+            'deduction_multiplier': AMOUNT,
+        },
+    },
+    'overtime': {
+        'type': 'object',
+        'properties': {
+            'after_minutes': COUNT,
+            'min_minutes': COUNT,
+            'rate_multiplier': AMOUNT,
+        },
+    },
+    'leave': {
+        'type': 'object',
+        'properties': {
+            'unpaid_types': {'type': 'array', 'items': {'type': 'string', 'minLength': 1, 'maxLength': 50}},
+        },
+    },
+    # Not read by any calculation.
+    'attendance': {'type': 'object'},
+    'others': {'type': 'object'},
+}
+
+DOCUMENT_SCHEMAS = {
+    'leave_allotments': {
+        'type': 'object',
+        'propertyNames': {'type': 'string', 'minLength': 1, 'maxLength': 50},
+        'additionalProperties': AMOUNT,
+    },
+    'employee_working_hours': {
+        'type': 'object',
+        'properties': {key: WORKING_HOURS_SCHEMA['properties'][key] for key in ('start', 'end', 'minutes')},
+    },
+    'emergency_contact': {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string', 'maxLength': 255},
+            'phone': {'type': 'string', 'maxLength': 32},
+            'relation': {'type': 'string', 'maxLength': 64},
+        },
+    },
+}
+
+
+def _parse_time(value):
+    try:
+        return time.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+_TYPES = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+}
+_FORMATS = {
+    'time': (lambda value: _parse_time(value) is not None, 'a time (HH:MM)'),
+}
+KEYWORDS = frozenset((
+    'type', 'properties', 'additionalProperties', 'propertyNames', 'required', 'items', 'enum',
+    'minimum', 'maximum', 'exclusiveMinimum', 'minLength', 'maxLength', 'pattern', 'format',
+))
+
+
+def _at(path, message):
+    return f'{path}: {message}' if path else message
+
+
+def compile_schema(schema):
+    # Returns validate(value, path, errors), appending messages to `errors`.
+    # Like JSON Schema, keywords only apply to values of their own type
+    # (numeric strings aside, see above).
+    unknown = set(schema) - KEYWORDS
+    if unknown:
+        raise ImproperlyConfigured(f"Unsupported schema keywords: {', '.join(sorted(unknown))}")
+    types = schema.get('type')
+    types = [types] if isinstance(types, str) else types
+    type_checks = [_TYPES[name] for name in types] if types else None
+    checks = []
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+        checks.append(lambda value, path, errors: value in allowed or errors.append(_at(path, f'must be one of {allowed}')))
+
+    bounds = [
+        (schema.get('minimum'), lambda value, bound: value >= bound, 'at least'),
+        (schema.get('exclusiveMinimum'), lambda value, bound: value > bound, 'greater than'),
+        (schema.get('maximum'), lambda value, bound: value <= bound, 'at most'),
+    ]
+    bounds = [(bound, test, label) for bound, test, label in bounds if bound is not None]
+    if bounds:
+        def check_bounds(value, path, errors):
+            if isinstance(value, str):
+                try:
+                    value = float(value)
+                except ValueError:
+                    return
+            elif not _TYPES['number'](value):
+                return
+            for bound, test, label in bounds:
+                if not test(value, bound):
+                    errors.append(_at(path, f'must be {label} {bound}'))
+        checks.append(check_bounds)
+
+    min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+    pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+    format_check = _FORMATS[schema['format']] if 'format' in schema else None
+    if min_length is not None or max_length is not None or pattern or format_check:
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                errors.append(_at(path, f'must have at least {min_length} characters'))
+            if max_length is not None and len(value) > max_length:
+                errors.append(_at(path, f'must have at most {max_length} characters'))
+            if pattern and not pattern.match(value):
+                errors.append(_at(path, 'has an invalid format'))
+            if format_check and not format_check[0](value):
+                errors.append(_at(path, f'must be {format_check[1]}'))
+        checks.append(check_string)
+
+    properties = {key: compile_schema(sub) for key, sub in schema.get('properties', {}).items()}
+    additional = schema.get('additionalProperties', True)
+    additional = compile_schema(additional) if isinstance(additional, dict) else additional
+    names = compile_schema(schema['propertyNames']) if 'propertyNames' in schema else None
+    required = tuple(schema.get('required', ()))
+    if properties or additional is not True or names or required:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(_at(path, f"'{key}' is required"))
+            for key, item in value.items():
+                item_path = f'{path}.{key}' if path else str(key)
+                if names is not None:
+                    names(key, item_path, errors)
+                validate = properties.get(key, additional)
+                if validate is False:
+                    errors.append(_at(item_path, 'is not allowed'))
+                elif validate is not True:
+                    validate(item, item_path, errors)
+        checks.append(check_object)
+
+    items = compile_schema(schema['items']) if 'items' in schema else None
+    if items is not None:
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    items(item, f'{path}[{index}]', errors)
+        checks.append(check_items)
+
+    def validate(value, path, errors):
+        if type_checks is not None and not any(check(value) for check in type_checks):
+            errors.append(_at(path, f"must be of type {' or '.join(types)}"))
+            return
+        for check in checks:
+            check(value, path, errors)
+
+    return validate
+
+
+_validators = {}
+
+
+def compile_schemas():
+    _validators.clear()
+    for policy_type, schema in POLICY_DETAILS_SCHEMAS.items():
+        _validators[f'policy:{policy_type}'] = compile_schema(schema)
+    for name, schema in DOCUMENT_SCHEMAS.items():
+        _validators[name] = compile_schema(schema)
+
+
+def validate_document(name, document):
+    errors = []
+    _validators[name](document, '', errors)
+    if errors:
+        raise ValidationError(errors)
+    return document
+
+
+def validate_policy_details(policy_type, details):
+    return validate_document(f'policy:{policy_type}', details)
+
+
+# Typed, read-only views of the documents. Parsing is lenient so rows written
+# before validation existed still load: values that do not parse count as
+# absent (None) and readers apply their defaults.
+def _count(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _amount(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if 0 <= number < float('inf') else None
+
+
+class WorkingHours:
+    __slots__ = ('start', 'end', 'minutes', 'days_per_month')
+
+    def __init__(self, start=None, end=None, minutes=None, days_per_month=None):
+        self.start = start
+        self.end = end
+        self.minutes = minutes
+        self.days_per_month = days_per_month
+
+    @classmethod
+    def parse(cls, document):
+        document = document if isinstance(document, dict) else {}
+        return cls(
+            _parse_time(document['start']) if document.get('start') else None,
+            _parse_time(document['end']) if document.get('end') else None,
+            _count(document.get('minutes')),
+            _amount(document.get('days_per_month')),
+        )
+
+    def merged(self, override):
+        # `override` (an employee's own hours) wins wherever it is set.
+        return WorkingHours(*(
+            getattr(self, name) if getattr(override, name) is None else getattr(override, name)
+            for name in self.__slots__
+        ))
+
+
+class LatePolicy:
+    __slots__ = ('grace_minutes', 'deduction_multiplier')
+
+    def __init__(self, grace_minutes=None, deduction_multiplier=None):
+        self.grace_minutes = grace_minutes
+        self.deduction_multiplier = deduction_multiplier
+
+    @classmethod
+    def parse(cls, document):
+        document = document if isinstance(document, dict) else {}
+        return cls(_count(document.get('grace_minutes')), _amount(document.get('deduction_multiplier')))
+
+
+class OvertimePolicy:
+    __slots__ = ('after_minutes', 'min_minutes', 'rate_multiplier')
+
+    def __init__(self, after_minutes=None, min_minutes=None, rate_multiplier=None):
+        self.after_minutes = after_minutes
+        self.min_minutes = min_minutes
+        self.rate_multiplier = rate_multiplier
+
+    @classmethod
+    def parse(cls, document):
+        document = document if isinstance(document, dict) else {}
+        return cls(
+            _count(document.get('after_minutes')),
+            _count(document.get('min_minutes')),
+            _amount(document.get('rate_multiplier')),
+        )
+
+
+class LeavePolicy:
+    __slots__ = ('unpaid_types',)
+
+    def __init__(self, unpaid_types=None):
+        self.unpaid_types = unpaid_types
+
+    @classmethod
+    def parse(cls, document):
+        document = document if isinstance(document, dict) else {}
+        unpaid_types = document.get('unpaid_types')
+        if not isinstance(unpaid_types, list) or not unpaid_types:
+            return cls()
+        return cls(frozenset(str(leave_type) for leave_type in unpaid_types))
+
+
+class LeaveAllotments:
+    __slots__ = ('amounts',)
+
+    def __init__(self, amounts):
+        self.amounts = amounts
+
+    @classmethod
+    def parse(cls, document):
+        amounts = {}
+        for leave_type, value in (document if isinstance(document, dict) else {}).items():
+            try:
+                amount = Decimal(str(value))
+            except (InvalidOperation, ValueError):
+                continue
+            if amount.is_finite() and amount >= 0:
+                amounts[str(leave_type)] = amount
+        return cls(amounts)
+
+    def __contains__(self, leave_type):
+        return leave_type in self.amounts
+
+    def accruable(self):
+        return {leave_type: amount for leave_type, amount in self.amounts.items() if amount > 0}
+
+
+POLICY_DETAIL_TYPES = {
+    'working_hours': WorkingHours,
+    'late': LatePolicy,
+    'overtime': OvertimePolicy,
+    'leave': LeavePolicy,
+}
+
+
+def parse_policy_details(policy_type, details):
+    # Typed details for the types calculations read, the plain dict otherwise.
+    detail_type = POLICY_DETAIL_TYPES.get(policy_type)
+    return detail_type.parse(details) if detail_type else (details or {})
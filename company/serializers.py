@@ -1,13 +1,17 @@
+import zoneinfo
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 from apis.models import Company
+from apis.serializers import PlainListSerializer
 from .models import Policy, Department
+from .schemas import validate_document, validate_policy_details
 
 class CompanyInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = [
             'id', 'name', 'ownerName', 'email', 'industry', 'size', 'address',
-            'countryCode', 'phone', 'logo', 'tax_id', 'website'
+            'countryCode', 'phone', 'logo', 'tax_id', 'website', 'time_zone'
         ]
         extra_kwargs = {
             'name': {'required': True},
@@ -20,18 +24,37 @@ class CompanyInfoSerializer(serializers.ModelSerializer):
             'logo': {'required': False, 'allow_null': True},
             'tax_id': {'required': False, 'allow_null': True},
             'website': {'required': False, 'allow_null': True},
+            'time_zone': {'required': False},
         }
 
+    def validate_time_zone(self, value):
+        if value not in zoneinfo.available_timezones():
+            raise serializers.ValidationError('Unknown time zone.')
+        return value
+
+
+def _validate_details(policy_type, details):
+    try:
+        validate_policy_details(policy_type, details)
+    except DjangoValidationError as e:
+        raise serializers.ValidationError({'details': e.messages})
+
 
 class PolicySerializer(serializers.ModelSerializer):
     class Meta:
         model = Policy
+        list_serializer_class = PlainListSerializer
         fields = [
             'id', 'company', 'department', 'employee', 'type', 'title', 'details',
             'effective_date', 'created_at', 'updated_at'
         ]
 
     def validate(self, attrs):
+        if 'details' in attrs or 'type' in attrs:
+            # Changing only the type checks the stored details against it.
+            policy_type = attrs.get('type', getattr(self.instance, 'type', None))
+            _validate_details(policy_type, attrs.get('details', getattr(self.instance, 'details', {})))
+
         employee = attrs.get('employee')
         department = attrs.get('department')
         company = attrs.get('company')
@@ -59,7 +82,8 @@ class PolicySerializer(serializers.ModelSerializer):
 class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Department
-        fields = ['id', 'company', 'name', 'leave_allotments', 'created_at', 'updated_at']
+        fields = ['id', 'company', 'name', 'parent', 'path', 'leave_allotments', 'created_at', 'updated_at']
+        read_only_fields = ['path']
         extra_kwargs = {
             'company': {'required': True},
             'name': {'required': True},
@@ -78,4 +102,23 @@ class DepartmentSerializer(serializers.ModelSerializer):
         if Department.objects.filter(company=company, name=name).exists():
             raise serializers.ValidationError({'name': 'Department with this name already exists in the company.'})
 
-        return attrs
\ No newline at end of file
+        parent = attrs.get('parent')
+        if parent and parent.company_id != company.id:
+            raise serializers.ValidationError({'parent': 'Parent department must belong to the same company.'})
+
+        return attrs
+
+    def validate_leave_allotments(self, value):
+        return validate_document('leave_allotments', value)
+
+class PolicyBulkItemSerializer(serializers.Serializer):
+    department = serializers.IntegerField(required=False, allow_null=True)
+    employee = serializers.IntegerField(required=False, allow_null=True)
+    type = serializers.ChoiceField(choices=Policy.POLICY_TYPE_CHOICES)
+    title = serializers.CharField(max_length=255)
+    details = serializers.JSONField(required=False, default=dict)
+    effective_date = serializers.DateField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        _validate_details(attrs['type'], attrs['details'])
+        return attrs
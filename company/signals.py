@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apis.models import Company, Employee
+from .bootstrap import invalidate_company_bootstrap
+from .orgchart import invalidate_org_chart
+from .models import Policy, Department
+
+
+@receiver([post_save, post_delete], sender=Company)
+def company_changed(sender, instance, **kwargs):
+    company_id = instance.pk
+    transaction.on_commit(lambda: invalidate_company_bootstrap(company_id))
+
+
+@receiver([post_save, post_delete], sender=Policy)
+@receiver([post_save, post_delete], sender=Department)
+def company_rows_changed(sender, instance, **kwargs):
+    company_id = instance.company_id
+    transaction.on_commit(lambda: invalidate_company_bootstrap(company_id))
+
+
+# Head names and headcounts are part of the org chart, so any employee write
+# invalidates it along with department changes.
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Employee)
+def org_chart_rows_changed(sender, instance, **kwargs):
+    company_id = instance.company_id
+    transaction.on_commit(lambda: invalidate_org_chart(company_id))
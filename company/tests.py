@@ -1,3 +1,220 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apis.cache import hot_cache
+from apis.models import Company, CustomUser, Employee
+from apis.serializers import MyTokenObtainPairSerializer
+from .models import Department, Policy
+from .policies import resolve_effective_policies, bulk_upsert_policies, PolicyExistsError
+from .schemas import (
+    LeaveAllotments, LeavePolicy, OvertimePolicy, WorkingHours, compile_schema, validate_document,
+    validate_policy_details,
+)
 
-# Create your tests here.
+
+def titles(policies):
+    return {policy.type: policy.title for policy in policies}
+
+
+class PolicyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear_local()
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        self.department = Department.objects.create(company=self.company, name='Engineering', leave_allotments={})
+        self.other_department = Department.objects.create(company=self.company, name='Sales', leave_allotments={})
+        self.user = CustomUser.objects.create_user(username='emp', email='emp@acme.test', password='secret', company=self.company)
+        self.employee = Employee.objects.create(
+            employee_id='E1', user=self.user, company=self.company, department=self.department,
+            first_name='Emp', employee_type='office', joining_date=datetime.date(2024, 1, 1),
+        )
+        for policy_type in ('leave', 'late', 'overtime'):
+            Policy.objects.create(company=self.company, type=policy_type, title=f'company-{policy_type}')
+        Policy.objects.create(company=self.company, department=self.department, type='late', title='department-late')
+        Policy.objects.create(company=self.company, department=self.department, type='overtime', title='department-overtime')
+        Policy.objects.create(company=self.company, department=self.other_department, type='leave', title='sales-leave')
+        Policy.objects.create(company=self.company, department=self.department, employee=self.employee, type='overtime', title='employee-overtime')
+
+
+class PolicyResolutionTests(PolicyTestCase):
+    def test_most_specific_policy_wins(self):
+        self.assertEqual(titles(resolve_effective_policies(self.company.id, self.department.id, self.employee.id)), {
+            'leave': 'company-leave', 'late': 'department-late', 'overtime': 'employee-overtime',
+        })
+        self.assertEqual(titles(resolve_effective_policies(self.company.id, self.department.id)), {
+            'leave': 'company-leave', 'late': 'department-late', 'overtime': 'department-overtime',
+        })
+        self.assertEqual(titles(resolve_effective_policies(self.company.id)), {
+            'leave': 'company-leave', 'late': 'company-late', 'overtime': 'company-overtime',
+        })
+
+    def test_resolved_policies_are_cached_until_a_commit_invalidates_them(self):
+        resolve_effective_policies(self.company.id, self.department.id, self.employee.id)
+        with CaptureQueriesContext(connection) as queries:
+            resolve_effective_policies(self.company.id, self.department.id, self.employee.id)
+        self.assertFalse([query for query in queries if 'company_policy' in query['sql']])
+
+        policy = Policy.objects.get(title='employee-overtime')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            policy.delete()
+        # Nothing is invalidated before the transaction commits.
+        self.assertEqual(titles(resolve_effective_policies(self.company.id, self.department.id, self.employee.id))['overtime'], 'employee-overtime')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(titles(resolve_effective_policies(self.company.id, self.department.id, self.employee.id))['overtime'], 'department-overtime')
+
+    def test_view_resolves_the_scope_from_token_claims(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {MyTokenObtainPairSerializer.get_token(self.user).access_token}')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/apis/v1/company/policy/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({policy['type']: policy['title'] for policy in response.json()['data']['policies']}['overtime'], 'employee-overtime')
+        self.assertFalse([query for query in queries if 'apis_employee' in query['sql']])
+
+    def test_moving_an_employee_revokes_the_department_claim(self):
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        token['iat'] -= 1
+        self.employee.department = self.other_department
+        self.employee.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(client.get('/apis/v1/company/policy/').status_code, 401)
+
+
+class BulkUpsertPolicyTests(PolicyTestCase):
+    def test_new_rows_are_inserted_and_existing_rows_updated(self):
+        items = [
+            {'type': 'late', 'title': 'company-late-2', 'details': {}},
+            {'type': 'attendance', 'title': 'department-attendance', 'department': self.department.id, 'details': {}},
+            {'type': 'late', 'title': 'employee-late', 'employee': self.employee.id, 'details': {}},
+            {'type': 'overtime', 'title': 'employee-overtime-2', 'employee': self.employee.id, 'details': {}},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            created, updated = bulk_upsert_policies(self.company, items, update_existing=True)
+
+        self.assertEqual(sorted(policy.title for policy in created), ['department-attendance', 'employee-late'])
+        self.assertEqual(sorted(policy.title for policy in updated), ['company-late-2', 'employee-overtime-2'])
+        # Employee rows take the employee's department.
+        self.assertEqual(Policy.objects.get(title='employee-late').department_id, self.department.id)
+        self.assertEqual(Policy.objects.filter(company=self.company).count(), 9)
+        self.assertEqual(titles(resolve_effective_policies(self.company.id, self.department.id, self.employee.id))['late'], 'employee-late')
+
+    def test_existing_rows_are_rejected_without_upsert(self):
+        with self.assertRaises(PolicyExistsError):
+            bulk_upsert_policies(self.company, [
+                {'type': 'attendance', 'title': 'company-attendance', 'details': {}},
+                {'type': 'late', 'title': 'company-late-2', 'details': {}},
+            ])
+        self.assertFalse(Policy.objects.filter(type='attendance').exists())
+
+
+class DocumentSchemaTests(SimpleTestCase):
+    def errors(self, name, document):
+        with self.assertRaises(ValidationError) as raised:
+            validate_document(name, document)
+        return raised.exception.messages
+
+    def policy_errors(self, policy_type, details):
+        with self.assertRaises(ValidationError) as raised:
+            validate_policy_details(policy_type, details)
+        return raised.exception.messages
+
+    def test_valid_documents_pass(self):
+        for policy_type, details in (
+            ('working_hours', {'start': '09:00', 'end': '18:30', 'minutes': 480, 'days_per_month': '26'}),
+            ('late', {'grace_minutes': '10', 'deduction_multiplier': 1.5}),
+            ('overtime', {'after_minutes': 0, 'min_minutes': '30', 'rate_multiplier': '2.25'}),
+            ('leave', {'unpaid_types': ['unpaid', 'lop']}),
+            ('attendance', {'anything': [1, 'two']}),
+            ('others', {}),
+        ):
+            self.assertEqual(validate_policy_details(policy_type, details), details)
+        for name, document in (
+            ('leave_allotments', {'casual': 12, 'sick': '7.5', 'unpaid': '0'}),
+            ('employee_working_hours', {'start': '10:00', 'minutes': '1440', 'note': 'kept'}),
+            ('emergency_contact', {'name': 'Asha', 'phone': '+91 98765 43210', 'relation': 'sister'}),
+        ):
+            self.assertEqual(validate_document(name, document), document)
+
+    def test_invalid_policy_details_report_every_error(self):
+        self.assertEqual(self.policy_errors('working_hours', {'start': '9am', 'end': 900, 'minutes': 1441, 'days_per_month': 32}), [
+            'start: must be a time (HH:MM)', 'end: must be of type string',
+            'minutes: must be at most 1440', 'days_per_month: must be at most 31',
+        ])
+        self.assertEqual(self.policy_errors('late', {'grace_minutes': 2.5, 'deduction_multiplier': True}), [
+            'grace_minutes: must be of type integer or string', 'deduction_multiplier: must be of type number or string',
+        ])
+        self.assertEqual(self.policy_errors('overtime', {'min_minutes': -5, 'rate_multiplier': 'double'}), [
+            'min_minutes: must be at least 0', 'rate_multiplier: has an invalid format',
+        ])
+        self.assertEqual(self.policy_errors('leave', {'unpaid_types': ['unpaid', '', 'x' * 51]}), [
+            'unpaid_types[1]: must have at least 1 characters', 'unpaid_types[2]: must have at most 50 characters',
+        ])
+        self.assertEqual(self.policy_errors('attendance', ['not', 'an', 'object']), ['must be of type object'])
+
+    def test_numeric_strings_are_bounded_like_numbers(self):
+        self.assertEqual(self.policy_errors('working_hours', {'minutes': '1441', 'days_per_month': '0'}), [
+            'minutes: must be at most 1440', 'days_per_month: must be greater than 0',
+        ])
+        self.assertEqual(self.policy_errors('working_hours', {'minutes': '-1', 'days_per_month': '31.5'}), [
+            'minutes: must be at least 0', 'minutes: has an invalid format', 'days_per_month: must be at most 31',
+        ])
+        self.assertEqual(validate_policy_details('working_hours', {'days_per_month': '30.5'}), {'days_per_month': '30.5'})
+
+    def test_leave_allotments_check_names_and_amounts(self):
+        self.assertEqual(self.errors('leave_allotments', {'': 1, 'y' * 51: 2, 'casual': -1, 'sick': 'ten', 'earned': None}), [
+            'must have at least 1 characters', f"{'y' * 51}: must have at most 50 characters",
+            'casual: must be at least 0', 'sick: has an invalid format', 'earned: must be of type number or string',
+        ])
+
+    def test_invalid_documents(self):
+        self.assertEqual(self.errors('employee_working_hours', {'end': '25:00', 'minutes': '1500'}), [
+            'end: must be a time (HH:MM)', 'minutes: must be at most 1440',
+        ])
+        self.assertEqual(self.errors('emergency_contact', {'name': 'A' * 256, 'phone': 9876543210}), [
+            'name: must have at most 255 characters', 'phone: must be of type string',
+        ])
+
+    def test_compiled_keywords(self):
+        errors = []
+        validate = compile_schema({
+            'type': 'object', 'required': ['kind'], 'additionalProperties': False,
+            'properties': {'kind': {'enum': ['a', 'b']}, 'size': {'type': 'integer', 'minimum': 1}},
+        })
+        validate({'kind': 'c', 'size': 0, 'extra': 1}, '', errors)
+        validate({}, 'root', errors)
+        self.assertEqual(errors, [
+            "kind: must be one of ['a', 'b']", 'size: must be at least 1', 'extra: is not allowed', "root: 'kind' is required",
+        ])
+        with self.assertRaises(ImproperlyConfigured):
+            compile_schema({'type': 'object', 'patternProperties': {}})
+
+
+class LegacyDocumentParsingTests(SimpleTestCase):
+    # Rows written before validation existed load; bad values read as absent.
+    def test_unparseable_values_count_as_absent(self):
+        hours = WorkingHours.parse({'start': '9 am', 'end': '18:00', 'minutes': 'eight hours', 'days_per_month': '-3'})
+        self.assertEqual((hours.start, hours.end, hours.minutes, hours.days_per_month), (None, datetime.time(18), None, None))
+        hours = WorkingHours.parse({'minutes': '-30', 'days_per_month': 'inf'})
+        self.assertEqual((hours.minutes, hours.days_per_month), (0, None))
+        overtime = OvertimePolicy.parse({'after_minutes': '60', 'min_minutes': None, 'rate_multiplier': '1.5'})
+        self.assertEqual((overtime.after_minutes, overtime.min_minutes, overtime.rate_multiplier), (60, None, 1.5))
+        self.assertIsNone(LeavePolicy.parse({'unpaid_types': 'unpaid'}).unpaid_types)
+        self.assertEqual(LeavePolicy.parse({'unpaid_types': ['lop', 7]}).unpaid_types, frozenset({'lop', '7'}))
+
+    def test_documents_that_are_not_objects_parse_empty(self):
+        for document in (None, [], 'text'):
+            self.assertIsNone(WorkingHours.parse(document).minutes)
+            self.assertEqual(LeaveAllotments.parse(document).amounts, {})
+
+    def test_leave_allotments_keep_valid_amounts_only(self):
+        allotments = LeaveAllotments.parse({'casual': '12', 'sick': 7.5, 'unpaid': 0, 'earned': 'NaN', 'comp': -1, 'bad': 'x', 5: '2'})
+        self.assertEqual(allotments.amounts, {'casual': Decimal('12'), 'sick': Decimal('7.5'), 'unpaid': Decimal('0'), '5': Decimal('2')})
+        self.assertEqual(set(allotments.accruable()), {'casual', 'sick', '5'})
+        self.assertIn('unpaid', allotments)
@@ -1,13 +1,42 @@
-from rest_framework import status
+import asyncio
+from rest_framework import status, serializers
 from rest_framework.views import APIView
-from apis.views import JWTAuth
-from .serializers import CompanyInfoSerializer, PolicySerializer, DepartmentSerializer
-from apis.views import JWTAuth
+from django.views import View
+from apis.views import JWTAuth, AsyncJWTAuth
+from apis.authentication import resolve_employee_scope, aresolve_employee_scope
+from .serializers import CompanyInfoSerializer, PolicySerializer, DepartmentSerializer, PolicyBulkItemSerializer
 from django.db import transaction
-from .models import Policy
+from .models import Policy, Department
+from .policies import resolve_effective_policies, aresolve_effective_policies, bulk_upsert_policies, PolicyExistsError
+from .bootstrap import get_user_bootstrap, aget_user_bootstrap, alist
+from .orgchart import get_org_chart_nodes, subtree_nodes, overseen_nodes, build_tree
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from apis.models import Employee, Company
+from apis.streaming import export_response, ENCODERS
+from employee.serializers import EmployeeDirectorySerializer
 
 
 class CompanyView(JWTAuth, APIView):
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request, stateless=True)
+            if user is None:
+                return error
+
+            company = Company.objects.filter(pk=user.company_id).first() if user.company_id else None
+            if company is None:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            return self.success_response({
+                "id": str(company.id),
+                "company_detail": self.serialized(CompanyInfoSerializer(company)),
+                "message": "Company details fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
     def post(self, request):
         try:
             user, error = self.check_jwt_token(request)
@@ -105,7 +134,6 @@ class PolicyView(JWTAuth, APIView):
             company = getattr(user, 'company', None)
             if not company:
                 return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
-            from .models import Policy
 
             def policy_exists(policy_data):
                 policy_type = policy_data.get('type')
@@ -123,20 +151,30 @@ class PolicyView(JWTAuth, APIView):
                 return Policy.objects.filter(**filters).exists()
 
             if is_many:
-                for policy_data in data:
-                    if policy_exists(policy_data):
-                        return self.error_response(
-                            error_message=f"A policy of type '{policy_data.get('type')}' already exists. Please update it to make changes.",
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-            else:
-                if policy_exists(data):
-                    return self.error_response(
-                        error_message=f"A policy of type '{data.get('type')}' already exists. Please update it to make changes.",
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+                items = PolicyBulkItemSerializer(data=data, many=True)
+                if not items.is_valid():
+                    return self.error_response(error_message=items.errors, status=status.HTTP_400_BAD_REQUEST)
+                update_existing = str(request.data.get('upsert', request.query_params.get('upsert', ''))).lower() in ('1', 'true')
+                try:
+                    created, updated = bulk_upsert_policies(company, items.validated_data, update_existing=update_existing)
+                except PolicyExistsError as e:
+                    return self.error_response(error_message=str(e), status=status.HTTP_400_BAD_REQUEST)
+                except serializers.ValidationError as e:
+                    return self.error_response(error_message=e.detail, status=status.HTTP_400_BAD_REQUEST)
+                return self.success_response({
+                    "policy": PolicySerializer(created + updated, many=True).data,
+                    "created": len(created),
+                    "updated": len(updated),
+                    "message": "Policy(s) saved successfully."
+                })
 
-            serializer = PolicySerializer(data=data, many=is_many)
+            if policy_exists(data):
+                return self.error_response(
+                    error_message=f"A policy of type '{data.get('type')}' already exists. Please update it to make changes.",
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            serializer = PolicySerializer(data=data)
             if serializer.is_valid():
                 serializer.save()
                 return self.success_response({
@@ -220,12 +258,12 @@ class PolicyView(JWTAuth, APIView):
         
     def get(self, request):
         try:
-            user, error = self.check_jwt_token(request)
+            user, error = self.check_jwt_token(request, stateless=True)
             if user is None:
                 return error
             
-            company = getattr(user, 'company', None)
-            if not company:
+            company_id = user.company_id
+            if not company_id:
                 return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
 
             scope = request.query_params.get('scope')
@@ -233,66 +271,40 @@ class PolicyView(JWTAuth, APIView):
 
             if scope and scopeId:
                 if scope == 'company':
-                    if str(company.id) != str(scopeId):
+                    if str(company_id) != str(scopeId):
                         return self.error_response(error_message="Unauthorized access to company.", status=status.HTTP_403_FORBIDDEN)
-                    policies = Policy.objects.filter(company=company, department__isnull=True, employee__isnull=True)
+                    policies = Policy.objects.filter(company_id=company_id, department__isnull=True, employee__isnull=True)
                 elif scope == 'department':
                     try:
-                        from .models import Department
-                        department = Department.objects.get(id=scopeId, company=company)
+                        department = Department.objects.get(id=scopeId, company_id=company_id)
                     except Department.DoesNotExist:
                         return self.error_response(error_message="Department not found.", status=status.HTTP_404_NOT_FOUND)
-                    policies = Policy.objects.filter(company=company, department=department, employee__isnull=True)
+                    policies = Policy.objects.filter(company_id=company_id, department=department, employee__isnull=True)
                 elif scope == 'employee':
                     try:
-                        from apis.models import Employee
-                        employee = Employee.objects.get(id=scopeId, company=company)
+                        employee = Employee.objects.get(id=scopeId, company_id=company_id)
                     except Employee.DoesNotExist:
                         return self.error_response(error_message="Employee not found.", status=status.HTTP_404_NOT_FOUND)
-                    policies = Policy.objects.filter(company=company, employee=employee)
+                    policies = Policy.objects.filter(company_id=company_id, employee=employee)
                 else:
                     return self.error_response(error_message="Invalid scope.", status=status.HTTP_400_BAD_REQUEST)
                 
                 serializer = PolicySerializer(policies, many=True)
                 return self.success_response({
-                    "policies": serializer.data,
+                    "policies": self.serialized(serializer),
                     "message": "Policies fetched successfully."
                 }, status=status.HTTP_200_OK)
             else:
-                employee = getattr(user, 'employee', None)
-                department = getattr(employee, 'department', None) if employee else None
-
-                policy_types = dict(Policy.POLICY_TYPE_CHOICES).keys()
-                policies_result = []
-
-                for policy_type in policy_types:
-                    policy = None
-                    if employee:
-                        policy = Policy.objects.filter(
-                            company=company,
-                            employee=employee,
-                            type=policy_type
-                        ).select_related('department', 'employee').first()
-                    if not policy and department:
-                        policy = Policy.objects.filter(
-                            company=company,
-                            department=department,
-                            employee__isnull=True,
-                            type=policy_type
-                        ).select_related('department').first()
-                    if not policy:
-                        policy = Policy.objects.filter(
-                            company=company,
-                            department__isnull=True,
-                            employee__isnull=True,
-                            type=policy_type
-                        ).first()
-                    if policy:
-                        policies_result.append(policy)
+                employee_id, department_id = resolve_employee_scope(user)
+                policies_result = resolve_effective_policies(
+                    company_id,
+                    department_id=department_id,
+                    employee_id=employee_id,
+                )
 
                 serializer = PolicySerializer(policies_result, many=True)
                 return self.success_response({
-                    "policies": serializer.data,
+                    "policies": self.serialized(serializer),
                     "message": "Policies fetched successfully."
                 }, status=status.HTTP_200_OK)
 
@@ -328,4 +340,270 @@ class DepartmentView(JWTAuth, APIView):
             return self.error_response(error_message=department.errors, status=status.HTTP_400_BAD_REQUEST)
 
         except Exception as e:
-            return self.error_response(error_message=f"Something went wrong: {e}")
\ No newline at end of file
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+    # Move a department in the hierarchy or change its head
+    def patch(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            if getattr(user, 'user_type', None) != 'admin':
+                return self.error_response(error_message="Only admin can update departments.", status=status.HTTP_403_FORBIDDEN)
+
+            company = getattr(user, 'company', None)
+            if not company:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            data = request.data
+            department = Department.objects.select_related('parent').filter(id=data.get('id'), company=company).first()
+            if department is None:
+                return self.error_response(error_message="Department not found.", status=status.HTTP_404_NOT_FOUND)
+
+            if 'parent' in data:
+                department.parent = Department.objects.filter(id=data['parent'], company=company).first() if data['parent'] else None
+                if data['parent'] and department.parent is None:
+                    return self.error_response(error_message="Parent department must belong to your company.", status=status.HTTP_400_BAD_REQUEST)
+            if 'head' in data:
+                department.head = Employee.objects.filter(id=data['head'], company=company).first() if data['head'] else None
+                if data['head'] and department.head is None:
+                    return self.error_response(error_message="Head must be an employee of your company.", status=status.HTTP_400_BAD_REQUEST)
+
+            department.save()
+            return self.success_response({
+                "department": DepartmentSerializer(department).data,
+                "message": "Department updated successfully."
+            }, status=status.HTTP_200_OK)
+
+        except ValidationError as e:
+            return self.error_response(error_message=e.messages, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Company org chart: the department tree with heads and headcounts
+class OrgChartView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            try:
+                root = int(request.query_params['root']) if request.query_params.get('root') else None
+                head = int(request.query_params['head']) if request.query_params.get('head') else None
+            except ValueError:
+                return self.error_response(error_message="Invalid root or head.", status=status.HTTP_400_BAD_REQUEST)
+
+            nodes = get_org_chart_nodes(company_id)
+            if root is not None:
+                nodes = subtree_nodes(nodes, {root})
+            if head is not None:
+                nodes = overseen_nodes(nodes, head)
+
+            return self.success_response({
+                "departments": build_tree(nodes),
+                "message": "Org chart fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Login bootstrap payload, so clients can refresh it without logging in again
+class BootstrapView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            bootstrap = get_user_bootstrap(user)
+            return self.success_response({
+                **bootstrap,
+                "role": user.user_type,
+                "message": "Bootstrap fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Export fields mirror the serializers; computed serializer fields map to joins.
+EXPORTS = {
+    'employees': (Employee, EmployeeDirectorySerializer.Meta.fields, {'email': F('user__email'), 'department_name': F('department__name')}),
+    'departments': (Department, DepartmentSerializer.Meta.fields, {}),
+    'policies': (Policy, PolicySerializer.Meta.fields, {}),
+}
+
+
+# Whole-company CSV / JSON lines export for payroll vendors
+class CompanyExportView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request, resource):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            if getattr(user, 'user_type', None) != 'admin':
+                return self.error_response(error_message="Only admin can export company data.", status=status.HTTP_403_FORBIDDEN)
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            if resource not in EXPORTS:
+                return self.error_response(error_message=f"Unknown export '{resource}'.", status=status.HTTP_404_NOT_FOUND)
+            model, fields, expressions = EXPORTS[resource]
+
+            export_format = request.query_params.get('export_format', 'csv')
+            if export_format not in ENCODERS:
+                return self.error_response(error_message=f"Unsupported format '{export_format}'.", status=status.HTTP_400_BAD_REQUEST)
+
+            if request.query_params.get('fields'):
+                requested = [field.strip() for field in request.query_params['fields'].split(',') if field.strip()]
+                unknown = set(requested) - set(fields)
+                if unknown:
+                    return self.error_response(error_message=f"Unknown fields: {', '.join(sorted(unknown))}", status=status.HTTP_400_BAD_REQUEST)
+                fields = requested
+
+            rows = model.objects.filter(company_id=company_id).order_by('id').values(
+                *[field for field in fields if field not in expressions],
+                **{field: expression for field, expression in expressions.items() if field in fields}
+            ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+            return export_response(
+                rows,
+                fields,
+                filename=f"{resource}-{company_id}",
+                export_format=export_format,
+                compress=request.query_params.get('compression') == 'gzip',
+            )
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Async-native read paths for ASGI deployments (routed instead of the views
+# above when ASYNC_VIEWS is set). Writes are delegated to the sync views.
+class AsyncCompanyView(AsyncJWTAuth, View):
+    sync_view = staticmethod(CompanyView.as_view())
+
+    async def get(self, request):
+        try:
+            user, error = await self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company = await Company.objects.filter(pk=user.company_id).afirst() if user.company_id else None
+            if company is None:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            return self.success_response({
+                "id": str(company.id),
+                "company_detail": self.serialized(CompanyInfoSerializer(company)),
+                "message": "Company details fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+    async def post(self, request):
+        return await self.delegate(request)
+
+    async def patch(self, request):
+        return await self.delegate(request)
+
+
+class AsyncPolicyView(AsyncJWTAuth, View):
+    sync_view = staticmethod(PolicyView.as_view())
+
+    async def get(self, request):
+        try:
+            user, error = await self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            scope = request.GET.get('scope')
+            scopeId = request.GET.get('scope_id')
+
+            if scope and scopeId:
+                # The ownership check and the policy read are independent.
+                if scope == 'company':
+                    if str(company_id) != str(scopeId):
+                        return self.error_response(error_message="Unauthorized access to company.", status=status.HTTP_403_FORBIDDEN)
+                    policies = await alist(Policy.objects.filter(company_id=company_id, department__isnull=True, employee__isnull=True))
+                elif scope == 'department':
+                    found, policies = await asyncio.gather(
+                        Department.objects.filter(id=scopeId, company_id=company_id).aexists(),
+                        alist(Policy.objects.filter(company_id=company_id, department_id=scopeId, employee__isnull=True)),
+                    )
+                    if not found:
+                        return self.error_response(error_message="Department not found.", status=status.HTTP_404_NOT_FOUND)
+                elif scope == 'employee':
+                    found, policies = await asyncio.gather(
+                        Employee.objects.filter(id=scopeId, company_id=company_id).aexists(),
+                        alist(Policy.objects.filter(company_id=company_id, employee_id=scopeId)),
+                    )
+                    if not found:
+                        return self.error_response(error_message="Employee not found.", status=status.HTTP_404_NOT_FOUND)
+                else:
+                    return self.error_response(error_message="Invalid scope.", status=status.HTTP_400_BAD_REQUEST)
+            else:
+                employee_id, department_id = await aresolve_employee_scope(user)
+                policies = await aresolve_effective_policies(
+                    company_id,
+                    department_id=department_id,
+                    employee_id=employee_id,
+                )
+
+            serializer = PolicySerializer(policies, many=True)
+            return self.success_response({
+                "policies": self.serialized(serializer),
+                "message": "Policies fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+    async def post(self, request):
+        return await self.delegate(request)
+
+    async def patch(self, request):
+        return await self.delegate(request)
+
+
+class AsyncBootstrapView(AsyncJWTAuth, View):
+    async def get(self, request):
+        try:
+            user, error = await self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            bootstrap = await aget_user_bootstrap(user)
+            return self.success_response({
+                **bootstrap,
+                "role": user.user_type,
+                "message": "Bootstrap fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
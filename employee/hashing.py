@@ -0,0 +1,43 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Process pool for hashing imported passwords. Kept free of model imports:
+# spawned workers import this module before django.setup() has run.
+def _init_hash_worker():
+    import django
+    django.setup()
+
+
+def encode_password(hasher, password):
+    # `hasher` is resolved by the caller, so workers hash with the same
+    # hasher and settings as the web process.
+    return hasher.encode(password, hasher.salt())
+
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def hash_pool(workers):
+    # One pool per web process, shared by every import. Workers are spawned,
+    # not forked, so they inherit neither the request thread's database
+    # connections nor the logging listener thread.
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_hash_worker,
+            )
+        return _hash_pool
+
+
+def discard_hash_pool(pool):
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is pool:
+            _hash_pool = None
+    pool.shutdown(wait=False)
@@ -0,0 +1,240 @@
+import csv
+import io
+import secrets
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from functools import partial
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, get_hasher
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction, IntegrityError
+from django.db.models import Q
+from apis.models import CustomUser, Employee
+from authentication.passwords import InitialPasswordHasher
+from company.models import Department
+from company.orgchart import invalidate_org_chart
+from mailer.outbox import build_email, enqueue_mass_mail
+from .hashing import hash_pool, discard_hash_pool, encode_password
+
+
+REQUIRED_COLUMNS = ('employee_id', 'email', 'first_name', 'department', 'employee_type', 'joining_date')
+EMPLOYEE_TYPES = {choice[0] for choice in Employee.EMPLOYEE_TYPE_CHOICES}
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+
+def iter_csv_rows(uploaded_file):
+    # Decodes and parses the upload one line at a time.
+    reader = csv.DictReader(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        yield {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+
+
+def iter_xlsx_rows(uploaded_file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('XLSX import requires openpyxl; upload a CSV file instead.')
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+    for values in rows:
+        yield {
+            key: value.isoformat()[:10] if isinstance(value, date) else str(value if value is not None else '').strip()
+            for key, value in zip(header, values)
+        }
+
+
+def iter_upload_rows(uploaded_file):
+    if uploaded_file.name.lower().endswith('.xlsx'):
+        return iter_xlsx_rows(uploaded_file)
+    return iter_csv_rows(uploaded_file)
+
+
+class EmployeeImporter:
+    def __init__(self, company_id, batch_size=None, hash_workers=None):
+        self.company_id = company_id
+        self.batch_size = batch_size or settings.EMPLOYEE_IMPORT_BATCH_SIZE
+        self.hash_workers = settings.EMPLOYEE_IMPORT_HASH_WORKERS if hash_workers is None else hash_workers
+        self.departments = {
+            name.lower(): department_id
+            for department_id, name in Department.objects.filter(company_id=company_id).values_list('id', 'name')
+        }
+        self.seen_emails = set()
+        self.seen_employee_ids = set()
+        self.created = 0
+        self.errors = []
+
+    def parse_row(self, row):
+        errors = {}
+        for column in REQUIRED_COLUMNS:
+            if not row.get(column):
+                errors[column] = 'This field is required.'
+        if errors:
+            return None, errors
+
+        email = row['email'].lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors['email'] = 'Enter a valid email address.'
+        if email in self.seen_emails:
+            errors['email'] = 'Duplicate email in file.'
+        if row['employee_id'] in self.seen_employee_ids:
+            errors['employee_id'] = 'Duplicate employee_id in file.'
+        department_id = self.departments.get(row['department'].lower())
+        if department_id is None:
+            errors['department'] = f"Unknown department '{row['department']}'."
+        if row['employee_type'] not in EMPLOYEE_TYPES:
+            errors['employee_type'] = f"Must be one of: {', '.join(sorted(EMPLOYEE_TYPES))}."
+        try:
+            joining_date = date.fromisoformat(row['joining_date'])
+        except ValueError:
+            errors['joining_date'] = 'Use YYYY-MM-DD.'
+        try:
+            dob = date.fromisoformat(row['dob']) if row.get('dob') else None
+        except ValueError:
+            errors['dob'] = 'Use YYYY-MM-DD.'
+        if errors:
+            return None, errors
+
+        self.seen_emails.add(email)
+        self.seen_employee_ids.add(row['employee_id'])
+        return {
+            'employee_id': row['employee_id'],
+            'email': email,
+            'password': row.get('password') or '',
+            'first_name': row['first_name'],
+            'last_name': row.get('last_name', ''),
+            'department_id': department_id,
+            'employee_type': row['employee_type'],
+            'joining_date': joining_date,
+            'dob': dob,
+            'phone': row.get('phone', ''),
+            'address': row.get('address', ''),
+            'bank_account': row.get('bank_account', ''),
+            'overtime_eligible': row.get('overtime_eligible', 'true').lower() in TRUE_VALUES,
+        }, None
+
+    def run(self, rows):
+        executor = hash_pool(self.hash_workers) if self.hash_workers > 1 else None
+        batch = []
+        # Row 1 is the header.
+        for line_number, row in enumerate(rows, start=2):
+            parsed, errors = self.parse_row(row)
+            if errors:
+                self.errors.append({'row': line_number, 'errors': errors})
+                continue
+            batch.append((line_number, parsed))
+            if len(batch) >= self.batch_size:
+                self.flush(batch, executor)
+                batch = []
+        if batch:
+            self.flush(batch, executor)
+        if self.created:
+            # bulk_create sends no signals, so the cached org chart is
+            # invalidated here for the whole import.
+            company_id = self.company_id
+            transaction.on_commit(lambda: invalidate_org_chart(company_id))
+        self.errors.sort(key=lambda error: error['row'])
+        return {'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+
+    @staticmethod
+    def initial_hasher():
+        # Deployments that leave it out of PASSWORD_HASHERS hash at full cost.
+        try:
+            return get_hasher(InitialPasswordHasher.algorithm)
+        except ValueError:
+            return get_hasher()
+
+    def hash_passwords(self, passwords, executor):
+        if executor is None or not passwords:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+        try:
+            return list(executor.map(partial(encode_password, get_hasher()), passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            # A worker died; the next import starts a fresh pool.
+            discard_hash_pool(executor)
+            return [make_password(password) for password in passwords]
+
+    def flush(self, batch, executor):
+        emails = [parsed['email'] for _, parsed in batch]
+        employee_ids = [parsed['employee_id'] for _, parsed in batch]
+        taken_emails = set()
+        for email, username in CustomUser.objects.filter(Q(email__in=emails) | Q(username__in=emails)).values_list('email', 'username'):
+            taken_emails.update((email.lower(), username.lower()))
+        taken_employee_ids = set(Employee.objects.filter(employee_id__in=employee_ids).values_list('employee_id', flat=True))
+
+        accepted = []
+        for line_number, parsed in batch:
+            if parsed['email'] in taken_emails:
+                self.errors.append({'row': line_number, 'errors': {'email': 'A user with this email already exists.'}})
+            elif parsed['employee_id'] in taken_employee_ids:
+                self.errors.append({'row': line_number, 'errors': {'employee_id': 'An employee with this employee_id already exists.'}})
+            else:
+                if not parsed['password']:
+                    parsed['generated_password'] = secrets.token_urlsafe(9)
+                accepted.append((line_number, parsed))
+        if not accepted:
+            return
+
+        # Passwords from the file are hashed at full cost on the pool;
+        # generated ones are random and take the cheap initial hasher.
+        supplied = iter(self.hash_passwords([parsed['password'] for _, parsed in accepted if parsed['password']], executor))
+        initial_hasher = self.initial_hasher()
+        hashes = [
+            next(supplied) if parsed['password'] else encode_password(initial_hasher, parsed['generated_password'])
+            for _, parsed in accepted
+        ]
+        users = [
+            CustomUser(
+                username=parsed['email'],
+                email=parsed['email'],
+                first_name=parsed['first_name'],
+                last_name=parsed['last_name'],
+                password=password_hash,
+                user_type='employee',
+                company_id=self.company_id,
+                isInitialPassword=True,
+            )
+            for (_, parsed), password_hash in zip(accepted, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(users)
+                Employee.objects.bulk_create([
+                    Employee(
+                        user=user,
+                        company_id=self.company_id,
+                        employee_id=parsed['employee_id'],
+                        department_id=parsed['department_id'],
+                        first_name=parsed['first_name'],
+                        last_name=parsed['last_name'],
+                        employee_type=parsed['employee_type'],
+                        joining_date=parsed['joining_date'],
+                        dob=parsed['dob'],
+                        phone=parsed['phone'],
+                        address=parsed['address'],
+                        bank_account=parsed['bank_account'],
+                        overtime_eligible=parsed['overtime_eligible'],
+                    )
+                    for user, (_, parsed) in zip(users, accepted)
+                ])
+                enqueue_mass_mail([
+                    build_email(
+                        subject='Your HRMS account',
+                        message=f"Your HRMS account has been created.\nUsername: {parsed['email']}\nTemporary password: {parsed['generated_password']}\nPlease change it after your first login.",
+                        recipient_list=[parsed['email']],
+                        sensitive=True,
+                    )
+                    for _, parsed in accepted if parsed.get('generated_password')
+                ])
+        except IntegrityError as e:
+            # Rows taken concurrently since the existence check; report the
+            # whole batch instead of guessing which row conflicted.
+            for line_number, _ in accepted:
+                self.errors.append({'row': line_number, 'errors': {'non_field_errors': f'Could not be saved: {e}'}})
+            return
+        self.created += len(accepted)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from apis.models import Employee
+from apis.serializers import PlainListSerializer
+from company.schemas import validate_document
 
 class EmployeeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,4 +16,38 @@ class EmployeeSerializer(serializers.ModelSerializer):
         missing_fields = [field for field in required_fields if field not in validated_data or validated_data[field] in [None, '']]
         if missing_fields:
             raise serializers.ValidationError(f"Missing required fields: {', '.join(missing_fields)}")
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+    def validate_working_hours(self, value):
+        return validate_document('employee_working_hours', value)
+
+    def validate_emergency_contact(self, value):
+        return validate_document('emergency_contact', value)
+
+class EmployeeDirectorySerializer(serializers.ModelSerializer):
+    # JSON blobs are left out of list responses unless asked for via `fields`.
+    BLOB_FIELDS = ('emergency_contact', 'documents', 'working_hours')
+
+    email = serializers.EmailField(source='user.email', read_only=True)
+    department_name = serializers.CharField(source='department.name', read_only=True)
+
+    class Meta:
+        model = Employee
+        list_serializer_class = PlainListSerializer
+        fields = [
+            'id', 'employee_id', 'user', 'email', 'company', 'department', 'department_name',
+            'first_name', 'last_name', 'employee_type', 'joining_date', 'phone', 'address',
+            'bank_account', 'emergency_contact', 'dob', 'documents', 'working_hours',
+            'overtime_eligible', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def default_fields(cls):
+        return [field for field in cls.Meta.fields if field not in cls.BLOB_FIELDS]
@@ -1,3 +1,64 @@
+import datetime
+from django.core import mail
+from django.core.mail import get_connection
 from django.test import TestCase
+from apis.models import Company, CustomUser
+from authentication.passwords import check_password
+from company.models import Department
+from mailer.delivery import claim_batch, deliver_batch
+from mailer.models import OutboundEmail, REDACTED_BODY
+from .hashing import hash_pool
+from .importer import EmployeeImporter
 
-# Create your tests here.
+
+def rows(*emails):
+    return [{
+        'employee_id': email.split('@')[0].upper(), 'email': email, 'first_name': 'Imported',
+        'department': 'Engineering', 'employee_type': 'office', 'joining_date': '2024-01-01',
+    } for email in emails]
+
+
+class EmployeeImportTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        Department.objects.create(company=self.company, name='Engineering', leave_allotments={})
+
+    def test_imports_share_one_hash_pool(self):
+        report = EmployeeImporter(self.company.id, hash_workers=2).run(rows('a@acme.test', 'b@acme.test'))
+        self.assertEqual((report['created'], report['failed']), (2, 0))
+        pool = hash_pool(2)
+        EmployeeImporter(self.company.id, hash_workers=2).run(rows('c@acme.test'))
+        self.assertIs(hash_pool(2), pool)
+        self.assertTrue(CustomUser.objects.get(email='c@acme.test').password.startswith(('pbkdf2', 'scrypt', 'argon2')))
+
+    def test_initial_password_mail_is_redacted_after_delivery(self):
+        EmployeeImporter(self.company.id, hash_workers=0).run(rows('d@acme.test'))
+        email = OutboundEmail.objects.get()
+        self.assertTrue(email.sensitive)
+        password = email.body.split('Temporary password: ')[1].split('\n')[0]
+        self.assertTrue(CustomUser.objects.get(email='d@acme.test').check_password(password))
+
+        deliver_batch(claim_batch(10), connection=get_connection('django.core.mail.backends.locmem.EmailBackend'))
+        self.assertIn(password, mail.outbox[0].body)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.body), ('sent', REDACTED_BODY))
+
+    def test_generated_passwords_are_hashed_cheaply_until_first_login(self):
+        supplied = rows('f@acme.test')
+        supplied[0]['password'] = 'Chosen-by-admin-1'
+        EmployeeImporter(self.company.id, hash_workers=0).run(rows('e@acme.test') + supplied)
+        self.assertTrue(CustomUser.objects.get(email='f@acme.test').password.startswith('pbkdf2_sha256$'))
+
+        user = CustomUser.objects.get(email='e@acme.test')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256_initial$1000$'))
+        password = OutboundEmail.objects.get().body.split('Temporary password: ')[1].split('\n')[0]
+        self.assertTrue(check_password(user, password))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(check_password(user, password))
+
+    def test_plain_mail_keeps_its_body(self):
+        OutboundEmail.objects.create(subject='Hello', body='Welcome aboard', from_email='hr@acme.test', recipients=['x@acme.test'],
+                                     next_attempt_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        deliver_batch(claim_batch(10), connection=get_connection('django.core.mail.backends.locmem.EmailBackend'))
+        self.assertEqual(OutboundEmail.objects.get().body, 'Welcome aboard')
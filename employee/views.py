@@ -1,3 +1,139 @@
-from django.shortcuts import render
+import base64
+from rest_framework import status
+from rest_framework.views import APIView
+from apis.models import Employee
+from apis.views import JWTAuth
+from company.models import Department
+from .importer import EmployeeImporter, iter_upload_rows
+from .serializers import EmployeeDirectorySerializer
 
-# Create your views here.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+
+
+# Employee directory with keyset pagination on (company, id)
+class EmployeeDirectoryView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            if getattr(user, 'user_type', None) != 'admin':
+                return self.error_response(error_message="Only admin can list employees.", status=status.HTTP_403_FORBIDDEN)
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            params = request.query_params
+            try:
+                limit = min(int(params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+                last_id = decode_cursor(params['cursor']) if params.get('cursor') else None
+            except ValueError:
+                return self.error_response(error_message="Invalid limit or cursor.", status=status.HTTP_400_BAD_REQUEST)
+            if limit < 1:
+                return self.error_response(error_message="Invalid limit or cursor.", status=status.HTTP_400_BAD_REQUEST)
+
+            if params.get('fields'):
+                fields = [field.strip() for field in params['fields'].split(',') if field.strip()]
+                unknown = set(fields) - set(EmployeeDirectorySerializer.Meta.fields)
+                if unknown:
+                    return self.error_response(error_message=f"Unknown fields: {', '.join(sorted(unknown))}", status=status.HTTP_400_BAD_REQUEST)
+                if 'id' not in fields:
+                    fields.insert(0, 'id')
+            else:
+                fields = EmployeeDirectorySerializer.default_fields()
+
+            employees = Employee.objects.filter(company_id=company_id)
+            if params.get('department'):
+                employees = employees.filter(department_id=params['department'])
+            if params.get('under_department'):
+                # Everyone in the department or any department below it: a
+                # prefix match on its materialized path, served by the
+                # (company, path) index.
+                path = Department.objects.filter(
+                    company_id=company_id, id=int(params['under_department']),
+                ).values_list('path', flat=True).first()
+                if not path:
+                    return self.error_response(error_message="Department not found.", status=status.HTTP_404_NOT_FOUND)
+                employees = employees.filter(department__company_id=company_id, department__path__startswith=path)
+            if params.get('employee_type'):
+                employees = employees.filter(employee_type=params['employee_type'])
+            if params.get('joined_from'):
+                employees = employees.filter(joining_date__gte=params['joined_from'])
+            if params.get('joined_to'):
+                employees = employees.filter(joining_date__lte=params['joined_to'])
+            if last_id is not None:
+                employees = employees.filter(id__gt=last_id)
+
+            related = [name for field, name in (('email', 'user'), ('department_name', 'department')) if field in fields]
+            if related:
+                employees = employees.select_related(*related)
+            deferred = [field for field in EmployeeDirectorySerializer.BLOB_FIELDS if field not in fields]
+            if deferred:
+                employees = employees.defer(*deferred)
+
+            page = list(employees.order_by('id')[:limit + 1])
+            has_more = len(page) > limit
+            page = page[:limit]
+
+            serializer = EmployeeDirectorySerializer(page, many=True, fields=fields)
+            return self.success_response({
+                "employees": self.serialized(serializer),
+                "next_cursor": encode_cursor(page[-1].id) if has_more else None,
+                "message": "Employees fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+
+# Bulk employee import from an uploaded CSV (or XLSX) file
+class EmployeeImportView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def post(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            if getattr(user, 'user_type', None) != 'admin':
+                return self.error_response(error_message="Only admin can import employees.", status=status.HTTP_403_FORBIDDEN)
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            upload = request.FILES.get('file')
+            if upload is None:
+                return self.error_response(error_message="Missing required fields: file", status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                batch_size = int(request.data.get('batch_size') or 0) or None
+            except ValueError:
+                return self.error_response(error_message="Invalid batch_size.", status=status.HTTP_400_BAD_REQUEST)
+
+            report = EmployeeImporter(company_id, batch_size=batch_size).run(iter_upload_rows(upload))
+            return self.success_response({
+                **report,
+                "message": "Employees imported successfully." if not report['failed'] else "Employees imported with errors."
+            }, status=status.HTTP_200_OK)
+
+        except ValueError as e:
+            return self.error_response(error_message=str(e), status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
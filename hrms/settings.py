@@ -45,9 +45,14 @@ INSTALLED_APPS = [
     'authentication',
     'apis',
     'company',
+    'mailer',
+    'attendance',
+    'leave',
+    'payroll',
 ]
 
 MIDDLEWARE = [
+    'apis.instrumentation.RequestInstrumentationMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -69,20 +74,46 @@ AUTHENTICATION_BACKENDS = (
 )
 
 REST_FRAMEWORK = {
+    # Views authenticate explicitly through apis.views.JWTAuth; the default
+    # class only decodes the token so DRF does not add a user query per request.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apis.authentication.StatelessJWTAuthentication',
+    ),
+    # orjson based JSON rendering and parsing (stdlib json fallback).
+    'DEFAULT_RENDERER_CLASSES': (
+        'apis.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apis.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
 from datetime import timedelta
+# Access tokens authenticate stateless views from their claims; deleting,
+# deactivating, demoting or moving a user revokes the ones already issued
+# (apis.authentication.revoke_user_tokens).
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=14),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': False,
     'TOKEN_OBTAIN_PAIR_SERIALIZER': 'apis.serializers.MyTokenObtainPairSerializer',
+    'TOKEN_USER_CLASS': 'apis.authentication.TokenPrincipal',
 }
 
+# Seconds a user row (without the password hash) stays cached for
+# stateless-authenticated requests with legacy tokens.
+JWT_USER_CACHE_TIMEOUT = 60
+
+# Seconds each worker keeps the result of a token revocation lookup in its
+# local cache, so stateless requests skip the shared cache (a query with the
+# db backend). A revocation made on another worker takes up to this long to
+# apply there; 0 checks the shared cache on every request.
+JWT_REVOCATION_LOCAL_TIMEOUT = 5
+
 AUTH_USER_MODEL = 'apis.CustomUser'
 
 ROOT_URLCONF = 'hrms.urls'
@@ -110,6 +141,31 @@ WSGI_APPLICATION = 'hrms.wsgi.application'
 
 from decouple import config
 
+# Database connections are reused instead of opened per request:
+# - DB_CONN_MAX_AGE: seconds a connection stays open between requests (0
+#   closes it after every request, -1 keeps it indefinitely). Health checks
+#   replace connections the server dropped instead of failing the request.
+#   Ignored with ASYNC_VIEWS, see below.
+# - DB_POOL: use Django's psycopg 3 connection pool instead (needs
+#   psycopg[pool] installed); persistent connections are then turned off.
+# - DB_PGBOUNCER: behind pgbouncer in transaction pooling mode. Server-side
+#   cursors (QuerySet.iterator) are disabled since they do not survive
+#   pgbouncer handing the server connection to another client between
+#   transactions. Keep DB_POOL off; pgbouncer is the pool.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+
+DB_OPTIONS = {
+    'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+}
+if DB_POOL:
+    DB_OPTIONS['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+    }
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -118,9 +174,50 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else (None if DB_CONN_MAX_AGE < 0 else DB_CONN_MAX_AGE),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'OPTIONS': DB_OPTIONS,
     }
 }
 
+# Caches. `default` is shared by every worker (OTPs, JWT user rows, version
+# counters): a database table out of the box (created by the apis migrations,
+# or `manage.py createcachetable`), a directory of files, Redis (needs the
+# `redis` package) or per-process locmem for local development. `local` is an
+# in-process tier that apis.cache.hot_cache keeps in front of it for read-only
+# entries; CACHE_LOCAL_TIMEOUT=0 turns that tier off. Each shared lookup is
+# a query with the db backend, so prefer Redis once traffic grows. Counters
+# (cache versions, throttles) need an atomic incr: Redis, locmem and the db
+# backend (apis.cache_backends) have one, the file backend does not and
+# loses concurrent increments.
+CACHE_BACKEND = config('CACHE_BACKEND', default='db')
+CACHE_TIMEOUT = config('CACHE_TIMEOUT', default=300, cast=int)
+CACHE_LOCAL_TIMEOUT = config('CACHE_LOCAL_TIMEOUT', default=30, cast=int)
+CACHE_BACKENDS = {
+    'db': ('apis.cache_backends.DatabaseCache', config('CACHE_TABLE', default='hrms_cache')),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', config('CACHE_DIR', default=str(BASE_DIR / 'cache'))),
+    'redis': ('django.core.cache.backends.redis.RedisCache', config('CACHE_REDIS_URL', default='redis://localhost:6379/0')),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'hrms-shared'),
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': CACHE_BACKENDS[CACHE_BACKEND][1],
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='hrms'),
+        # Redis evicts on its own; OPTIONS there go to the connection pool.
+        'OPTIONS': {} if CACHE_BACKEND == 'redis' else {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=50000, cast=int)},
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hrms-local',
+        'TIMEOUT': CACHE_LOCAL_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_LOCAL_MAX_ENTRIES', default=5000, cast=int)},
+    },
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
@@ -130,6 +227,151 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Outbound mail is queued in the database and delivered by
+# `manage.py send_queued_mail`. Point MAILER_BACKEND at
+# django.core.mail.backends.filebased.EmailBackend (writes to EMAIL_FILE_PATH)
+# or the console backend to run the worker without SMTP.
+MAILER_BACKEND = config('MAILER_BACKEND', default=EMAIL_BACKEND)
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+MAILER_BATCH_SIZE = config('MAILER_BATCH_SIZE', default=50, cast=int)
+MAILER_MAX_ATTEMPTS = config('MAILER_MAX_ATTEMPTS', default=5, cast=int)
+MAILER_RETRY_BACKOFF = config('MAILER_RETRY_BACKOFF', default=30, cast=int)
+MAILER_RETRY_BACKOFF_MAX = config('MAILER_RETRY_BACKOFF_MAX', default=3600, cast=int)
+
+# Bulk employee import: rows per bulk_create batch and processes used to hash
+# initial passwords (0 or 1 hashes inline).
+EMPLOYEE_IMPORT_BATCH_SIZE = config('EMPLOYEE_IMPORT_BATCH_SIZE', default=1000, cast=int)
+EMPLOYEE_IMPORT_HASH_WORKERS = config('EMPLOYEE_IMPORT_HASH_WORKERS', default=4, cast=int)
+
+# Firebase ID tokens are verified locally against Google's cached signing keys
+# (authentication.firebase_tokens); the service account is only read on demand.
+FIREBASE_CREDENTIALS_FILE = config('FIREBASE_CREDENTIALS_FILE', default='firebase-service-account.json')
+FIREBASE_PROJECT_ID = config('FIREBASE_PROJECT_ID', default='')
+FIREBASE_CLOCK_SKEW_SECONDS = config('FIREBASE_CLOCK_SKEW_SECONDS', default=5, cast=int)
+
+# Serve the async-native company, policy and bootstrap views (company.views
+# Async*View) and the async login (authentication.views.AsyncAuthView). Meant for ASGI deployments (hrms.asgi); under WSGI every async
+# view would run inside its own event loop, so keep it off there.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+if ASYNC_VIEWS:
+    # Under ASGI the ORM runs on sync_to_async worker threads and persistent
+    # connections are never closed at the end of a request there, so they
+    # pile up. Connections are closed after each request instead; use DB_POOL
+    # (or pgbouncer) to reuse them.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
+# Attendance punch ingestion: batch limit per request and how far back queued
+# offline punches are still accepted.
+ATTENDANCE_MAX_PUNCHES_PER_REQUEST = config('ATTENDANCE_MAX_PUNCHES_PER_REQUEST', default=500, cast=int)
+ATTENDANCE_MAX_BACKDATE_DAYS = config('ATTENDANCE_MAX_BACKDATE_DAYS', default=7, cast=int)
+
+# Payroll workers (`manage.py process_payroll_runs`) heartbeat a claimed run;
+# a run not heartbeated within the lease is reclaimed by another worker, at
+# most PAYROLL_RUN_MAX_ATTEMPTS times before it is marked failed.
+PAYROLL_RUN_LEASE_SECONDS = config('PAYROLL_RUN_LEASE_SECONDS', default=300, cast=int)
+PAYROLL_RUN_MAX_ATTEMPTS = config('PAYROLL_RUN_MAX_ATTEMPTS', default=3, cast=int)
+
+# Request instrumentation (apis.instrumentation): a request running the same
+# query shape at least this many times is logged as a suspected N+1 (0 turns
+# the check off). The Prometheus endpoint answers 403 until METRICS_TOKEN is
+# set; the mail queue gauges it serves are refreshed every
+# METRICS_MAIL_CACHE_SECONDS.
+N_PLUS_ONE_THRESHOLD = config('N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_MAIL_CACHE_SECONDS = config('METRICS_MAIL_CACHE_SECONDS', default=15, cast=int)
+
+# Logging goes through apis.log.BackgroundHandler: records are queued and
+# written as JSON lines by a listener thread. Response payloads are logged at
+# DEBUG for a sampled fraction of requests, redacted and size capped.
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+LOG_PAYLOAD_SAMPLE_RATE = config('LOG_PAYLOAD_SAMPLE_RATE', default=0.01, cast=float)
+LOG_PAYLOAD_MAX_CHARS = config('LOG_PAYLOAD_MAX_CHARS', default=2048, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'apis.log.JsonFormatter'},
+    },
+    'handlers': {
+        'background': {
+            'class': 'apis.log.BackgroundHandler',
+            'formatter': 'json',
+        },
+    },
+    'root': {
+        'handlers': ['background'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['background'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
+# Password hashing (authentication.passwords). PASSWORD_HASHER picks the hasher
+# for new hashes: pbkdf2, scrypt or argon2 (needs the `argon2-cffi` package).
+# Hashes made by the others still verify and, like hashes made with older cost
+# parameters, are rehashed on the next successful login. Async views hash on a
+# pool of PASSWORD_HASH_THREADS threads.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'authentication.passwords.PBKDF2PasswordHasher',
+    'scrypt': 'authentication.passwords.ScryptPasswordHasher',
+    'argon2': 'authentication.passwords.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER),
+    'authentication.passwords.InitialPasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1_000_000, cast=int)
+# Temporary passwords generated by the employee import are random, so they are
+# hashed cheaply and upgraded to PASSWORD_HASHER on the first login. Until that
+# login a leaked hash is cheaper to attack than a regular one; passwords given
+# in the import file are hashed at full cost.
+PASSWORD_INITIAL_PBKDF2_ITERATIONS = config('PASSWORD_INITIAL_PBKDF2_ITERATIONS', default=1000, cast=int)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=8, cast=int)
+PASSWORD_HASH_THREADS = config('PASSWORD_HASH_THREADS', default=4, cast=int)
+
+# Throttling of the login and password reset endpoints (apis.throttling):
+# sliding-window counters in the shared `default` cache, per endpoint and per
+# client IP, email and company. A request over any budget gets a 429 before
+# the password hash or OTP mail. Rates are "<count>/<period>" with a period of
+# s, m, h or d and an optional multiplier ("5/10m"); an empty rate turns the
+# budget off. The client IP is REMOTE_ADDR; set THROTTLE_TRUSTED_PROXIES to
+# the number of proxies in front of the app to read it from X-Forwarded-For.
+# `login` also covers the update-password endpoint. `login-failed` counts
+# failed passwords per company and is off by default: anyone who knows a
+# company's emails could use it to lock the whole company out.
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_TRUSTED_PROXIES = config('THROTTLE_TRUSTED_PROXIES', default=0, cast=int)
+THROTTLE_RATES = {
+    'login': {
+        'ip': config('THROTTLE_LOGIN_IP', default='60/m'),
+        'email': config('THROTTLE_LOGIN_EMAIL', default='10/m'),
+    },
+    'login-failed': {
+        'company': config('THROTTLE_LOGIN_FAILED_COMPANY', default=''),
+    },
+    'reset-password': {
+        'ip': config('THROTTLE_RESET_IP', default='20/h'),
+        'email': config('THROTTLE_RESET_EMAIL', default='5/h'),
+        'company': config('THROTTLE_RESET_COMPANY', default='200/h'),
+    },
+    'reset-otp': {
+        'ip': config('THROTTLE_OTP_IP', default='30/h'),
+        'email': config('THROTTLE_OTP_EMAIL', default='5/10m'),
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -156,6 +398,10 @@ LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
 
+# Time zone of companies that have not set their own (Company.time_zone).
+# Attendance reads shift times and punch dates in the company's zone.
+COMPANY_DEFAULT_TIME_ZONE = config('COMPANY_DEFAULT_TIME_ZONE', default='Asia/Kolkata')
+
 USE_I18N = True
 
 USE_TZ = True
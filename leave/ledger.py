@@ -0,0 +1,148 @@
+from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from apis.models import Employee
+from company.models import Department
+from company.schemas import LeaveAllotments
+from .models import LeaveRequest, LeaveLedgerEntry, LeaveBalance
+
+
+ACCRUAL_BATCH_SIZE = 1000
+
+
+class InsufficientBalanceError(Exception):
+    def __init__(self, leave_type, balance):
+        super().__init__(f"Insufficient '{leave_type}' balance ({balance} days left).")
+        self.leave_type = leave_type
+        self.balance = balance
+
+
+def _lock_balances(company_id, keys):
+    # Creates missing balance rows, then locks every (employee, leave_type)
+    # row in a stable order so concurrent postings cannot deadlock.
+    LeaveBalance.objects.bulk_create([
+        LeaveBalance(company_id=company_id, employee_id=employee_id, leave_type=leave_type)
+        for employee_id, leave_type in keys
+    ], ignore_conflicts=True)
+    rows = LeaveBalance.objects.select_for_update().filter(
+        employee_id__in={employee_id for employee_id, _ in keys},
+        leave_type__in={leave_type for _, leave_type in keys},
+    ).order_by('employee_id', 'leave_type')
+    return {(row.employee_id, row.leave_type): row for row in rows if (row.employee_id, row.leave_type) in keys}
+
+
+def post_entries(company_id, entries):
+    # Appends ledger entries and applies them to the running balances in one
+    # transaction: one insert, one locking select and one bulk update.
+    if not entries:
+        return []
+    with transaction.atomic():
+        balances = _lock_balances(company_id, {(entry.employee_id, entry.leave_type) for entry in entries})
+        LeaveLedgerEntry.objects.bulk_create(entries)
+        now = timezone.now()
+        for entry in entries:
+            balance = balances[(entry.employee_id, entry.leave_type)]
+            balance.balance += entry.amount
+            balance.updated_at = now
+        LeaveBalance.objects.bulk_update(balances.values(), ['balance', 'updated_at'])
+    return list(balances.values())
+
+
+def get_balance(employee_id, leave_type):
+    return LeaveBalance.objects.filter(employee_id=employee_id, leave_type=leave_type).values_list('balance', flat=True).first() or Decimal(0)
+
+
+def review_request(company_id, request_id, reviewer_id, approve):
+    with transaction.atomic():
+        leave_request = LeaveRequest.objects.select_for_update().get(id=request_id, company_id=company_id)
+        if leave_request.status != 'pending':
+            raise ValueError(f"Leave request is already {leave_request.status}.")
+
+        if approve:
+            balance = _lock_balances(company_id, {(leave_request.employee_id, leave_request.leave_type)})[
+                (leave_request.employee_id, leave_request.leave_type)
+            ]
+            if balance.balance < leave_request.days:
+                raise InsufficientBalanceError(leave_request.leave_type, balance.balance)
+            LeaveLedgerEntry.objects.create(
+                company_id=company_id,
+                employee_id=leave_request.employee_id,
+                leave_type=leave_request.leave_type,
+                kind='debit',
+                amount=-leave_request.days,
+                year=leave_request.start_date.year,
+                leave_request=leave_request,
+            )
+            balance.balance -= leave_request.days
+            balance.save(update_fields=['balance', 'updated_at'])
+
+        leave_request.status = 'approved' if approve else 'rejected'
+        leave_request.reviewed_by_id = reviewer_id
+        leave_request.reviewed_at = timezone.now()
+        leave_request.save(update_fields=['status', 'reviewed_by', 'reviewed_at', 'updated_at'])
+    return leave_request
+
+
+def cancel_request(company_id, request_id, employee_id=None):
+    # Withdraws a pending request, or credits an approved one's days back.
+    # `employee_id` limits it to that employee's requests that have not
+    # started yet; admins pass None.
+    with transaction.atomic():
+        leave_request = LeaveRequest.objects.select_for_update().get(id=request_id, company_id=company_id)
+        if employee_id is not None:
+            if leave_request.employee_id != employee_id:
+                raise LeaveRequest.DoesNotExist
+            if leave_request.status == 'approved' and leave_request.start_date <= timezone.localdate():
+                raise ValueError("Leave that has already started can only be cancelled by an admin.")
+        if leave_request.status not in ('pending', 'approved'):
+            raise ValueError(f"Leave request is already {leave_request.status}.")
+
+        if leave_request.status == 'approved':
+            post_entries(company_id, [LeaveLedgerEntry(
+                company_id=company_id,
+                employee_id=leave_request.employee_id,
+                leave_type=leave_request.leave_type,
+                kind='credit',
+                amount=leave_request.days,
+                year=leave_request.start_date.year,
+                leave_request=leave_request,
+                note='Cancelled',
+            )])
+        leave_request.status = 'cancelled'
+        leave_request.save(update_fields=['status', 'updated_at'])
+    return leave_request
+
+
+def accrue_year(company_id, year, batch_size=ACCRUAL_BATCH_SIZE):
+    # Posts the yearly allotment of every employee's department. Types already
+    # accrued for the year are skipped, so the job can safely be re-run.
+    allotments = {
+        department['id']: LeaveAllotments.parse(department['leave_allotments']).accruable()
+        for department in Department.objects.filter(company_id=company_id).values('id', 'leave_allotments')
+    }
+    accrued = set(LeaveLedgerEntry.objects.filter(
+        company_id=company_id, kind='accrual', year=year
+    ).values_list('employee_id', 'leave_type'))
+
+    posted = 0
+    batch = []
+    employees = Employee.objects.filter(company_id=company_id).values_list('id', 'department_id').order_by('id')
+    for employee_id, department_id in employees.iterator(chunk_size=batch_size):
+        for leave_type, amount in allotments.get(department_id, {}).items():
+            if (employee_id, leave_type) in accrued:
+                continue
+            batch.append(LeaveLedgerEntry(
+                company_id=company_id,
+                employee_id=employee_id,
+                leave_type=leave_type,
+                kind='accrual',
+                amount=amount,
+                year=year,
+                note=f'{year} allotment',
+            ))
+        if len(batch) >= batch_size:
+            post_entries(company_id, batch)
+            posted += len(batch)
+            batch = []
+    post_entries(company_id, batch)
+    return posted + len(batch)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apis.models import Company
+from leave.ledger import accrue_year, ACCRUAL_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Post each employee's yearly leave allotment from Department.leave_allotments. Safe to re-run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None, help='Defaults to the current year.')
+        parser.add_argument('--company', type=int, action='append', dest='companies', help='Company id (repeatable). Defaults to all companies.')
+        parser.add_argument('--batch-size', type=int, default=ACCRUAL_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        year = options['year'] or timezone.localdate().year
+        company_ids = options['companies'] or Company.objects.values_list('id', flat=True)
+        for company_id in company_ids:
+            posted = accrue_year(company_id, year, batch_size=options['batch_size'])
+            self.stdout.write(f"Company {company_id}: posted {posted} accruals for {year}.")
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('apis', '0007_employee_directory_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(max_length=50)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('days', models.DecimalField(decimal_places=1, max_digits=6)),
+                ('reason', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=10)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_requests', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_requests', to='apis.employee')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_leave_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(max_length=50)),
+                ('kind', models.CharField(choices=[('accrual', 'Accrual'), ('debit', 'Debit'), ('adjustment', 'Adjustment')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=1, max_digits=6)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='apis.employee')),
+                ('leave_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='leave.leaverequest')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeaveBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(max_length=50)),
+                ('balance', models.DecimalField(decimal_places=1, default=0, max_digits=6)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_balances', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_balances', to='apis.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'employee'], name='leave_leave_company_ce3f98_idx')],
+                'unique_together': {('employee', 'leave_type')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['company', 'status', 'start_date'], name='leave_leave_company_fbe1db_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'start_date'], name='leave_leave_employe_d5249a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaveledgerentry',
+            index=models.Index(fields=['employee', 'leave_type', 'created_at'], name='leave_leave_employe_457d93_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaveledgerentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'accrual')), fields=('employee', 'leave_type', 'year'), name='leave_ledger_unique_yearly_accrual'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leave', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaveledgerentry',
+            name='kind',
+            field=models.CharField(choices=[('accrual', 'Accrual'), ('debit', 'Debit'), ('credit', 'Credit'), ('adjustment', 'Adjustment')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='leaverequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='pending', max_length=10),
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import models
+
+
+class LeaveRequest(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('cancelled', 'Cancelled'),
+    )
+
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='leave_requests')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='leave_requests')
+    leave_type = models.CharField(max_length=50)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    days = models.DecimalField(max_digits=6, decimal_places=1)
+    reason = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    reviewed_by = models.ForeignKey('apis.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_leave_requests')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.leave_type} {self.start_date} - {self.end_date}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'status', 'start_date']),
+            models.Index(fields=['employee', 'start_date']),
+        ]
+
+
+# Append-only history of every balance movement. LeaveBalance is the running
+# total of these rows and is what reads use.
+class LeaveLedgerEntry(models.Model):
+    KIND_CHOICES = (
+        ('accrual', 'Accrual'),
+        ('debit', 'Debit'),
+        ('credit', 'Credit'),
+        ('adjustment', 'Adjustment'),
+    )
+
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='leave_ledger')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='leave_ledger')
+    leave_type = models.CharField(max_length=50)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=6, decimal_places=1)
+    year = models.PositiveSmallIntegerField()
+    leave_request = models.ForeignKey('LeaveRequest', on_delete=models.SET_NULL, null=True, blank=True, related_name='ledger_entries')
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.leave_type} {self.kind} {self.amount}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['employee', 'leave_type', 'created_at']),
+        ]
+        constraints = [
+            # A yearly accrual is posted at most once per employee and type.
+            models.UniqueConstraint(
+                fields=['employee', 'leave_type', 'year'],
+                condition=models.Q(kind='accrual'),
+                name='leave_ledger_unique_yearly_accrual',
+            ),
+        ]
+
+
+# One running balance per employee and leave type, not per year: unused days
+# carry over and each yearly accrual adds to them.
+class LeaveBalance(models.Model):
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='leave_balances')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='leave_balances')
+    leave_type = models.CharField(max_length=50)
+    balance = models.DecimalField(max_digits=6, decimal_places=1, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.leave_type}: {self.balance}"
+
+    class Meta:
+        unique_together = ['employee', 'leave_type']
+        indexes = [
+            models.Index(fields=['company', 'employee']),
+        ]
@@ -0,0 +1,26 @@
+from rest_framework import serializers
+from .models import LeaveRequest, LeaveBalance
+from apis.serializers import PlainListSerializer
+
+
+class LeaveRequestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeaveRequest
+        list_serializer_class = PlainListSerializer
+        fields = [
+            'id', 'employee', 'leave_type', 'start_date', 'end_date', 'days', 'reason',
+            'status', 'reviewed_by', 'reviewed_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['employee', 'days', 'status', 'reviewed_by', 'reviewed_at', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({'end_date': 'End date cannot be before start date.'})
+        return data
+
+
+class LeaveBalanceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeaveBalance
+        list_serializer_class = PlainListSerializer
+        fields = ['employee', 'leave_type', 'balance', 'updated_at']
@@ -0,0 +1,95 @@
+import datetime
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apis.models import Company, CustomUser, Employee
+from apis.serializers import MyTokenObtainPairSerializer
+from company.models import Department
+from .ledger import accrue_year, review_request, cancel_request, get_balance, InsufficientBalanceError
+from .models import LeaveRequest, LeaveLedgerEntry
+
+
+class LeaveLedgerTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        department = Department.objects.create(company=self.company, name='Engineering', leave_allotments={'casual': 5})
+        self.admin = CustomUser.objects.create_user(username='admin', email='admin@acme.test', password='secret', user_type='admin', company=self.company)
+        self.user = CustomUser.objects.create_user(username='emp', email='emp@acme.test', password='secret', company=self.company)
+        self.employee = Employee.objects.create(
+            employee_id='E1', user=self.user, company=self.company, department=department,
+            first_name='Emp', employee_type='office', joining_date=datetime.date(2024, 1, 1),
+        )
+        self.assertEqual(accrue_year(self.company.id, 2026), 1)
+
+    def leave(self, start, days, status='pending'):
+        start = datetime.date.fromisoformat(start)
+        return LeaveRequest.objects.create(
+            company=self.company, employee=self.employee, leave_type='casual', status=status,
+            start_date=start, end_date=start + datetime.timedelta(days=days - 1), days=days,
+        )
+
+    def entries(self):
+        return list(LeaveLedgerEntry.objects.order_by('id').values_list('kind', 'amount'))
+
+    def balance(self):
+        return get_balance(self.employee.id, 'casual')
+
+    def test_approving_debits_and_rejecting_leaves_the_balance(self):
+        review_request(self.company.id, self.leave('2026-03-02', 2).id, self.admin.id, approve=True)
+        review_request(self.company.id, self.leave('2026-04-06', 1).id, self.admin.id, approve=False)
+        self.assertEqual(self.entries(), [('accrual', Decimal(5)), ('debit', Decimal(-2))])
+        self.assertEqual(self.balance(), Decimal(3))
+        self.assertEqual(sorted(LeaveRequest.objects.values_list('status', flat=True)), ['approved', 'rejected'])
+        with self.assertRaises(ValueError):
+            review_request(self.company.id, LeaveRequest.objects.get(status='rejected').id, self.admin.id, approve=True)
+
+    def test_approval_checks_the_balance_it_locks(self):
+        # Each request fit the balance when it was submitted.
+        first, second = self.leave('2026-03-02', 3), self.leave('2026-04-06', 3)
+        review_request(self.company.id, first.id, self.admin.id, approve=True)
+        with self.assertRaises(InsufficientBalanceError):
+            review_request(self.company.id, second.id, self.admin.id, approve=True)
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'pending')
+        self.assertEqual(self.balance(), Decimal(2))
+
+    def test_cancelling_credits_approved_days_back(self):
+        approved = self.leave('2026-03-02', 2)
+        review_request(self.company.id, approved.id, self.admin.id, approve=True)
+        cancel_request(self.company.id, approved.id)
+        cancel_request(self.company.id, self.leave('2026-04-06', 1).id)
+        self.assertEqual(self.entries(), [('accrual', Decimal(5)), ('debit', Decimal(-2)), ('credit', Decimal(2))])
+        self.assertEqual(self.balance(), Decimal(5))
+        with self.assertRaises(ValueError):
+            cancel_request(self.company.id, approved.id)
+
+    def test_employees_cannot_cancel_leave_that_has_started(self):
+        started = self.leave('2020-01-01', 1, status='approved')
+        with self.assertRaises(ValueError):
+            cancel_request(self.company.id, started.id, employee_id=self.employee.id)
+        with self.assertRaises(LeaveRequest.DoesNotExist):
+            cancel_request(self.company.id, started.id, employee_id=self.employee.id + 1)
+        self.assertEqual(cancel_request(self.company.id, started.id).status, 'cancelled')
+
+    def test_days_are_calendar_days_and_balances_carry_over(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {MyTokenObtainPairSerializer.get_token(self.user).access_token}')
+        # Friday to Monday.
+        response = client.post('/apis/v1/leave/requests/', {'leave_type': 'casual', 'start_date': '2026-03-06', 'end_date': '2026-03-09'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(str(response.json()['data']['leave_request']['days'])), Decimal(4))
+
+        review_request(self.company.id, response.json()['data']['leave_request']['id'], self.admin.id, approve=True)
+        self.assertEqual(accrue_year(self.company.id, 2026), 0)
+        self.assertEqual(accrue_year(self.company.id, 2027), 1)
+        self.assertEqual(self.balance(), Decimal(6))
+
+    def test_employee_cancels_upcoming_leave_through_the_api(self):
+        upcoming = self.leave((datetime.date.today() + datetime.timedelta(days=7)).isoformat(), 2)
+        review_request(self.company.id, upcoming.id, self.admin.id, approve=True)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {MyTokenObtainPairSerializer.get_token(self.user).access_token}')
+        response = client.post(f'/apis/v1/leave/requests/{upcoming.id}/cancel/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['leave_request']['status'], 'cancelled')
+        self.assertEqual(self.balance(), Decimal(5))
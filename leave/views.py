@@ -0,0 +1,194 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from apis.authentication import resolve_employee_id
+from apis.models import Employee
+from apis.views import JWTAuth
+from company.schemas import LeaveAllotments
+from .ledger import review_request, cancel_request, get_balance, InsufficientBalanceError
+from .models import LeaveRequest, LeaveBalance
+from .serializers import LeaveRequestSerializer, LeaveBalanceSerializer
+
+
+MAX_LIST_SIZE = 200
+
+
+# Leave requests; employees apply and see their own, admins see the company's
+class LeaveRequestView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            leave_requests = LeaveRequest.objects.filter(company_id=company_id)
+            if getattr(user, 'user_type', None) == 'admin':
+                if request.query_params.get('employee'):
+                    leave_requests = leave_requests.filter(employee_id=request.query_params['employee'])
+            else:
+                employee_id = resolve_employee_id(user)
+                if not employee_id:
+                    return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+                leave_requests = leave_requests.filter(employee_id=employee_id)
+            if request.query_params.get('status'):
+                leave_requests = leave_requests.filter(status=request.query_params['status'])
+
+            serializer = LeaveRequestSerializer(leave_requests.order_by('-start_date', '-id')[:MAX_LIST_SIZE], many=True)
+            return self.success_response({
+                "leave_requests": self.serialized(serializer),
+                "message": "Leave requests fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+    def post(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            employee_id = resolve_employee_id(user)
+            if not company_id or not employee_id:
+                return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            serializer = LeaveRequestSerializer(data=request.data)
+            if not serializer.is_valid():
+                return self.error_response(error_message=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            data = serializer.validated_data
+
+            allotments = LeaveAllotments.parse(Employee.objects.filter(id=employee_id).values_list('department__leave_allotments', flat=True).first())
+            if data['leave_type'] not in allotments:
+                return self.error_response(error_message=f"Leave type '{data['leave_type']}' is not allotted to your department.", status=status.HTTP_400_BAD_REQUEST)
+
+            overlapping = LeaveRequest.objects.filter(
+                employee_id=employee_id,
+                status__in=['pending', 'approved'],
+                start_date__lte=data['end_date'],
+                end_date__gte=data['start_date'],
+            ).exists()
+            if overlapping:
+                return self.error_response(error_message="You already have leave requested for these dates.", status=status.HTTP_400_BAD_REQUEST)
+
+            # Calendar days: weekends and holidays inside the range count.
+            days = (data['end_date'] - data['start_date']).days + 1
+            balance = get_balance(employee_id, data['leave_type'])
+            if balance < days:
+                return self.error_response(error_message=str(InsufficientBalanceError(data['leave_type'], balance)), status=status.HTTP_400_BAD_REQUEST)
+
+            leave_request = serializer.save(company_id=company_id, employee_id=employee_id, days=days)
+            return self.success_response({
+                "leave_request": LeaveRequestSerializer(leave_request).data,
+                "message": "Leave request submitted successfully."
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Approve or reject a pending leave request
+class LeaveReviewView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def post(self, request, request_id):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            if getattr(user, 'user_type', None) != 'admin':
+                return self.error_response(error_message="Only admin can review leave requests.", status=status.HTTP_403_FORBIDDEN)
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            action = request.data.get('action')
+            if action not in ('approve', 'reject'):
+                return self.error_response(error_message="Action must be 'approve' or 'reject'.", status=status.HTTP_400_BAD_REQUEST)
+
+            leave_request = review_request(company_id, request_id, user.id, approve=action == 'approve')
+            return self.success_response({
+                "leave_request": LeaveRequestSerializer(leave_request).data,
+                "message": f"Leave request {leave_request.status} successfully."
+            }, status=status.HTTP_200_OK)
+
+        except LeaveRequest.DoesNotExist:
+            return self.error_response(error_message="Leave request not found.", status=status.HTTP_404_NOT_FOUND)
+        except (ValueError, InsufficientBalanceError) as e:
+            return self.error_response(error_message=str(e), status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Cancel a leave request; employees cancel their own before it starts
+class LeaveCancelView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def post(self, request, request_id):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            employee_id = None
+            if getattr(user, 'user_type', None) != 'admin':
+                employee_id = resolve_employee_id(user)
+                if not employee_id:
+                    return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            leave_request = cancel_request(company_id, request_id, employee_id)
+            return self.success_response({
+                "leave_request": LeaveRequestSerializer(leave_request).data,
+                "message": "Leave request cancelled successfully."
+            }, status=status.HTTP_200_OK)
+
+        except LeaveRequest.DoesNotExist:
+            return self.error_response(error_message="Leave request not found.", status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return self.error_response(error_message=str(e), status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Running leave balances; a single indexed lookup per employee
+class LeaveBalanceView(JWTAuth, APIView):
+    stateless_auth = True
+
+    def get(self, request):
+        try:
+            user, error = self.check_jwt_token(request)
+            if user is None:
+                return error
+
+            company_id = user.company_id
+            if not company_id:
+                return self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            if getattr(user, 'user_type', None) == 'admin':
+                employee_id = request.query_params.get('employee')
+                if not employee_id:
+                    return self.error_response(error_message="Missing required fields: employee", status=status.HTTP_400_BAD_REQUEST)
+            else:
+                employee_id = resolve_employee_id(user)
+                if not employee_id:
+                    return self.error_response(error_message="No employee profile found for user.", status=status.HTTP_404_NOT_FOUND)
+
+            balances = LeaveBalance.objects.filter(company_id=company_id, employee_id=employee_id).order_by('leave_type')
+            return self.success_response({
+                "balances": self.serialized(LeaveBalanceSerializer(balances, many=True)),
+                "message": "Leave balances fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
@@ -0,0 +1,97 @@
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .metrics import delivery_stats
+from .models import OutboundEmail, REDACTED_BODY
+
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+
+
+def retry_delay(attempts):
+    return min(settings.MAILER_RETRY_BACKOFF * 2 ** (attempts - 1), settings.MAILER_RETRY_BACKOFF_MAX)
+
+
+def claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            lease_until = now + timedelta(seconds=LEASE_SECONDS)
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(next_attempt_at=lease_until)
+            for email in batch:
+                email.next_attempt_at = lease_until
+    return batch
+
+
+def _mark_failed(email, error):
+    email.last_error = str(error)
+    if email.attempts >= settings.MAILER_MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts))
+
+
+def _redact_finished(batch):
+    for email in batch:
+        if email.sensitive and email.status in ('sent', 'failed'):
+            email.body = REDACTED_BODY
+
+
+# Sends every claimed message over one pooled connection and records the
+# outcome of each row with a single bulk update.
+def deliver_batch(batch, connection=None):
+    connection = connection or get_connection(backend=settings.MAILER_BACKEND)
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning("Mail connection failed: %s", e)
+        for email in batch:
+            email.attempts += 1
+            _mark_failed(email, e)
+        _redact_finished(batch)
+        OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'body'])
+        delivery_stats.record(0, len(batch), [], [])
+        return 0, len(batch)
+
+    send_ms = []
+    queue_ms = []
+    try:
+        for email in batch:
+            email.attempts += 1
+            start = time.perf_counter()
+            try:
+                EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=email.recipients,
+                    connection=connection,
+                ).send()
+            except Exception as e:
+                failed += 1
+                _mark_failed(email, e)
+            else:
+                sent += 1
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                queue_ms.append((email.sent_at - email.created_at).total_seconds() * 1000)
+            send_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+        _redact_finished(batch)
+        OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body'])
+    delivery_stats.record(sent, failed, send_ms, queue_ms)
+    return sent, failed
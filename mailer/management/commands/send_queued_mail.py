@@ -0,0 +1,32 @@
+import logging
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from mailer.delivery import claim_batch, deliver_batch
+from mailer.metrics import queue_metrics, delivery_stats
+
+
+logger = logging.getLogger('mailer')
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound email in batches over one mail connection per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.MAILER_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the due messages once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_batch(options['batch_size'])
+            if batch:
+                sent, failed = deliver_batch(batch)
+                stats = {**queue_metrics(), **delivery_stats.snapshot()}
+                logger.info("mailer batch sent=%d failed=%d queue_depth=%d oldest_age_s=%.1f avg_send_ms=%.1f avg_queue_latency_ms=%.1f",
+                            sent, failed, stats['queued'], stats['oldest_queued_age_seconds'], stats['avg_send_ms'], stats['avg_queue_latency_ms'])
+                self.stdout.write(f"Sent {sent}, failed {failed}, {stats['queued']} still queued.")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,106 @@
+import threading
+from django.conf import settings
+from django.db.models import Count, DurationField, F, Min, Q, Sum
+from django.utils import timezone
+from apis.cache import shared_cache
+from .models import OutboundEmail
+
+
+# Delivery counters of this process, updated by the worker after every batch
+# for its log lines. /metrics is served by web processes, so it exports
+# delivery_metrics() read from the outbox instead.
+class DeliveryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent_total = 0
+        self.failed_total = 0
+        self.send_ms_total = 0.0
+        self.queue_latency_ms_total = 0.0
+
+    def record(self, sent, failed, send_ms, queue_ms):
+        with self._lock:
+            self.sent_total += sent
+            self.failed_total += failed
+            self.send_ms_total += sum(send_ms)
+            self.queue_latency_ms_total += sum(queue_ms)
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.sent_total + self.failed_total
+            return {
+                'sent_total': self.sent_total,
+                'failed_total': self.failed_total,
+                'avg_send_ms': self.send_ms_total / attempts if attempts else 0.0,
+                'avg_queue_latency_ms': self.queue_latency_ms_total / self.sent_total if self.sent_total else 0.0,
+            }
+
+
+delivery_stats = DeliveryStats()
+
+
+QUEUE_METRICS_CACHE_KEY = 'mail:queue_metrics'
+DELIVERY_METRICS_CACHE_KEY = 'mail:delivery_metrics'
+
+
+def _queue_aggregate():
+    return OutboundEmail.objects.filter(status__in=['queued', 'failed']).aggregate(
+        queued=Count('id', filter=Q(status='queued')),
+        failed=Count('id', filter=Q(status='failed')),
+        oldest_queued_at=Min('created_at', filter=Q(status='queued')),
+    )
+
+
+def _delivery_aggregate():
+    # Every attempt either sent the row or failed, so failures are the
+    # attempts beyond one per sent row.
+    return OutboundEmail.objects.filter(attempts__gt=0).aggregate(
+        sent=Count('id', filter=Q(status='sent')),
+        attempts=Sum('attempts'),
+        queue_latency=Sum(F('sent_at') - F('created_at'), filter=Q(status='sent'), output_field=DurationField()),
+    )
+
+
+def _aggregate(key, compute, max_age):
+    # With max_age the aggregate is shared through the cache for that many
+    # seconds, so frequent scrapes do not each scan the outbox.
+    if max_age:
+        return dict(shared_cache().get_or_set(key, compute, max_age))
+    return compute()
+
+
+def queue_metrics(max_age=0):
+    stats = _aggregate(QUEUE_METRICS_CACHE_KEY, _queue_aggregate, max_age)
+    oldest = stats.pop('oldest_queued_at')
+    stats['oldest_queued_age_seconds'] = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    return stats
+
+
+def delivery_metrics(max_age=0):
+    stats = _aggregate(DELIVERY_METRICS_CACHE_KEY, _delivery_aggregate, max_age)
+    latency = stats['queue_latency']
+    return {
+        'sent_total': stats['sent'],
+        'failed_total': (stats['attempts'] or 0) - stats['sent'],
+        'queue_latency_seconds_sum': latency.total_seconds() if latency else 0.0,
+    }
+
+
+def prometheus_lines():
+    max_age = getattr(settings, 'METRICS_MAIL_CACHE_SECONDS', 15)
+    stats = {**queue_metrics(max_age), **delivery_metrics(max_age)}
+    lines = []
+    for name, kind, help_text, value in (
+        ('hrms_mail_queued', 'gauge', 'Emails waiting to be delivered.', stats['queued']),
+        ('hrms_mail_failed', 'gauge', 'Emails that exhausted their delivery attempts.', stats['failed']),
+        ('hrms_mail_oldest_queued_age_seconds', 'gauge', 'Age of the oldest queued email.', round(stats['oldest_queued_age_seconds'], 3)),
+        ('hrms_mail_sent_total', 'counter', 'Emails delivered.', stats['sent_total']),
+        ('hrms_mail_send_failures_total', 'counter', 'Failed delivery attempts.', stats['failed_total']),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+    lines += [
+        '# HELP hrms_mail_queue_latency_seconds Time from queueing to delivery of sent emails.',
+        '# TYPE hrms_mail_queue_latency_seconds summary',
+        f"hrms_mail_queue_latency_seconds_sum {round(stats['queue_latency_seconds_sum'], 3)}",
+        f"hrms_mail_queue_latency_seconds_count {stats['sent_total']}",
+    ]
+    return lines
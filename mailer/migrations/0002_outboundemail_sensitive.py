@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+# Messages queued before the flag existed that carry an initial password or a
+# reset OTP.
+SENSITIVE_SUBJECTS = ('Your HRMS account', 'HRMS Password Reset OTP')
+
+
+def flag_sensitive_mail(apps, schema_editor):
+    OutboundEmail = apps.get_model('mailer', 'OutboundEmail')
+    emails = OutboundEmail.objects.filter(subject__in=SENSITIVE_SUBJECTS)
+    emails.update(sensitive=True)
+    emails.filter(status__in=('sent', 'failed')).update(body='[redacted after delivery]')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='sensitive',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_sensitive_mail, migrations.RunPython.noop),
+    ]
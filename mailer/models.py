@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils import timezone
+
+
+REDACTED_BODY = '[redacted after delivery]'
+
+
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    # Bodies carrying secrets (initial passwords, OTPs) are replaced with
+    # REDACTED_BODY once the message is sent or given up on.
+    sensitive = models.BooleanField(default=False)
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Also used as a lease: a worker pushes it forward while it owns the row,
+    # so messages of a crashed worker become due again on their own.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
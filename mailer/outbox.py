@@ -0,0 +1,24 @@
+from django.conf import settings
+from .models import OutboundEmail
+
+
+def build_email(subject, message, recipient_list, from_email=None, sensitive=False):
+    return OutboundEmail(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+        sensitive=sensitive,
+    )
+
+
+# Request handlers only write the message to the queue; delivery happens in the
+# `send_queued_mail` worker.
+def enqueue_mail(subject, message, recipient_list, from_email=None, sensitive=False):
+    email = build_email(subject, message, recipient_list, from_email, sensitive)
+    email.save()
+    return email
+
+
+def enqueue_mass_mail(emails):
+    return OutboundEmail.objects.bulk_create(emails, batch_size=500)
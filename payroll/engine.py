@@ -0,0 +1,194 @@
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from company.policies import resolve_company_policies, pick_effective_policies
+from company.schemas import WorkingHours, LatePolicy, OvertimePolicy, LeavePolicy
+from attendance.evaluation import build_rules
+from attendance.models import DailyAttendance
+from leave.models import LeaveRequest
+from .models import Compensation, Payslip
+
+
+# Policy details read here, on top of the ones attendance evaluation uses
+# (all optional, see company.schemas):
+#   working_hours: days_per_month
+#   overtime:      rate_multiplier
+#   late:          deduction_multiplier
+#   leave:         unpaid_types
+DEFAULT_DAYS_PER_MONTH = 26
+DEFAULT_OVERTIME_MULTIPLIER = 1.5
+DEFAULT_LATE_MULTIPLIER = 1.0
+DEFAULT_UNPAID_TYPES = frozenset(('unpaid',))
+PAYSLIP_BATCH_SIZE = 2000
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+def payroll_params(policies, employee_working_hours=None):
+    details = {policy.type: policy.parsed_details for policy in policies}
+    rules = build_rules(policies, employee_working_hours)
+    return (
+        max(rules.shift_minutes, 1),
+        max(_or(details.get('working_hours', WorkingHours()).days_per_month, DEFAULT_DAYS_PER_MONTH), 1),
+        _or(details.get('overtime', OvertimePolicy()).rate_multiplier, DEFAULT_OVERTIME_MULTIPLIER),
+        _or(details.get('late', LatePolicy()).deduction_multiplier, DEFAULT_LATE_MULTIPLIER),
+        _or(details.get('leave', LeavePolicy()).unpaid_types, DEFAULT_UNPAID_TYPES),
+    )
+
+
+# Column arrays of every payroll input, aligned on `employee_ids` (sorted).
+# Money is held in integer paise.
+class PayrollInputs:
+    __slots__ = (
+        'employee_ids', 'base_salary', 'shift_minutes', 'days_per_month', 'overtime_multiplier',
+        'late_multiplier', 'overtime_eligible', 'overtime_minutes', 'late_minutes', 'unpaid_leave_days',
+    )
+
+    def __init__(self, size):
+        self.employee_ids = np.zeros(size, dtype=np.int64)
+        self.base_salary = np.zeros(size, dtype=np.int64)
+        self.shift_minutes = np.zeros(size)
+        self.days_per_month = np.zeros(size)
+        self.overtime_multiplier = np.zeros(size)
+        self.late_multiplier = np.zeros(size)
+        self.overtime_eligible = np.zeros(size, dtype=bool)
+        self.overtime_minutes = np.zeros(size)
+        self.late_minutes = np.zeros(size)
+        self.unpaid_leave_days = np.zeros(size)
+
+    def positions(self, employee_ids):
+        # Index of each id in the arrays, or -1 for employees without compensation.
+        employee_ids = np.asarray(employee_ids, dtype=np.int64)
+        if not len(self.employee_ids) or not len(employee_ids):
+            return np.full(len(employee_ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self.employee_ids, employee_ids)
+        positions = np.minimum(positions, len(self.employee_ids) - 1)
+        return np.where(self.employee_ids[positions] == employee_ids, positions, -1)
+
+
+def load_inputs(company_id, period_start, period_end):
+    # Compensation with employee attributes, attendance totals and unpaid
+    # leave: three queries plus the cached company policies.
+    rows = list(Compensation.objects.filter(company_id=company_id).order_by('employee_id').values_list(
+        'employee_id', 'base_salary', 'employee__department_id', 'employee__overtime_eligible', 'employee__working_hours',
+    ))
+    inputs = PayrollInputs(len(rows))
+    company_policies = resolve_company_policies(company_id)
+    with_own_policies = {policy.employee_id for policy in company_policies if policy.employee_id}
+
+    department_params = {}
+    unpaid_types = {}
+    for index, (employee_id, base_salary, department_id, overtime_eligible, working_hours) in enumerate(rows):
+        if employee_id in with_own_policies or working_hours:
+            params = payroll_params(pick_effective_policies(company_policies, department_id, employee_id), working_hours)
+        else:
+            params = department_params.get(department_id)
+            if params is None:
+                params = department_params[department_id] = payroll_params(pick_effective_policies(company_policies, department_id))
+        inputs.employee_ids[index] = employee_id
+        inputs.base_salary[index] = int(base_salary * 100)
+        inputs.shift_minutes[index], inputs.days_per_month[index], inputs.overtime_multiplier[index], inputs.late_multiplier[index], unpaid_types[employee_id] = params
+        inputs.overtime_eligible[index] = overtime_eligible
+
+    totals = DailyAttendance.objects.filter(
+        company_id=company_id, date__gte=period_start, date__lte=period_end,
+    ).values('employee_id').annotate(overtime=Sum('overtime_minutes'), late=Sum('late_minutes')).values_list('employee_id', 'overtime', 'late')
+    totals = np.array(list(totals), dtype=np.int64).reshape(-1, 3)
+    positions = inputs.positions(totals[:, 0])
+    found = positions >= 0
+    inputs.overtime_minutes[positions[found]] = totals[found, 1]
+    inputs.late_minutes[positions[found]] = totals[found, 2]
+
+    leaves = [
+        (employee_id, start_date, end_date)
+        for employee_id, leave_type, start_date, end_date in LeaveRequest.objects.filter(
+            company_id=company_id, status='approved', start_date__lte=period_end, end_date__gte=period_start,
+        ).values_list('employee_id', 'leave_type', 'start_date', 'end_date')
+        if leave_type in unpaid_types.get(employee_id, ())
+    ]
+    if leaves:
+        employee_ids, starts, ends = zip(*leaves)
+        starts = np.maximum(np.array(starts, dtype='datetime64[D]'), np.datetime64(period_start, 'D'))
+        ends = np.minimum(np.array(ends, dtype='datetime64[D]'), np.datetime64(period_end, 'D'))
+        days = (ends - starts).astype(np.int64) + 1
+        positions = inputs.positions(employee_ids)
+        found = positions >= 0
+        np.add.at(inputs.unpaid_leave_days, positions[found], days[found])
+    return inputs
+
+
+def to_paise(amounts):
+    # Rounds half up to whole paise. Amounts are first rounded to 1e-6 paise
+    # so float noise cannot push an exact half below it.
+    return np.floor(np.round(amounts, 6) + 0.5).astype(np.int64)
+
+
+def compute_payslips(inputs):
+    # Each component is rounded to paise once; totals are sums of the
+    # rounded integers, so gross - deductions == net on every payslip.
+    per_day = inputs.base_salary / inputs.days_per_month
+    per_minute = per_day / inputs.shift_minutes
+    overtime_pay = to_paise(np.where(inputs.overtime_eligible, inputs.overtime_minutes * per_minute * inputs.overtime_multiplier, 0.0))
+    late_deduction = to_paise(inputs.late_minutes * per_minute * inputs.late_multiplier)
+    leave_deduction = to_paise(inputs.unpaid_leave_days * per_day)
+    gross = inputs.base_salary + overtime_pay
+    deductions = np.minimum(late_deduction + leave_deduction, gross)
+    return {
+        'overtime_pay': overtime_pay,
+        'late_deduction': late_deduction,
+        'leave_deduction': leave_deduction,
+        'gross': gross,
+        'deductions': deductions,
+        'net': gross - deductions,
+    }
+
+
+def _money(paise):
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def persist_payslips(run, inputs, results):
+    columns = {name: values.tolist() for name, values in results.items()}
+    base_salary = inputs.base_salary.tolist()
+    overtime_minutes = inputs.overtime_minutes.astype(np.int64).tolist()
+    late_minutes = inputs.late_minutes.astype(np.int64).tolist()
+    unpaid_leave_days = inputs.unpaid_leave_days.tolist()
+
+    with transaction.atomic():
+        Payslip.objects.filter(run=run).delete()
+        batch = []
+        for index, employee_id in enumerate(inputs.employee_ids.tolist()):
+            batch.append(Payslip(
+                run_id=run.id,
+                company_id=run.company_id,
+                employee_id=employee_id,
+                base_salary=_money(base_salary[index]),
+                overtime_minutes=overtime_minutes[index],
+                overtime_pay=_money(columns['overtime_pay'][index]),
+                late_minutes=late_minutes[index],
+                late_deduction=_money(columns['late_deduction'][index]),
+                unpaid_leave_days=Decimal(f'{unpaid_leave_days[index]:.1f}'),
+                leave_deduction=_money(columns['leave_deduction'][index]),
+                gross=_money(columns['gross'][index]),
+                deductions=_money(columns['deductions'][index]),
+                net=_money(columns['net'][index]),
+            ))
+            if len(batch) >= PAYSLIP_BATCH_SIZE:
+                Payslip.objects.bulk_create(batch)
+                batch = []
+        Payslip.objects.bulk_create(batch)
+
+        run.employee_count = len(inputs.employee_ids)
+        run.total_gross = _money(results['gross'].sum())
+        run.total_deductions = _money(results['deductions'].sum())
+        run.total_net = _money(results['net'].sum())
+        run.save(update_fields=['employee_count', 'total_gross', 'total_deductions', 'total_net'])
+    return run
+
+
+def run_payroll(run):
+    inputs = load_inputs(run.company_id, run.period_start, run.period_end)
+    return persist_payslips(run, inputs, compute_payslips(inputs))
@@ -0,0 +1,95 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apis.bench import timed, count_queries
+from apis.models import Company, Employee
+from attendance.models import DailyAttendance
+from company.models import Department, Policy
+from payroll.engine import load_inputs, compute_payslips, persist_payslips
+from payroll.models import Compensation, PayrollRun
+
+
+User = get_user_model()
+SEED_BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Time a payroll run over a synthetic company (load, compute, persist). All writes are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=50000)
+        parser.add_argument('--departments', type=int, default=20)
+        parser.add_argument('--days', type=int, default=5, help='Attendance days seeded per employee.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                run = self.seed(options)
+                self.measure(run)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        size = options['employees']
+        company = Company.objects.create(name='Payroll Bench', ownerName='Bench', email='payroll@bench.invalid')
+        departments = Department.objects.bulk_create([
+            Department(company=company, name=f'Dept {index}', leave_allotments={'casual': 12}) for index in range(options['departments'])
+        ])
+        Policy.objects.bulk_create([
+            Policy(company=company, type='working_hours', title='Hours', details={'start': '09:00', 'end': '17:00', 'days_per_month': 26}),
+            Policy(company=company, type='overtime', title='Overtime', details={'rate_multiplier': 1.5}),
+            Policy(company=company, type='late', title='Late', details={'grace_minutes': 10}),
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'payroll.bench.{index}', email=f'payroll.{index}@bench.invalid', password='!', company=company)
+            for index in range(size)
+        ], batch_size=SEED_BATCH_SIZE)
+        employees = Employee.objects.bulk_create([
+            Employee(
+                employee_id=f'PB{index}', user=user, company=company, department=departments[index % len(departments)],
+                first_name='Bench', employee_type='office', joining_date=date(2024, 1, 1), overtime_eligible=index % 4 != 0,
+            )
+            for index, user in enumerate(users)
+        ], batch_size=SEED_BATCH_SIZE)
+        Compensation.objects.bulk_create([
+            Compensation(company=company, employee=employee, base_salary=Decimal(rng.randrange(20000, 200000)))
+            for employee in employees
+        ], batch_size=SEED_BATCH_SIZE)
+
+        period_start = date(2026, 1, 1)
+        DailyAttendance.objects.bulk_create([
+            DailyAttendance(
+                company=company, employee=employee, date=period_start + timedelta(days=day),
+                worked_minutes=480, late_minutes=rng.choice((0, 0, 0, 15, 40)), overtime_minutes=rng.choice((0, 0, 30, 90)),
+            )
+            for employee in employees for day in range(options['days'])
+        ], batch_size=SEED_BATCH_SIZE)
+        self.stdout.write(f"Seeded {size} employees with {size * options['days']} attendance days.")
+        return PayrollRun.objects.create(company=company, period_start=period_start, period_end=date(2026, 1, 31))
+
+    def measure(self, run):
+        phases = {}
+        with count_queries() as queries:
+            with timed(phases.setdefault('load', [])):
+                inputs = load_inputs(run.company_id, run.period_start, run.period_end)
+            load_queries = queries.count
+            with timed(phases.setdefault('compute', [])):
+                results = compute_payslips(inputs)
+            with timed(phases.setdefault('persist', [])):
+                persist_payslips(run, inputs, results)
+        for phase, samples in phases.items():
+            self.stdout.write(f"{phase:<10} {samples[0]:>10.1f}ms")
+        self.stdout.write(
+            f"employees={len(inputs.employee_ids)} load_queries={load_queries} total_queries={queries.count} "
+            f"total_net={run.total_net}"
+        )
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from payroll.runner import claim_next_run, execute_run
+
+
+class Command(BaseCommand):
+    help = 'Process queued payroll runs, one company per run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds to sleep when no run is queued.')
+        parser.add_argument('--once', action='store_true', help='Process the queued runs once and exit.')
+
+    def handle(self, *args, **options):
+        while True:
+            run = claim_next_run()
+            if run is not None:
+                started = time.perf_counter()
+                execute_run(run)
+                self.stdout.write(f"Run {run.id} {run.status}: {run.employee_count} payslips in {time.perf_counter() - started:.2f}s.")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
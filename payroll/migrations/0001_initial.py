@@ -0,0 +1,82 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('apis', '0007_employee_directory_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('total_gross', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('total_net', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_runs', to='apis.company')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Payslip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_salary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('overtime_minutes', models.PositiveIntegerField(default=0)),
+                ('overtime_pay', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('late_minutes', models.PositiveIntegerField(default=0)),
+                ('late_deduction', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('unpaid_leave_days', models.DecimalField(decimal_places=1, default=0, max_digits=6)),
+                ('leave_deduction', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('gross', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('deductions', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('net', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslips', to='apis.company')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslips', to='apis.employee')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslips', to='payroll.payrollrun')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Compensation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_salary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compensations', to='apis.company')),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='compensation', to='apis.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'employee'], name='payroll_com_company_36a140_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['status', 'created_at'], name='payroll_pay_status_97cff9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['company', 'period_start'], name='payroll_pay_company_746c97_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='payslip',
+            unique_together={('run', 'employee')},
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+def fail_duplicate_active_runs(apps, schema_editor):
+    # Keep the oldest queued/running run of each company and month so the
+    # constraint below can be created.
+    PayrollRun = apps.get_model('payroll', 'PayrollRun')
+    seen = set()
+    duplicates = []
+    for run in PayrollRun.objects.filter(status__in=('queued', 'running')).order_by('created_at', 'id'):
+        key = (run.company_id, run.period_start)
+        if key in seen:
+            duplicates.append(run.id)
+        seen.add(key)
+    PayrollRun.objects.filter(id__in=duplicates).update(status='failed', error='Duplicate of another run for this month.')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fail_duplicate_active_runs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payrollrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('company', 'period_start'), name='payroll_one_active_run_per_period'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import models
+
+
+class Compensation(models.Model):
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='compensations')
+    employee = models.OneToOneField('apis.Employee', on_delete=models.CASCADE, related_name='compensation')
+    base_salary = models.DecimalField(max_digits=12, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id}: {self.base_salary}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['company', 'employee']),
+        ]
+
+
+class PayrollRun(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='payroll_runs')
+    period_start = models.DateField()
+    period_end = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    employee_count = models.PositiveIntegerField(default=0)
+    total_gross = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_net = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey('apis.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_runs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.company_id} {self.period_start:%Y-%m} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['company', 'period_start']),
+        ]
+        constraints = [
+            # At most one queued or running run per company and month.
+            models.UniqueConstraint(
+                fields=['company', 'period_start'], condition=models.Q(status__in=['queued', 'running']),
+                name='payroll_one_active_run_per_period',
+            ),
+        ]
+
+
+class Payslip(models.Model):
+    run = models.ForeignKey('PayrollRun', on_delete=models.CASCADE, related_name='payslips')
+    company = models.ForeignKey('apis.Company', on_delete=models.CASCADE, related_name='payslips')
+    employee = models.ForeignKey('apis.Employee', on_delete=models.CASCADE, related_name='payslips')
+    base_salary = models.DecimalField(max_digits=12, decimal_places=2)
+    overtime_minutes = models.PositiveIntegerField(default=0)
+    overtime_pay = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    late_minutes = models.PositiveIntegerField(default=0)
+    late_deduction = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    unpaid_leave_days = models.DecimalField(max_digits=6, decimal_places=1, default=0)
+    leave_deduction = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    gross = models.DecimalField(max_digits=12, decimal_places=2)
+    deductions = models.DecimalField(max_digits=12, decimal_places=2)
+    net = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.run_id}: {self.net}"
+
+    class Meta:
+        unique_together = ['run', 'employee']
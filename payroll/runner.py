@@ -0,0 +1,67 @@
+import logging
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .engine import run_payroll
+from .models import PayrollRun
+
+
+logger = logging.getLogger('payroll')
+
+
+def claim_next_run():
+    # A running run whose worker stopped heartbeating has lost its lease and
+    # is claimed again, until it runs out of attempts.
+    now = timezone.now()
+    stale = Q(status='running', heartbeat_at__lt=now - timedelta(seconds=settings.PAYROLL_RUN_LEASE_SECONDS))
+    PayrollRun.objects.filter(stale, attempts__gte=settings.PAYROLL_RUN_MAX_ATTEMPTS).update(
+        status='failed', error='Worker stopped responding.', finished_at=now,
+    )
+    # skip_locked lets several workers pull from the queue without blocking.
+    with transaction.atomic():
+        run = PayrollRun.objects.select_for_update(skip_locked=True).filter(Q(status='queued') | stale).order_by('created_at').first()
+        if run is None:
+            return None
+        run.status = 'running'
+        run.started_at = run.heartbeat_at = timezone.now()
+        run.attempts += 1
+        run.save(update_fields=['status', 'started_at', 'heartbeat_at', 'attempts'])
+    return run
+
+
+def _heartbeat(run, stop):
+    try:
+        while not stop.wait(settings.PAYROLL_RUN_LEASE_SECONDS / 3):
+            try:
+                PayrollRun.objects.filter(id=run.id, started_at=run.started_at, status='running').update(heartbeat_at=timezone.now())
+            except Exception:
+                logger.exception("payroll run %s heartbeat failed", run.id)
+    finally:
+        connections.close_all()
+
+
+def execute_run(run):
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(run, stop), name=f'payroll-heartbeat-{run.id}', daemon=True)
+    heartbeat.start()
+    try:
+        run_payroll(run)
+        run.status = 'completed'
+        run.error = ''
+    except Exception as e:
+        logger.exception("payroll run %s failed", run.id)
+        run.status = 'failed'
+        run.error = str(e)
+    finally:
+        stop.set()
+        heartbeat.join()
+    run.finished_at = timezone.now()
+    # started_at identifies the claim: a worker whose run was reclaimed by
+    # another one does not overwrite its outcome.
+    PayrollRun.objects.filter(id=run.id, started_at=run.started_at).update(
+        status=run.status, error=run.error, finished_at=run.finished_at,
+    )
+    return run
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from .models import PayrollRun
+from apis.serializers import PlainListSerializer
+
+
+class PayrollRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PayrollRun
+        list_serializer_class = PlainListSerializer
+        fields = [
+            'id', 'period_start', 'period_end', 'status', 'employee_count', 'total_gross',
+            'total_deductions', 'total_net', 'error', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class CompensationItemSerializer(serializers.Serializer):
+    employee = serializers.IntegerField()
+    base_salary = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
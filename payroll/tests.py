@@ -0,0 +1,113 @@
+import datetime
+from decimal import Decimal
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from apis.cache import hot_cache
+from apis.models import Company, CustomUser, Employee
+from attendance.models import DailyAttendance
+from company.models import Department, Policy
+from leave.models import LeaveRequest
+from .engine import PayrollInputs, compute_payslips, run_payroll
+from .models import Compensation, PayrollRun, Payslip
+from .runner import claim_next_run, execute_run
+
+
+class PayrollTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear_local()
+        self.company = Company.objects.create(name='Acme', ownerName='Owner', email='owner@acme.test')
+        self.department = Department.objects.create(company=self.company, name='Engineering', leave_allotments={})
+        Policy.objects.create(company=self.company, type='working_hours', title='Hours', details={'minutes': 480})
+
+    def employee(self, code, base_salary=None, **fields):
+        user = CustomUser.objects.create_user(username=code, email=f'{code}@acme.test', password='secret', company=self.company)
+        employee = Employee.objects.create(
+            employee_id=code, user=user, company=self.company, department=self.department,
+            first_name=code, employee_type='office', joining_date=datetime.date(2024, 1, 1), **fields,
+        )
+        if base_salary is not None:
+            Compensation.objects.create(company=self.company, employee=employee, base_salary=Decimal(base_salary))
+        return employee
+
+    def payroll_run(self, month=9, **fields):
+        start = datetime.date(2026, month, 1)
+        end = (start + datetime.timedelta(days=31)).replace(day=1) - datetime.timedelta(days=1)
+        return PayrollRun.objects.create(company=self.company, period_start=start, period_end=end, **fields)
+
+
+class PayrollEngineTests(PayrollTestCase):
+    def test_payslips_match_hand_computed_amounts(self):
+        # 26000 over 26 days of 500 minutes: 1000 a day, 2 a minute.
+        first = self.employee('e1', '26000', working_hours={'minutes': 500})
+        # 30000.50 over 26 days of 480 minutes: 1153.8654 a day, 2.4039 a minute.
+        second = self.employee('e2', '30000.50', overtime_eligible=False)
+        self.employee('e3')
+        DailyAttendance.objects.create(company=self.company, employee=first, date=datetime.date(2026, 9, 3), overtime_minutes=100, late_minutes=50)
+        DailyAttendance.objects.create(company=self.company, employee=second, date=datetime.date(2026, 9, 3), overtime_minutes=60, late_minutes=7)
+        DailyAttendance.objects.create(company=self.company, employee=second, date=datetime.date(2026, 10, 1), late_minutes=30)
+        # Only the days inside the period count, and only unpaid types.
+        LeaveRequest.objects.create(company=self.company, employee=first, leave_type='unpaid', status='approved',
+                                    start_date=datetime.date(2026, 8, 30), end_date=datetime.date(2026, 9, 2), days=4)
+        LeaveRequest.objects.create(company=self.company, employee=first, leave_type='casual', status='approved',
+                                    start_date=datetime.date(2026, 9, 10), end_date=datetime.date(2026, 9, 10), days=1)
+        LeaveRequest.objects.create(company=self.company, employee=second, leave_type='unpaid', status='approved',
+                                    start_date=datetime.date(2026, 9, 30), end_date=datetime.date(2026, 9, 30), days=1)
+        LeaveRequest.objects.create(company=self.company, employee=second, leave_type='unpaid', status='pending',
+                                    start_date=datetime.date(2026, 9, 20), end_date=datetime.date(2026, 9, 21), days=2)
+
+        run = run_payroll(self.payroll_run())
+        payslips = {payslip.employee_id: payslip for payslip in Payslip.objects.filter(run=run)}
+        self.assertEqual(set(payslips), {first.id, second.id})
+        fields = ('overtime_pay', 'late_deduction', 'unpaid_leave_days', 'leave_deduction', 'gross', 'deductions', 'net')
+        self.assertEqual(tuple(getattr(payslips[first.id], field) for field in fields), (
+            Decimal('300.00'), Decimal('100.00'), Decimal('2.0'), Decimal('2000.00'),
+            Decimal('26300.00'), Decimal('2100.00'), Decimal('24200.00'),
+        ))
+        self.assertEqual(tuple(getattr(payslips[second.id], field) for field in fields), (
+            Decimal('0.00'), Decimal('16.83'), Decimal('1.0'), Decimal('1153.87'),
+            Decimal('30000.50'), Decimal('1170.70'), Decimal('28829.80'),
+        ))
+        self.assertEqual((run.employee_count, run.total_net), (2, Decimal('53029.80')))
+
+    def test_amounts_round_half_up_to_whole_paise(self):
+        inputs = PayrollInputs(3)
+        inputs.base_salary[:] = [5, 100000, 1000]
+        inputs.days_per_month[:] = [2, 3, 1]
+        inputs.shift_minutes[:] = [1, 480, 1]
+        inputs.overtime_multiplier[:] = 1.5
+        inputs.late_multiplier[:] = 1
+        inputs.unpaid_leave_days[:] = [1, 1, 2]
+        results = compute_payslips(inputs)
+        # 2.5 paise rounds up, 33333.33 down; deductions never exceed gross.
+        self.assertEqual(results['leave_deduction'].tolist(), [3, 33333, 2000])
+        self.assertEqual(results['deductions'].tolist(), [3, 33333, 1000])
+        self.assertTrue(np.array_equal(results['gross'] - results['deductions'], results['net']))
+        self.assertEqual(results['net'].tolist(), [2, 66667, 0])
+
+
+class PayrollRunnerTests(PayrollTestCase):
+    def test_stale_runs_are_reclaimed_until_attempts_run_out(self):
+        self.employee('e1', '26000')
+        stale = timezone.now() - datetime.timedelta(hours=1)
+        abandoned = self.payroll_run(month=1, status='running', started_at=stale, heartbeat_at=stale, attempts=1)
+        self.payroll_run(month=2, status='running', started_at=timezone.now(), heartbeat_at=timezone.now(), attempts=1)
+        exhausted = self.payroll_run(month=3, status='running', started_at=stale, heartbeat_at=stale, attempts=3)
+
+        claimed = claim_next_run()
+        self.assertEqual((claimed.id, claimed.attempts, claimed.status), (abandoned.id, 2, 'running'))
+        self.assertIsNone(claim_next_run())
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, 'failed')
+
+        execute_run(claimed)
+        abandoned.refresh_from_db()
+        self.assertEqual((abandoned.status, abandoned.employee_count), ('completed', 1))
+
+        # The worker that lost the lease finishing late cannot overwrite it.
+        PayrollRun.objects.filter(id=abandoned.id).update(status='running')
+        abandoned.started_at = stale
+        execute_run(abandoned)
+        self.assertEqual(PayrollRun.objects.get(id=abandoned.id).status, 'running')
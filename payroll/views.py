@@ -0,0 +1,134 @@
+import calendar
+from datetime import date
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.views import APIView
+from apis.models import Employee
+from apis.views import JWTAuth
+from .models import Compensation, PayrollRun
+from .serializers import PayrollRunSerializer, CompensationItemSerializer
+
+
+MAX_LIST_SIZE = 24
+
+
+class PayrollAdminMixin(JWTAuth):
+    stateless_auth = True
+
+    def check_payroll_admin(self, request):
+        user, error = self.check_jwt_token(request)
+        if user is None:
+            return None, error
+        if getattr(user, 'user_type', None) != 'admin':
+            return None, self.error_response(error_message="Only admin can manage payroll.", status=status.HTTP_403_FORBIDDEN)
+        if not user.company_id:
+            return None, self.error_response(error_message="No company found for user.", status=status.HTTP_404_NOT_FOUND)
+        return user, None
+
+
+# Queue a payroll run for a month and list recent runs
+class PayrollRunView(PayrollAdminMixin, APIView):
+
+    def get(self, request):
+        try:
+            user, error = self.check_payroll_admin(request)
+            if user is None:
+                return error
+
+            runs = PayrollRun.objects.filter(company_id=user.company_id).order_by('-created_at')[:MAX_LIST_SIZE]
+            return self.success_response({
+                "runs": self.serialized(PayrollRunSerializer(runs, many=True)),
+                "message": "Payroll runs fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+    def post(self, request):
+        try:
+            user, error = self.check_payroll_admin(request)
+            if user is None:
+                return error
+
+            today = timezone.localdate()
+            try:
+                year = int(request.data.get('year') or today.year)
+                month = int(request.data.get('month') or today.month)
+                period_start = date(year, month, 1)
+            except (TypeError, ValueError):
+                return self.error_response(error_message="Invalid year or month.", status=status.HTTP_400_BAD_REQUEST)
+            period_end = date(year, month, calendar.monthrange(year, month)[1])
+
+            # payroll_one_active_run_per_period rejects a second queued or
+            # running run for the month, also under concurrent requests.
+            try:
+                with transaction.atomic():
+                    run = PayrollRun.objects.create(
+                        company_id=user.company_id,
+                        period_start=period_start,
+                        period_end=period_end,
+                        created_by_id=user.id,
+                    )
+            except IntegrityError:
+                return self.error_response(error_message="A payroll run for this month is already in progress.", status=status.HTTP_400_BAD_REQUEST)
+            return self.success_response({
+                "run": PayrollRunSerializer(run).data,
+                "message": "Payroll run queued successfully."
+            }, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Status of a single payroll run
+class PayrollRunStatusView(PayrollAdminMixin, APIView):
+
+    def get(self, request, run_id):
+        try:
+            user, error = self.check_payroll_admin(request)
+            if user is None:
+                return error
+
+            run = PayrollRun.objects.filter(id=run_id, company_id=user.company_id).first()
+            if run is None:
+                return self.error_response(error_message="Payroll run not found.", status=status.HTTP_404_NOT_FOUND)
+            return self.success_response({
+                "run": PayrollRunSerializer(run).data,
+                "message": "Payroll run fetched successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")
+
+
+# Bulk upsert of employee base salaries
+class CompensationView(PayrollAdminMixin, APIView):
+
+    def put(self, request):
+        try:
+            user, error = self.check_payroll_admin(request)
+            if user is None:
+                return error
+
+            serializer = CompensationItemSerializer(data=request.data, many=True)
+            if not serializer.is_valid():
+                return self.error_response(error_message=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            items = serializer.validated_data
+
+            employee_ids = {item['employee'] for item in items}
+            known = set(Employee.objects.filter(company_id=user.company_id, id__in=employee_ids).values_list('id', flat=True))
+            if employee_ids - known:
+                return self.error_response(error_message="Employee must belong to your company.", status=status.HTTP_400_BAD_REQUEST)
+
+            Compensation.objects.bulk_create([
+                Compensation(company_id=user.company_id, employee_id=item['employee'], base_salary=item['base_salary'], updated_at=timezone.now())
+                for item in items
+            ], update_conflicts=True, unique_fields=['employee'], update_fields=['base_salary', 'updated_at'])
+            return self.success_response({
+                "updated": len(items),
+                "message": "Compensation updated successfully."
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return self.error_response(error_message=f"Something went wrong: {e}")